@@ -2,21 +2,31 @@
 
 from __future__ import annotations
 
-from __future__ import annotations
+import importlib
 import logging
 from collections.abc import Callable
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .const import DOMAIN
+from .services import async_setup_services
 
-from .coordinator import ApiCoordinator
+if TYPE_CHECKING:
+    # The coordinator pulls in the API client, so it is only imported once an entry is set up
+    from .coordinator import ApiCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 # List fo platforms this integration will support
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 @dataclass
 class RuntimeData:
@@ -28,10 +38,17 @@ class RuntimeData:
 type YrNorwegianWaterTemperaturesConfigEntry = ConfigEntry[RuntimeData]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration services"""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: YrNorwegianWaterTemperaturesConfigEntry) -> bool:
     """Set up config entry"""
-
-    coordinator = ApiCoordinator(hass, config_entry)
+    # Import the coordinator with the API client, recorder and NumPy modules it pulls in off the event loop
+    coordinator_module = await hass.async_add_import_executor_job(importlib.import_module, f"{__name__}.coordinator")
+    coordinator = coordinator_module.ApiCoordinator(hass, config_entry)
 
     # Perform initial data loaf from api
     # This raises ConfigEntryNotReady if it fails
@@ -0,0 +1,173 @@
+"""Incrementally maintained water temperature aggregates per county and municipality."""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import timedelta
+
+from .models import LocationSnapshot, WaterTemperatureRecord
+
+REGION_COUNTY = "county"
+REGION_MUNICIPALITY = "municipality"
+REGION_LEVELS = (REGION_COUNTY, REGION_MUNICIPALITY)
+
+CATALOG_MAX_READING_AGE = timedelta(days=7)  # Older readings are left out of the catalog summary
+
+# Rebuild a heap once stale entries outnumber the live ones by this factor
+_COMPACT_FACTOR = 2
+_COMPACT_MIN_SIZE = 32
+
+
+@dataclass(frozen=True, slots=True)
+class RegionSummary:
+    """Aggregated water temperatures of one region."""
+
+    count: int
+    minimum: float | None
+    maximum: float | None
+    mean: float | None
+    warmest_location_id: str | None
+
+
+class RegionAccumulator:
+    """Running count, sum, minimum and maximum of the temperatures in one region.
+
+    Minimum and maximum are kept in heaps with lazy deletion: entries for readings
+    that changed or left the region stay in the heap until they reach the top,
+    so every update is O(log n) instead of a rescan of the region.
+    """
+
+    __slots__ = ("_temperatures", "_total", "_min_heap", "_max_heap")
+
+    def __init__(self) -> None:
+        """Initialize an empty accumulator."""
+        self._temperatures: dict[str, float] = {}
+        self._total = 0.0
+        self._min_heap: list[tuple[float, str]] = []
+        self._max_heap: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        """Return the number of readings in the region."""
+        return len(self._temperatures)
+
+    def set(self, location_id: str, temperature: float) -> None:
+        """Add or replace the reading of a location."""
+        previous = self._temperatures.get(location_id)
+        if previous == temperature:
+            return
+        if previous is not None:
+            self._total -= previous
+        self._temperatures[location_id] = temperature
+        self._total += temperature
+        heapq.heappush(self._min_heap, (temperature, location_id))
+        heapq.heappush(self._max_heap, (-temperature, location_id))
+        self._compact()
+
+    def discard(self, location_id: str) -> None:
+        """Remove the reading of a location if present."""
+        previous = self._temperatures.pop(location_id, None)
+        if previous is None:
+            return
+        # Start over from zero when empty so floating point drift does not accumulate
+        self._total = self._total - previous if self._temperatures else 0.0
+        self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the heaps when they are mostly stale entries."""
+        limit = max(_COMPACT_MIN_SIZE, _COMPACT_FACTOR * len(self._temperatures))
+        if len(self._min_heap) <= limit and len(self._max_heap) <= limit:
+            return
+        self._min_heap = [(value, location_id) for location_id, value in self._temperatures.items()]
+        self._max_heap = [(-value, location_id) for location_id, value in self._temperatures.items()]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+
+    def _top(self, heap: list[tuple[float, str]], sign: int) -> tuple[float, str] | None:
+        """Return the top live entry of a heap, dropping stale entries on the way."""
+        while heap:
+            value, location_id = heap[0]
+            if self._temperatures.get(location_id) == sign * value:
+                return sign * value, location_id
+            heapq.heappop(heap)
+        return None
+
+    def summary(self) -> RegionSummary:
+        """Return the current aggregates."""
+        if not self._temperatures:
+            return RegionSummary(0, None, None, None, None)
+        minimum = self._top(self._min_heap, 1)
+        maximum = self._top(self._max_heap, -1)
+        count = len(self._temperatures)
+        return RegionSummary(
+            count=count,
+            minimum=minimum[0],
+            maximum=maximum[0],
+            mean=round(self._total / count, 2),
+            warmest_location_id=maximum[1],
+        )
+
+
+class RegionalAggregates:
+    """Aggregates per county and municipality, updated from snapshot changes only."""
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self._regions: dict[str, dict[str, RegionAccumulator]] = {level: {} for level in REGION_LEVELS}
+        # The (county, municipality) each location is currently counted in
+        self._membership: dict[str, tuple[str | None, str | None]] = {}
+
+    def regions(self) -> Iterator[tuple[str, str]]:
+        """Yield the (level, name) of every known region."""
+        for level, accumulators in self._regions.items():
+            for name in accumulators:
+                yield level, name
+
+    def summary(self, level: str, name: str) -> RegionSummary:
+        """Return the aggregates of a region."""
+        if (accumulator := self._regions[level].get(name)) is None:
+            return RegionSummary(0, None, None, None, None)
+        return accumulator.summary()
+
+    def apply(self, snapshot: LocationSnapshot) -> set[tuple[str, str]]:
+        """Apply the changed and removed locations of a snapshot.
+
+        Returns the (level, name) of the regions that were touched.
+        """
+        touched: set[tuple[str, str]] = set()
+        for location_id in snapshot.removed_ids:
+            self._discard(location_id, touched)
+        for location_id in snapshot.changed_ids:
+            if (record := snapshot.get(location_id)) is not None:
+                self._set(record, touched)
+        return touched
+
+    def _set(self, record: WaterTemperatureRecord, touched: set[tuple[str, str]]) -> None:
+        """Count a record in its regions, leaving the regions it moved away from."""
+        location_id = record.location_id
+        regions = (record.county, record.municipality)
+        previous = self._membership.get(location_id)
+        if previous is not None and previous != regions:
+            self._discard(location_id, touched)
+
+        for level, name in zip(REGION_LEVELS, regions):
+            if not name:
+                continue
+            accumulator = self._regions[level].setdefault(name, RegionAccumulator())
+            if record.temperature is None:
+                accumulator.discard(location_id)
+            else:
+                accumulator.set(location_id, float(record.temperature))
+            touched.add((level, name))
+        self._membership[location_id] = regions
+
+    def _discard(self, location_id: str, touched: set[tuple[str, str]]) -> None:
+        """Remove a location from the regions it is counted in."""
+        regions = self._membership.pop(location_id, None)
+        if regions is None:
+            return
+        for level, name in zip(REGION_LEVELS, regions):
+            if name and (accumulator := self._regions[level].get(name)) is not None:
+                accumulator.discard(location_id)
+                touched.add((level, name))
@@ -0,0 +1,170 @@
+"""Threshold alert rules evaluated against new readings."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .models import WaterTemperatureRecord
+from .spatial import haversine_km
+
+SCOPE_ALL = "all"
+SCOPE_COUNTY = "county"
+SCOPE_MUNICIPALITY = "municipality"
+SCOPE_LOCATIONS = "locations"
+SCOPE_RADIUS = "radius"
+SCOPES = [SCOPE_ALL, SCOPE_COUNTY, SCOPE_MUNICIPALITY, SCOPE_LOCATIONS, SCOPE_RADIUS]
+
+DEFAULT_HYSTERESIS = 0.5  # Degrees a reading must fall back past the threshold to clear an alert
+
+_RULE_PATTERN = re.compile(
+    r"^\s*(?P<scope>[^<>]+?)\s*(?P<operator>[<>])\s*(?P<threshold>-?\d+(?:\.\d+)?)"
+    r"\s*(?:(?:±|\+-|\+/-)\s*(?P<hysteresis>\d+(?:\.\d+)?))?\s*$"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AlertRule:
+    """Alert when a reading in scope goes above or below a threshold."""
+
+    text: str
+    scope: str
+    values: frozenset[str]
+    radius_km: float | None
+    above: bool
+    threshold: float
+    hysteresis: float
+
+    @property
+    def key(self) -> str:
+        """Return a stable key of the rule, the same however the rule is written or ordered."""
+        argument = self.radius_km if self.scope == SCOPE_RADIUS else "|".join(sorted(self.values))
+        operator = ">" if self.above else "<"
+        normalized = f"{self.scope}:{argument} {operator} {self.threshold!r} ± {self.hysteresis!r}"
+        return hashlib.sha256(normalized.encode()).hexdigest()[:12]
+
+    def in_scope(self, record: WaterTemperatureRecord, center: tuple[float, float]) -> bool:
+        """Return True if the rule applies to a location."""
+        if self.scope == SCOPE_ALL:
+            return True
+        if self.scope == SCOPE_COUNTY:
+            return (record.county or "").casefold() in self.values
+        if self.scope == SCOPE_MUNICIPALITY:
+            return (record.municipality or "").casefold() in self.values
+        if self.scope == SCOPE_LOCATIONS:
+            return str(record.location_id).casefold() in self.values or record.name.casefold() in self.values
+        if record.latitude is None or record.longitude is None:
+            return False
+        return haversine_km(*center, record.latitude, record.longitude) <= self.radius_km
+
+    def is_active(self, temperature: float, was_active: bool) -> bool:
+        """Return True if the temperature triggers the rule, clearing only past the hysteresis."""
+        if self.above:
+            return temperature > self.threshold - self.hysteresis if was_active else temperature >= self.threshold
+        return temperature < self.threshold + self.hysteresis if was_active else temperature <= self.threshold
+
+
+def parse_alert_rule(text: str) -> AlertRule:
+    """Parse a rule like "county:Vestland > 18 ± 0.5" or "radius:20 < 12"."""
+    match = _RULE_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Invalid alert rule {text.strip()!r}, expected '<scope> > <threshold> [± <hysteresis>]'")
+
+    scope, _, argument = match["scope"].partition(":")
+    scope = scope.strip().lower()
+    argument = argument.strip()
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown alert scope {scope!r}, expected one of {', '.join(SCOPES)}")
+
+    values: frozenset[str] = frozenset()
+    radius_km = None
+    if scope == SCOPE_RADIUS:
+        try:
+            radius_km = float(argument)
+        except ValueError:
+            raise ValueError(f"Invalid radius {argument!r} in alert rule {text.strip()!r}") from None
+    elif scope != SCOPE_ALL:
+        values = frozenset(value.strip().casefold() for value in argument.split("|") if value.strip())
+        if not values:
+            raise ValueError(f"Missing {scope} in alert rule {text.strip()!r}")
+
+    hysteresis = match["hysteresis"]
+    return AlertRule(
+        text=text.strip(),
+        scope=scope,
+        values=values,
+        radius_km=radius_km,
+        above=match["operator"] == ">",
+        threshold=float(match["threshold"]),
+        hysteresis=float(hysteresis) if hysteresis is not None else DEFAULT_HYSTERESIS,
+    )
+
+
+def parse_alert_rules(text: str | None) -> list[AlertRule]:
+    """Parse semicolon-separated alert rules, keeping the first of rules with the same key."""
+    rules: dict[str, AlertRule] = {}
+    for rule_text in (text or "").split(";"):
+        if rule_text.strip():
+            rule = parse_alert_rule(rule_text)
+            rules.setdefault(rule.key, rule)
+    return list(rules.values())
+
+
+class AlertEngine:
+    """Tracks which locations trigger each rule, updated from changed readings only."""
+
+    def __init__(self, rules: list[AlertRule]) -> None:
+        """Initialize the engine with no active alerts."""
+        self.rules = rules
+        # Per rule, the temperature of each location currently triggering it
+        self.active: list[dict[str, float]] = [{} for _ in rules]
+        # Indexes of the rules whose active locations changed in the last evaluation
+        self.changed_rules: frozenset[int] = frozenset()
+
+    def evaluate(
+        self, records: Iterable[WaterTemperatureRecord], center: tuple[float, float]
+    ) -> list[dict[str, Any]]:
+        """Apply new readings to every rule in one pass and return the alerts that started or cleared."""
+        crossings = []
+        changed_rules = set()
+        for record in records:
+            temperature = record.temperature
+            for index, rule in enumerate(self.rules):
+                active = self.active[index]
+                was_active = record.location_id in active
+                is_active = (
+                    temperature is not None
+                    and rule.in_scope(record, center)
+                    and rule.is_active(temperature, was_active)
+                )
+                if is_active:
+                    if active.get(record.location_id) != temperature:
+                        changed_rules.add(index)
+                    active[record.location_id] = temperature
+                elif was_active:
+                    del active[record.location_id]
+                    changed_rules.add(index)
+                if is_active != was_active:
+                    crossings.append({
+                        "rule": rule.text,
+                        "location_id": record.location_id,
+                        "name": record.name,
+                        "temperature": temperature,
+                        "time": record.time.isoformat() if record.time else None,
+                        "active": is_active,
+                    })
+        self.changed_rules = frozenset(changed_rules)
+        return crossings
+
+    def remove(self, location_ids: Iterable[str]) -> None:
+        """Forget locations, clearing their alerts without reporting a crossing."""
+        location_ids = set(location_ids)
+        changed_rules = set(self.changed_rules)
+        for index, active in enumerate(self.active):
+            for location_id in location_ids & active.keys():
+                del active[location_id]
+                changed_rules.add(index)
+        self.changed_rules = frozenset(changed_rules)
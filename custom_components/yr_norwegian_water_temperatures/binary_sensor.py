@@ -0,0 +1,78 @@
+"""Binary sensor definition for the Yr Norwegian Water Temperatures integration."""
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import YrNorwegianWaterTemperaturesConfigEntry
+from .coordinator import ApiCoordinator
+
+if TYPE_CHECKING:
+    class _CoordinatorEntityBase:
+        """Type-checking shim for CoordinatorEntity."""
+
+        coordinator: ApiCoordinator
+
+        def __init__(self, coordinator: ApiCoordinator, context: Any = None) -> None:
+            """Mirror CoordinatorEntity init for static analysis."""
+
+else:
+    _CoordinatorEntityBase = CoordinatorEntity[ApiCoordinator]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: YrNorwegianWaterTemperaturesConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+):
+    """Set up a binary sensor per threshold alert rule."""
+    coordinator = config_entry.runtime_data.coordinator
+    if coordinator.alerts is None:
+        return
+
+    async_add_entities(
+        ThresholdAlertBinarySensor(coordinator, config_entry.entry_id, index)
+        for index in range(len(coordinator.alerts.rules))
+    )
+
+
+class ThresholdAlertBinarySensor(_CoordinatorEntityBase, BinarySensorEntity):
+    """On while any location in the scope of an alert rule triggers it."""
+
+    def __init__(self, coordinator: ApiCoordinator, entry_id: str, index: int):
+        """Initialize the alert binary sensor."""
+        super().__init__(coordinator)
+        self._index = index
+        self._rule = coordinator.alerts.rules[index]
+        # Keyed by the rule itself, so reordering or respacing the rules keeps each entity
+        self._attr_unique_id = f"{entry_id}_alert_{self._rule.key}"
+        self._attr_name = f"Water temperature alert {self._rule.text}"
+        self._written_available = True
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if any location triggers the rule."""
+        return bool(self.coordinator.alerts.active[self._index])
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the rule and the locations triggering it."""
+        active = self.coordinator.alerts.active[self._index]
+        return {
+            "rule": self._rule.text,
+            "count": len(active),
+            "locations": [
+                {"location_id": location_id, "temperature": temperature}
+                for location_id, temperature in sorted(active.items(), key=lambda item: item[1], reverse=self._rule.above)
+            ],
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write a new state only when the rule's locations or availability changed."""
+        if self._index in self.coordinator.alerts.changed_rules or self.available != self._written_available:
+            self._written_available = self.available
+            self.async_write_ha_state()
@@ -0,0 +1,56 @@
+"""Size and age bounds for the cached locations."""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Collection, Mapping
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from .models import WaterTemperatureRecord
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Size and eviction counters of the locations cache."""
+
+    size: int = 0
+    pinned: int = 0
+    evicted_expired: int = 0  # Unmonitored locations evicted for an old measurement
+    evicted_overflow: int = 0  # Unmonitored locations evicted to stay within the maximum size
+    last_evicted: int = 0  # Locations evicted by the last refresh
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a dict."""
+        return asdict(self)
+
+
+def select_evictions(
+    locations: Mapping[str, WaterTemperatureRecord],
+    pinned: Collection[str],
+    max_entries: int,
+    max_age: timedelta | None,
+    now: datetime,
+) -> tuple[list[str], list[str]]:
+    """Return the unmonitored IDs to evict for being too old and for exceeding the maximum size.
+
+    Pinned IDs are never evicted. Locations measured before now - max_age expire,
+    and if more than max_entries locations remain, the unmonitored ones with the
+    oldest measurement go first. Locations without a measurement time never
+    expire but are the first to go when over the size bound.
+    """
+    cutoff = now - max_age if max_age else None
+    expired: list[str] = []
+    candidates: list[tuple[float, str]] = []
+    for location_id, record in locations.items():
+        if location_id in pinned:
+            continue
+        timestamp = record.time.timestamp() if isinstance(record.time, datetime) else float("-inf")
+        if cutoff is not None and isinstance(record.time, datetime) and record.time < cutoff:
+            expired.append(location_id)
+        else:
+            candidates.append((timestamp, location_id))
+
+    overflow_count = min(len(locations) - len(expired) - max_entries, len(candidates)) if max_entries else 0
+    overflow = [location_id for _, location_id in heapq.nsmallest(overflow_count, candidates)]
+    return expired, overflow
@@ -0,0 +1,100 @@
+"""Yr API client parsing the response one location at a time."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout
+from yrwatertemperatures import WaterTemperatureData
+
+from .validation import SOURCE_API, QuarantineStats
+
+API_BASE_URL = "https://badetemperaturer.yr.no/api"
+WATER_TEMPERATURES_PATH = "/watertemperatures"
+# Source the library reports for readings without a source name
+DEFAULT_SOURCE = "Manual"
+
+
+def _parse_item(item: Any) -> WaterTemperatureData | str:
+    """Return the reading of an API item, or why it cannot be parsed."""
+    try:
+        position = item["position"]
+        time = item["time"]
+        if time is not None:
+            if type(time) is not str:
+                return "invalid_time"
+            try:
+                time = datetime.fromisoformat(time)
+            except ValueError:
+                return "invalid_time"
+        return WaterTemperatureData(
+            name=item["locationName"],
+            location_id=item["locationId"],
+            latitude=position["lat"],
+            longitude=position["lon"],
+            elevation=item["elevation"],
+            county=item["county"],
+            municipality=item["municipality"],
+            temperature=item["temperature"],
+            time=time,
+            source=item.get("sourceDisplayName", DEFAULT_SOURCE),
+        )
+    except (KeyError, TypeError, AttributeError):
+        return "missing_field"
+
+
+def parse_water_temperatures(items: Any, quarantine: QuarantineStats) -> list[WaterTemperatureData]:
+    """Parse an API response, quarantining the items that cannot be parsed.
+
+    Raises ValueError when the response is not a list of items.
+    """
+    if type(items) is not list:
+        raise ValueError(f"Unexpected Yr API response of type {type(items).__name__}")
+    records = []
+    for index, item in enumerate(items):
+        parsed = _parse_item(item)
+        if type(parsed) is str:
+            location_id = item.get("locationId") if type(item) is dict else None
+            quarantine.add(SOURCE_API, index, location_id, parsed)
+        else:
+            records.append(parsed)
+    return records
+
+
+class WaterTemperatureClient:
+    """Client fetching through the integration's session and parsing each location on its own.
+
+    Replaces the library's WaterTemperatures client, which parses the whole
+    response at once, so a single location with an unreadable time would fail
+    the refresh. Here it is quarantined instead.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        session: ClientSession,
+        quarantine: QuarantineStats,
+        timeout: ClientTimeout | None = None,
+    ) -> None:
+        """Initialize the client, with timeouts for each request instead of the session's."""
+        if not api_key:
+            raise ValueError("API key must be provided.")
+        self.base_url = API_BASE_URL
+        self.headers = {"apikey": api_key}
+        self.session = session
+        self._quarantine = quarantine
+        self._timeout = timeout
+
+    async def async_get_all_water_temperatures(self) -> list[WaterTemperatureData]:
+        """Fetch and parse the latest reading of every location."""
+        async with self.session.get(
+            f"{self.base_url}{WATER_TEMPERATURES_PATH}",
+            headers=self.headers,
+            timeout=self._timeout,
+        ) as response:
+            if response.status == 401:
+                raise PermissionError("Invalid API key")
+            response.raise_for_status()
+            items = await response.json()
+        return parse_water_temperatures(items, self._quarantine)
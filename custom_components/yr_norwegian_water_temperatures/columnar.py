@@ -0,0 +1,87 @@
+"""Columnar view of the coordinator's locations for vectorized computations.
+
+Used in all-locations mode when NumPy is available. Rows are updated only for
+the records that changed in a refresh, while the stale cutoff runs as an array
+operation over every row.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+import numpy as np
+
+from .models import WaterTemperatureRecord
+
+_DTYPE = np.dtype(
+    [
+        ("temperature", "f8"),
+        ("epoch", "f8"),
+    ]
+)
+_INITIAL_CAPACITY = 512
+
+
+def _float(value: float | None) -> float:
+    """Return value as a float, with NaN for missing values."""
+    return np.nan if value is None else float(value)
+
+
+class ColumnarLocations:
+    """Structured array of readings indexed by location ID."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._index: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._rows = np.full(_INITIAL_CAPACITY, np.nan, dtype=_DTYPE)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self._ids)
+
+    def _grow(self, needed: int) -> None:
+        """Grow the array to hold at least needed rows."""
+        capacity = len(self._rows)
+        while capacity < needed:
+            capacity *= 2
+        rows = np.full(capacity, np.nan, dtype=_DTYPE)
+        rows[: len(self._ids)] = self._rows[: len(self._ids)]
+        self._rows = rows
+
+    def update(self, records: Iterable[WaterTemperatureRecord]) -> None:
+        """Write the given records into their rows, appending new locations."""
+        for record in records:
+            row = self._index.get(record.location_id)
+            if row is None:
+                row = len(self._ids)
+                if row == len(self._rows):
+                    self._grow(row + 1)
+                self._index[record.location_id] = row
+                self._ids.append(record.location_id)
+            time = record.time
+            self._rows[row] = (
+                _float(record.temperature),
+                time.timestamp() if isinstance(time, datetime) else np.nan,
+            )
+
+    def remove(self, location_ids: Iterable[str]) -> None:
+        """Remove rows by moving the last row into each freed slot."""
+        for location_id in location_ids:
+            row = self._index.pop(location_id, None)
+            if row is None:
+                continue
+            last = len(self._ids) - 1
+            last_id = self._ids.pop()
+            if row != last:
+                self._rows[row] = self._rows[last]
+                self._ids[row] = last_id
+                self._index[last_id] = row
+            self._rows[last] = np.nan
+
+    def ids_older_than(self, cutoff: datetime) -> list[str]:
+        """Return IDs measured before the cutoff, ignoring rows without a time."""
+        epochs = self._rows["epoch"][: len(self._ids)]
+        # NaN never compares lower, so locations without a time are never stale
+        return [self._ids[row] for row in np.flatnonzero(epochs < cutoff.timestamp())]
+
@@ -2,32 +2,83 @@
 
 from __future__ import annotations
 
+import importlib
 import logging
 from typing import Any
 
 import voluptuous as vol
-from aiohttp import ClientResponseError
+from aiohttp import ClientResponseError, ClientTimeout
 from homeassistant.config_entries import ConfigFlow, OptionsFlow, ConfigEntry
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
 
-from yrwatertemperatures import WaterTemperatures
-
 from .const import (
     DOMAIN,
     DEFAULT_SCAN_INTERVAL,
     MIN_SCAN_INTERVAL,
     CONF_LOCATIONS,
     CONF_GET_ALL_LOCATIONS,
+    CONF_CATALOG_MODE,
+    DEFAULT_CATALOG_MODE,
+    CONF_DISABLE_UNSELECTED,
+    DEFAULT_DISABLE_UNSELECTED,
     CONF_ENABLE_CLEANUP,
     CONF_CLEANUP_DAYS,
     DEFAULT_ENABLE_CLEANUP,
     DEFAULT_CLEANUP_DAYS,
-    DEFAULT_GET_ALL_LOCATIONS
+    DEFAULT_GET_ALL_LOCATIONS,
+    CONF_SPATIAL_SELECTION,
+    CONF_NEAREST_COUNT,
+    CONF_RADIUS_KM,
+    CONF_CENTER_LATITUDE,
+    CONF_CENTER_LONGITUDE,
+    SPATIAL_SELECTIONS,
+    DEFAULT_SPATIAL_SELECTION,
+    DEFAULT_NEAREST_COUNT,
+    DEFAULT_RADIUS_KM,
+    CONF_COUNTIES,
+    CONF_MUNICIPALITIES,
+    CONF_ENABLE_REGION_SENSORS,
+    CONF_IMPORT_STATISTICS,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_ENABLE_REGION_SENSORS,
+    CONF_ALERT_RULES,
+    CONF_ENABLE_READINGS_EVENT,
+    CONF_WRITE_WINDOW,
+    DEFAULT_WRITE_WINDOW,
+    CONF_CACHE_MAX_ENTRIES,
+    CONF_CACHE_MAX_AGE_DAYS,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_AGE_DAYS,
+    CONF_BINARY_CACHE,
+    DEFAULT_BINARY_CACHE,
+    CONF_FETCH_TIMEOUT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_ENABLE_HEDGING,
+    CONF_HEDGE_PERCENTILE,
+    DEFAULT_FETCH_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_ENABLE_HEDGING,
+    DEFAULT_HEDGE_PERCENTILE,
+    CONF_DEDICATED_SESSION,
+    DEFAULT_DEDICATED_SESSION,
+    CONF_READINGS_EVENT_INTERVAL,
+    DEFAULT_ENABLE_READINGS_EVENT,
+    DEFAULT_READINGS_EVENT_INTERVAL,
+    CONF_ENABLE_ESTIMATE,
+    CONF_ESTIMATE_NEIGHBOURS,
+    DEFAULT_ENABLE_ESTIMATE,
+    DEFAULT_ESTIMATE_NEIGHBOURS,
 )
 
+from .alerts import parse_alert_rules
+from .session import SessionStats, create_api_session
+from .validation import QuarantineStats
+
 _LOGGER = logging.getLogger(__name__)
 
 DESCRIPTION_PLACEHOLDERS = {
@@ -55,6 +106,15 @@ def is_auth_failure(err: Exception) -> bool:
     return False
 
 
+def validate_alert_rules(value: str) -> str:
+    """Validate semicolon-separated threshold alert rules."""
+    try:
+        parse_alert_rules(value)
+    except ValueError as err:
+        raise vol.Invalid(str(err)) from err
+    return value
+
+
 def get_options_data_schema(config_entry: ConfigEntry | None) -> vol.Schema:
     """Return the options data schema for the integration."""
     options = config_entry.options if config_entry else {}
@@ -64,15 +124,104 @@ def get_options_data_schema(config_entry: ConfigEntry | None) -> vol.Schema:
                 CONF_SCAN_INTERVAL,
                 default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
             ): (vol.All(vol.Coerce(int), vol.Clamp(min=MIN_SCAN_INTERVAL))),
+            vol.Optional(
+                CONF_FETCH_TIMEOUT,
+                default=options.get(CONF_FETCH_TIMEOUT, DEFAULT_FETCH_TIMEOUT),
+            ): vol.All(vol.Coerce(float), vol.Clamp(min=1)),
+            vol.Optional(
+                CONF_CONNECT_TIMEOUT,
+                default=options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            ): vol.All(vol.Coerce(float), vol.Clamp(min=1)),
+            vol.Optional(
+                CONF_READ_TIMEOUT,
+                default=options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+            ): vol.All(vol.Coerce(float), vol.Clamp(min=1)),
+            vol.Optional(
+                CONF_ENABLE_HEDGING,
+                default=options.get(CONF_ENABLE_HEDGING, DEFAULT_ENABLE_HEDGING),
+            ): bool,
+            vol.Optional(
+                CONF_HEDGE_PERCENTILE,
+                default=options.get(CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE),
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=50, max=99)),
+            vol.Optional(
+                CONF_DEDICATED_SESSION,
+                default=options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION),
+            ): bool,
             vol.Optional(
                 CONF_GET_ALL_LOCATIONS,
                 default=options.get(
                     CONF_GET_ALL_LOCATIONS, DEFAULT_GET_ALL_LOCATIONS
                 ),
             ): bool,
+            vol.Optional(
+                CONF_CATALOG_MODE,
+                default=options.get(CONF_CATALOG_MODE, DEFAULT_CATALOG_MODE),
+            ): bool,
+            vol.Optional(
+                CONF_DISABLE_UNSELECTED,
+                default=options.get(CONF_DISABLE_UNSELECTED, DEFAULT_DISABLE_UNSELECTED),
+            ): bool,
             vol.Optional(
                 CONF_LOCATIONS, default=options.get(CONF_LOCATIONS, "")
             ): str,
+            vol.Optional(
+                CONF_COUNTIES, default=options.get(CONF_COUNTIES, "")
+            ): str,
+            vol.Optional(
+                CONF_MUNICIPALITIES, default=options.get(CONF_MUNICIPALITIES, "")
+            ): str,
+            vol.Optional(
+                CONF_SPATIAL_SELECTION,
+                default=options.get(CONF_SPATIAL_SELECTION, DEFAULT_SPATIAL_SELECTION),
+            ): vol.In(SPATIAL_SELECTIONS),
+            vol.Optional(
+                CONF_NEAREST_COUNT,
+                default=options.get(CONF_NEAREST_COUNT, DEFAULT_NEAREST_COUNT),
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=1)),
+            vol.Optional(
+                CONF_RADIUS_KM,
+                default=options.get(CONF_RADIUS_KM, DEFAULT_RADIUS_KM),
+            ): vol.All(vol.Coerce(float), vol.Clamp(min=0)),
+            vol.Optional(
+                CONF_CENTER_LATITUDE,
+                default=options.get(CONF_CENTER_LATITUDE, vol.UNDEFINED),
+            ): vol.All(vol.Coerce(float), vol.Range(min=-90, max=90)),
+            vol.Optional(
+                CONF_CENTER_LONGITUDE,
+                default=options.get(CONF_CENTER_LONGITUDE, vol.UNDEFINED),
+            ): vol.All(vol.Coerce(float), vol.Range(min=-180, max=180)),
+            vol.Optional(
+                CONF_IMPORT_STATISTICS,
+                default=options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS),
+            ): bool,
+            vol.Optional(
+                CONF_ENABLE_REGION_SENSORS,
+                default=options.get(CONF_ENABLE_REGION_SENSORS, DEFAULT_ENABLE_REGION_SENSORS),
+            ): bool,
+            vol.Optional(
+                CONF_WRITE_WINDOW,
+                default=options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW),
+            ): vol.All(vol.Coerce(float), vol.Clamp(min=0)),
+            vol.Optional(
+                CONF_ENABLE_READINGS_EVENT,
+                default=options.get(CONF_ENABLE_READINGS_EVENT, DEFAULT_ENABLE_READINGS_EVENT),
+            ): bool,
+            vol.Optional(
+                CONF_READINGS_EVENT_INTERVAL,
+                default=options.get(CONF_READINGS_EVENT_INTERVAL, DEFAULT_READINGS_EVENT_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=0)),
+            vol.Optional(
+                CONF_ALERT_RULES, default=options.get(CONF_ALERT_RULES, "")
+            ): vol.All(str, validate_alert_rules),
+            vol.Optional(
+                CONF_ENABLE_ESTIMATE,
+                default=options.get(CONF_ENABLE_ESTIMATE, DEFAULT_ENABLE_ESTIMATE),
+            ): bool,
+            vol.Optional(
+                CONF_ESTIMATE_NEIGHBOURS,
+                default=options.get(CONF_ESTIMATE_NEIGHBOURS, DEFAULT_ESTIMATE_NEIGHBOURS),
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=1)),
             vol.Optional(
                 CONF_ENABLE_CLEANUP,
                 default=options.get(CONF_ENABLE_CLEANUP, DEFAULT_ENABLE_CLEANUP),
@@ -81,6 +230,18 @@ def get_options_data_schema(config_entry: ConfigEntry | None) -> vol.Schema:
                 CONF_CLEANUP_DAYS,
                 default=options.get(CONF_CLEANUP_DAYS, DEFAULT_CLEANUP_DAYS),
             ): vol.All(vol.Coerce(int), vol.Clamp(min=1)),
+            vol.Optional(
+                CONF_CACHE_MAX_ENTRIES,
+                default=options.get(CONF_CACHE_MAX_ENTRIES, DEFAULT_CACHE_MAX_ENTRIES),
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=0)),
+            vol.Optional(
+                CONF_CACHE_MAX_AGE_DAYS,
+                default=options.get(CONF_CACHE_MAX_AGE_DAYS, DEFAULT_CACHE_MAX_AGE_DAYS),
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=0)),
+            vol.Optional(
+                CONF_BINARY_CACHE,
+                default=options.get(CONF_BINARY_CACHE, DEFAULT_BINARY_CACHE),
+            ): bool,
         }
     )
 
@@ -143,7 +304,9 @@ class YrWaterTemperaturesConfigFlow(ConfigFlow, domain=DOMAIN):
                 errors["base"] = "Missing API key"
             else:
                 try:
-                    await self.validate_api_key(api_key)
+                    await self.validate_api_key(
+                        api_key, user_input.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION)
+                    )
                 except InvalidAuth:
                     errors[CONF_API_KEY] = "Invalid API key"
                 except CannotConnect:
@@ -193,7 +356,9 @@ class YrWaterTemperaturesConfigFlow(ConfigFlow, domain=DOMAIN):
                 errors["base"] = "Missing API key"
             else:
                 try:
-                    await self.validate_api_key(api_key)
+                    await self.validate_api_key(
+                        api_key, user_input.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION)
+                    )
                 except InvalidAuth:
                     errors[CONF_API_KEY] = "Invalid API key"
                 except CannotConnect:
@@ -227,12 +392,24 @@ class YrWaterTemperaturesConfigFlow(ConfigFlow, domain=DOMAIN):
 
 
 
-    async def validate_api_key(self, api_key: str) -> None:
-        """Validate api key by making a test API call."""
+    async def validate_api_key(self, api_key: str, dedicated_session: bool = DEFAULT_DEDICATED_SESSION) -> None:
+        """Validate api key by making a test API call with the session the coordinator will use."""
+        # The API client is only needed when a key is submitted, so import it off the event loop
+        client_module = await self.hass.async_add_import_executor_job(importlib.import_module, f"{__package__}.client")
+        timeout = ClientTimeout(
+            total=DEFAULT_FETCH_TIMEOUT, connect=DEFAULT_CONNECT_TIMEOUT, sock_read=DEFAULT_READ_TIMEOUT
+        )
         try:
-            session = async_get_clientsession(self.hass)
-            client = WaterTemperatures(api_key, session)
-            await client.async_get_all_water_temperatures()
+            if dedicated_session:
+                # A dedicated session is only kept by the coordinator, so close this one once validated
+                async with create_api_session(timeout, SessionStats()) as session:
+                    client = client_module.WaterTemperatureClient(api_key, session, QuarantineStats(), timeout)
+                    await client.async_get_all_water_temperatures()
+            else:
+                client = client_module.WaterTemperatureClient(
+                    api_key, async_get_clientsession(self.hass), QuarantineStats(), timeout
+                )
+                await client.async_get_all_water_temperatures()
         except PermissionError:
             raise InvalidAuth("Invalid API key")
         except Exception as e:
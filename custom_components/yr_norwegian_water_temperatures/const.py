@@ -3,8 +3,42 @@ DOMAIN = "yr_norwegian_water_temperatures"
 
 CONF_LOCATIONS = "locations"
 CONF_GET_ALL_LOCATIONS = "get_all_locations"
+CONF_CATALOG_MODE = "catalog_mode"
+CONF_DISABLE_UNSELECTED = "disable_unselected"
+CONF_WRITE_WINDOW = "write_window"
 CONF_ENABLE_CLEANUP = "enable_cleanup"
 CONF_CLEANUP_DAYS = "cleanup_days"
+CONF_CACHE_MAX_ENTRIES = "cache_max_entries"
+CONF_CACHE_MAX_AGE_DAYS = "cache_max_age_days"
+CONF_BINARY_CACHE = "binary_cache"
+CONF_FETCH_TIMEOUT = "fetch_timeout"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_ENABLE_HEDGING = "enable_hedging"
+CONF_HEDGE_PERCENTILE = "hedge_percentile"
+CONF_DEDICATED_SESSION = "dedicated_session"
+CONF_SPATIAL_SELECTION = "spatial_selection"
+CONF_NEAREST_COUNT = "nearest_count"
+CONF_RADIUS_KM = "radius_km"
+CONF_CENTER_LATITUDE = "center_latitude"
+CONF_CENTER_LONGITUDE = "center_longitude"
+CONF_COUNTIES = "counties"
+CONF_MUNICIPALITIES = "municipalities"
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_ENABLE_REGION_SENSORS = "enable_region_sensors"
+CONF_ALERT_RULES = "alert_rules"
+CONF_ENABLE_READINGS_EVENT = "enable_readings_event"
+CONF_READINGS_EVENT_INTERVAL = "readings_event_interval"
+CONF_ENABLE_ESTIMATE = "enable_estimate"
+CONF_ESTIMATE_NEIGHBOURS = "estimate_neighbours"
+
+SPATIAL_SELECTION_NONE = "none"  # Only the configured location names or IDs
+SPATIAL_SELECTION_NEAREST = "nearest"  # The N locations closest to the center
+SPATIAL_SELECTION_RADIUS = "radius"  # All locations within a radius of the center
+SPATIAL_SELECTIONS = [SPATIAL_SELECTION_NONE, SPATIAL_SELECTION_NEAREST, SPATIAL_SELECTION_RADIUS]
+
+EVENT_THRESHOLD_CROSSED = f"{DOMAIN}_threshold_crossed"  # Fired once per refresh with all started and cleared alerts
+EVENT_READINGS_CHANGED = f"{DOMAIN}_readings_changed"  # Fired once per refresh with all changed readings
 
 STORAGE_KEY = f"{DOMAIN}_locations_cache" # Key for storing cached locations
 STORAGE_VERSION = 1 # Version of the storage format
@@ -12,5 +46,26 @@ STORAGE_VERSION = 1 # Version of the storage format
 DEFAULT_SCAN_INTERVAL = 3600  # Default update interval set to every hour
 MIN_SCAN_INTERVAL = 60  # Minimum scan interval set to every minute
 DEFAULT_GET_ALL_LOCATIONS = False  # Default value for fetching all locations
+DEFAULT_CATALOG_MODE = False  # Default to one sensor per location when getting all locations
+DEFAULT_DISABLE_UNSELECTED = False  # Default to creating every sensor enabled when getting all locations
+DEFAULT_WRITE_WINDOW = 0  # Default seconds to spread the sensor updates of a refresh over, 0 for as fast as possible
 DEFAULT_ENABLE_CLEANUP = True  # Default value for enabling cleanup
 DEFAULT_CLEANUP_DAYS = 365  # Default number of days for cleanup
+DEFAULT_CACHE_MAX_ENTRIES = 2000  # Default maximum number of cached locations, 0 for no limit
+DEFAULT_CACHE_MAX_AGE_DAYS = 90  # Default days to keep unmonitored locations without a new reading, 0 for no limit
+DEFAULT_BINARY_CACHE = False  # Default to only the JSON locations cache
+DEFAULT_FETCH_TIMEOUT = 60  # Default seconds a whole fetch may take, including a hedged request
+DEFAULT_CONNECT_TIMEOUT = 10  # Default seconds to get a connection to the API
+DEFAULT_READ_TIMEOUT = 30  # Default seconds to wait for the first byte and between chunks of the response
+DEFAULT_ENABLE_HEDGING = False  # Default to a single request per fetch
+DEFAULT_HEDGE_PERCENTILE = 95  # Default fetch latency percentile after which a second request is sent
+DEFAULT_DEDICATED_SESSION = False  # Default to the session shared with other integrations instead of an own connection pool
+DEFAULT_SPATIAL_SELECTION = SPATIAL_SELECTION_NONE  # Default to selecting locations by name or ID only
+DEFAULT_NEAREST_COUNT = 10  # Default number of nearest locations to monitor
+DEFAULT_RADIUS_KM = 25  # Default radius in km around the center
+DEFAULT_IMPORT_STATISTICS = False  # Default to statistics compiled from the sensor states
+DEFAULT_ENABLE_REGION_SENSORS = False  # Default value for the county and municipality sensors
+DEFAULT_ENABLE_READINGS_EVENT = False  # Default value for the readings changed event
+DEFAULT_READINGS_EVENT_INTERVAL = 0  # Default minimum seconds between readings changed events, 0 for every refresh
+DEFAULT_ENABLE_ESTIMATE = False  # Default value for the estimated temperature sensor
+DEFAULT_ESTIMATE_NEIGHBOURS = 5  # Default number of nearby readings used for the estimate
@@ -1,78 +1,194 @@
+from __future__ import annotations
+
+import asyncio
 import logging
+import time
+from collections.abc import Callable, Collection, Iterable, Mapping
 from datetime import timedelta, datetime
+from operator import itemgetter
+from types import MappingProxyType
 from typing import Any
 
-from aiohttp import ClientResponseError
+from aiohttp import ClientResponseError, ClientSession, ClientTimeout
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
 from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.storage import Store
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later
 from homeassistant.util import dt
 
-from yrwatertemperatures import WaterTemperatures, WaterTemperatureData
+from yrwatertemperatures import WaterTemperatureData
 
 from .const import (
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     CONF_LOCATIONS,
     CONF_GET_ALL_LOCATIONS,
+    CONF_CATALOG_MODE,
+    CONF_DISABLE_UNSELECTED,
+    DEFAULT_DISABLE_UNSELECTED,
     STORAGE_KEY,
     STORAGE_VERSION,
     CONF_ENABLE_CLEANUP,
     CONF_CLEANUP_DAYS,
+    CONF_SPATIAL_SELECTION,
+    CONF_NEAREST_COUNT,
+    CONF_RADIUS_KM,
+    CONF_CENTER_LATITUDE,
+    CONF_CENTER_LONGITUDE,
+    CONF_COUNTIES,
+    CONF_MUNICIPALITIES,
+    CONF_ENABLE_REGION_SENSORS,
+    CONF_IMPORT_STATISTICS,
+    CONF_ALERT_RULES,
+    CONF_ENABLE_READINGS_EVENT,
+    CONF_WRITE_WINDOW,
+    DEFAULT_WRITE_WINDOW,
+    CONF_CACHE_MAX_ENTRIES,
+    CONF_CACHE_MAX_AGE_DAYS,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_AGE_DAYS,
+    CONF_BINARY_CACHE,
+    DEFAULT_BINARY_CACHE,
+    CONF_FETCH_TIMEOUT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_ENABLE_HEDGING,
+    CONF_HEDGE_PERCENTILE,
+    DEFAULT_FETCH_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_ENABLE_HEDGING,
+    DEFAULT_HEDGE_PERCENTILE,
+    CONF_DEDICATED_SESSION,
+    DEFAULT_DEDICATED_SESSION,
+    CONF_READINGS_EVENT_INTERVAL,
+    EVENT_THRESHOLD_CROSSED,
+    EVENT_READINGS_CHANGED,
+    CONF_ENABLE_ESTIMATE,
+    SPATIAL_SELECTION_NONE,
+    SPATIAL_SELECTION_NEAREST,
+    DEFAULT_SPATIAL_SELECTION,
+    DEFAULT_NEAREST_COUNT,
+    DEFAULT_RADIUS_KM,
 )
+from .aggregates import CATALOG_MAX_READING_AGE, RegionAccumulator, RegionalAggregates
+from .alerts import AlertEngine, parse_alert_rules
+from .cache import CacheStats, select_evictions
+from .client import WaterTemperatureClient
+from .fetch import FetchLatency, async_hedged
+from .history import ReadingHistory
+from .index import LocationIndex
+from .models import LocationSnapshot, WaterTemperatureRecord
+from .session import SessionStats, create_api_session
+from .snapshot import read_current_snapshot, write_snapshot
+from .spatial import SpatialIndex
+from .statistics import async_import_readings
+from .validation import SOURCE_CACHE, QuarantineStats, stored_error, validate_api_records
+from .writes import WriteScheduler
+
+try:
+    from .columnar import ColumnarLocations
+except ImportError:
+    # NumPy is optional, without it the stale cutoff runs per location
+    ColumnarLocations = None
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _water_temperature_from_stored(item: WaterTemperatureData | dict[str, Any]) -> WaterTemperatureData:
-    """Convert stored location data to WaterTemperatureData."""
-    if isinstance(item, WaterTemperatureData):
-        return item
-
-    data = dict(item)
-    if isinstance(data.get("time"), str):
-        data["time"] = datetime.fromisoformat(data["time"])
-
-    return WaterTemperatureData(**data)
-
-
-def _water_temperature_to_stored(data: WaterTemperatureData) -> dict[str, Any]:
-    """Convert WaterTemperatureData to JSON-safe stored data."""
-    return {
-        "name": data.name,
-        "location_id": data.location_id,
-        "latitude": data.latitude,
-        "longitude": data.longitude,
-        "elevation": data.elevation,
-        "county": data.county,
-        "municipality": data.municipality,
-        "temperature": data.temperature,
-        "time": data.time.isoformat() if isinstance(data.time, datetime) else data.time,
-        "source": data.source,
-    }
-
-
-def _merge_locations(*location_groups: list[WaterTemperatureData]) -> list[WaterTemperatureData]:
-    """Merge locations by ID with later groups taking precedence."""
-    merged_locations: dict[str, WaterTemperatureData] = {}
-
-    for locations in location_groups:
-        for location in locations:
-            merged_locations[location.location_id] = location
-
-    return list(merged_locations.values())
-
-
-def _serialize_locations(locations: list[WaterTemperatureData]) -> list[dict[str, Any]]:
-    """Convert locations to storage format."""
-    return [_water_temperature_to_stored(location) for location in locations]
+# Stored fields preceding time and source, in WaterTemperatureRecord argument order
+_STORED_HEAD_GETTER = itemgetter(
+    "name", "location_id", "latitude", "longitude", "elevation", "county", "municipality", "temperature"
+)
 
 
-class ApiCoordinator(DataUpdateCoordinator[list[WaterTemperatureData]]):
+def _water_temperatures_from_stored(
+    items: list[dict[str, Any]], quarantine: QuarantineStats | None = None
+) -> list[WaterTemperatureRecord]:
+    """Convert stored location data to records in bulk.
+
+    Cached readings share a small set of timestamps, so each distinct timestamp
+    string is parsed once and the resulting datetime is shared between records.
+    Invalid items are skipped and counted in quarantine, so one bad item does
+    not cost the rest of the cache.
+    """
+    parsed_times: dict[str, datetime] = {}
+    records = []
+    append = records.append
+    # Positional construction avoids building a keyword dict per item
+    head = _STORED_HEAD_GETTER
+
+    for index, item in enumerate(items):
+        if (reason := stored_error(item, parsed_times)) is not None:
+            if quarantine is not None:
+                quarantine.add(SOURCE_CACHE, index, item.get("location_id") if type(item) is dict else None, reason)
+            continue
+        time = item["time"]
+        append(WaterTemperatureRecord(*head(item), parsed_times[time] if time is not None else None, item["source"]))
+    return records
+
+
+def _merge_locations(
+    locations: dict[str, WaterTemperatureRecord],
+    updates: Iterable[WaterTemperatureData],
+    previous_records: dict[str, WaterTemperatureRecord] | None = None,
+    evicted: dict[str, tuple[datetime | None, datetime]] | None = None,
+) -> list[WaterTemperatureRecord]:
+    """Merge API readings into locations by ID, keeping records whose reading is unchanged.
+
+    Returns the records that were added or replaced. The records they replaced
+    are collected in previous_records when given. Locations in evicted, mapped
+    to the time of their evicted reading and when it was evicted, stay out
+    until they report a newer one.
+    """
+    replaced = []
+    for data in updates:
+        if evicted and data.location_id in evicted:
+            if evicted[data.location_id][0] == data.time:
+                continue
+            del evicted[data.location_id]
+        record = WaterTemperatureRecord.from_api(data)
+        current = locations.get(record.location_id)
+        if current != record:
+            if current is not None and previous_records is not None:
+                previous_records[record.location_id] = current
+            locations[record.location_id] = record
+            replaced.append(record)
+    return replaced
+
+
+def _split_option(value: str | None) -> list[str]:
+    """Split a comma-separated option into its non-empty items."""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _create_columnar_locations() -> ColumnarLocations | None:
+    """Return a columnar store for vectorized computations if NumPy is available."""
+    if ColumnarLocations is None:
+        _LOGGER.debug("NumPy is not available; using per-location computations")
+        return None
+    return ColumnarLocations()
+
+
+def _serialize_locations(
+    locations: Iterable[WaterTemperatureRecord], history: Mapping[str, ReadingHistory] | None = None
+) -> list[dict[str, Any]]:
+    """Convert locations and their reading history to storage format."""
+    history = history or {}
+    serialized = []
+    for location in locations:
+        item = location.to_stored()
+        if (readings := history.get(location.location_id)) is not None:
+            item["history"] = readings.to_stored()
+        serialized.append(item)
+    return serialized
+
+
+class ApiCoordinator(DataUpdateCoordinator[LocationSnapshot]):
     """Coordinator to fetching data from the API."""
 
     def __init__(self, hass, config_entry: ConfigEntry):
@@ -81,7 +197,39 @@ class ApiCoordinator(DataUpdateCoordinator[list[WaterTemperatureData]]):
         self.api_key = config_entry.data[CONF_API_KEY]
         self.scan_interval = config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
         self._config_entry = config_entry
-        self.data: list[WaterTemperatureData]
+        self.data: LocationSnapshot
+        # Every location seen so far, including unmonitored ones, keyed by ID
+        self._locations: dict[str, WaterTemperatureRecord] = {}
+        self._cache_loaded = False
+        # Columnar mirror of self._locations, only used when monitoring all locations
+        self._columns: ColumnarLocations | None = None
+        self.spatial_index = SpatialIndex()
+        self.location_index = LocationIndex()
+        # IDs of all locations, monitored or not, that got a new reading in the last refresh
+        self.updated_location_ids: frozenset[str] = frozenset()
+        # In all-locations mode, IDs of locations whose sensor is disabled and skipped on refresh
+        self.disabled_location_ids: frozenset[str] = frozenset()
+        # In all-locations mode, IDs of the selected locations whose sensors are created enabled,
+        # None when every sensor is
+        self.selected_location_ids: frozenset[str] | None = None
+        # Per-region aggregates of the monitored locations, only kept when region sensors are enabled
+        self.region_aggregates = RegionalAggregates()
+        self.updated_regions: frozenset[tuple[str, str]] = frozenset()
+        # Aggregates of every known location, only kept in catalog mode
+        self.catalog: RegionAccumulator | None = None
+        # Threshold alerts over every location, only kept when rules are configured
+        self.alerts: AlertEngine | None = None
+        # Changed readings waiting for the next readings changed event, keyed by location ID
+        self._pending_readings: dict[str, dict[str, Any]] = {}
+        self._readings_event_fired_at: float | None = None
+        self._cancel_readings_event: Callable[[], None] | None = None
+        # Recent readings of every location, persisted with the cache
+        self.history: dict[str, ReadingHistory] = {}
+        self.cache_stats = CacheStats()
+        # Reading and eviction times of evicted locations, which the API keeps returning until they report again
+        self._evicted: dict[str, tuple[datetime | None, datetime]] = {}
+        self.fetch_latency = FetchLatency()
+        self.quarantine = QuarantineStats()
 
         super().__init__(
             hass,
@@ -90,15 +238,50 @@ class ApiCoordinator(DataUpdateCoordinator[list[WaterTemperatureData]]):
             name=DOMAIN,
             update_interval=timedelta(seconds=self.scan_interval),
         )
-        session = async_get_clientsession(hass)
-        self.client = WaterTemperatures(self.api_key, session)
+        # Sensor state writes of a refresh are written in chunks instead of all at once
+        self.write_scheduler = WriteScheduler(
+            hass, window=float(config_entry.options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW))
+        )
+        options = config_entry.options
+        # Transfer counters, only kept for the dedicated session
+        self.session_stats: SessionStats | None = None
+        self._session: ClientSession | None = None
+        # Per-phase timeouts, set on every request so they also apply with the shared session
+        timeout = ClientTimeout(
+            total=options.get(CONF_FETCH_TIMEOUT, DEFAULT_FETCH_TIMEOUT),
+            connect=options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            sock_read=options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        )
+        if options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION):
+            # Own connection pool kept alive to the API
+            self.session_stats = SessionStats()
+            self._session = create_api_session(timeout, self.session_stats)
+        self.client = WaterTemperatureClient(
+            self.api_key, self._session or async_get_clientsession(hass), self.quarantine, timeout
+        )
         self.store = Store[list[dict[str, Any]]](
             hass,
             STORAGE_VERSION,
             STORAGE_KEY)
+        # Optional binary mirror of the store for a faster warm start
+        self._snapshot_path = hass.config.path(STORAGE_DIR, f"{STORAGE_KEY}.snapshot")
+
+    async def _async_load_stored_locations(self) -> list[WaterTemperatureRecord]:
+        """Load cached locations from the binary snapshot if enabled, otherwise from storage."""
+        if self._config_entry.options.get(CONF_BINARY_CACHE, DEFAULT_BINARY_CACHE):
+            try:
+                snapshot = await self.hass.async_add_executor_job(
+                    read_current_snapshot, self._snapshot_path, self.store.path
+                )
+            except (OSError, ValueError) as err:
+                _LOGGER.warning("Failed to load the binary water temperature cache, using the JSON cache: %s", err)
+            else:
+                if snapshot is not None:
+                    stored_locations, history = snapshot
+                    self.history.update(history)
+                    _LOGGER.debug("Loaded %s locations from the binary snapshot", len(stored_locations))
+                    return stored_locations
 
-    async def _async_load_stored_locations(self) -> list[WaterTemperatureData]:
-        """Load cached locations from storage."""
         try:
             stored_data = await self.store.async_load()
         except Exception as err:
@@ -109,60 +292,398 @@ class ApiCoordinator(DataUpdateCoordinator[list[WaterTemperatureData]]):
             return []
 
         try:
-            stored_locations = [_water_temperature_from_stored(item) for item in stored_data]
+            stored_locations = _water_temperatures_from_stored(stored_data, self.quarantine)
         except Exception as err:
             _LOGGER.warning("Failed to deserialize cached water temperatures: %s", err)
             return []
+        if self.quarantine.cache:
+            _LOGGER.warning(
+                "Ignored %s invalid cached locations: %s", self.quarantine.cache, dict(self.quarantine.reasons)
+            )
+
+        for item in stored_data:
+            if type(item) is dict and item.get("history"):
+                try:
+                    self.history[item["location_id"]] = ReadingHistory.from_stored(item["history"])
+                except (TypeError, ValueError) as err:
+                    _LOGGER.debug("Ignoring invalid history of %s: %s", item["location_id"], err)
 
         _LOGGER.debug("Loaded %s locations from storage", len(stored_locations))
         return stored_locations
 
+    @property
+    def locations(self) -> Mapping[str, WaterTemperatureRecord]:
+        """Return every known location, including unmonitored ones, keyed by ID."""
+        return MappingProxyType(self._locations)
+
+    def selection_center(self) -> tuple[float, float]:
+        """Return the configured center for spatial selection, defaulting to home."""
+        options = self._config_entry.options
+        latitude = options.get(CONF_CENTER_LATITUDE)
+        longitude = options.get(CONF_CENTER_LONGITUDE)
+        if latitude is None or longitude is None:
+            return self.hass.config.latitude, self.hass.config.longitude
+        return latitude, longitude
+
+    def _spatially_selected_ids(self) -> set[str]:
+        """Return the location IDs picked by the configured spatial selection."""
+        options = self._config_entry.options
+        mode = options.get(CONF_SPATIAL_SELECTION, DEFAULT_SPATIAL_SELECTION)
+        if mode == SPATIAL_SELECTION_NONE:
+            return set()
+
+        latitude, longitude = self.selection_center()
+        if mode == SPATIAL_SELECTION_NEAREST:
+            count = int(options.get(CONF_NEAREST_COUNT, DEFAULT_NEAREST_COUNT))
+            matches = self.spatial_index.nearest(latitude, longitude, count)
+        else:
+            radius_km = float(options.get(CONF_RADIUS_KM, DEFAULT_RADIUS_KM))
+            matches = self.spatial_index.within(latitude, longitude, radius_km)
+        return {location_id for _distance, location_id in matches}
+
+    def _selected_ids(self) -> set[str]:
+        """Return the IDs of the locations selected by name, ID, region or distance."""
+        options = self._config_entry.options
+        # Resolve the selection through the indexes instead of scanning every location
+        return (
+            self.location_index.ids_for_names(_split_option(options.get(CONF_LOCATIONS)))
+            | self.location_index.counties.lookup(_split_option(options.get(CONF_COUNTIES)))
+            | self.location_index.municipalities.lookup(_split_option(options.get(CONF_MUNICIPALITIES)))
+            | self._spatially_selected_ids()
+        )
+
+    def _all_locations_with_sensors(self) -> bool:
+        """Return True when every location gets a sensor."""
+        options = self._config_entry.options
+        return options.get(CONF_GET_ALL_LOCATIONS, False) and not options.get(CONF_CATALOG_MODE, False)
+
+    def _update_disabled_location_ids(self) -> None:
+        """Look up the locations whose sensor is disabled, from this entry's registry index."""
+        if not self._all_locations_with_sensors():
+            self.disabled_location_ids = frozenset()
+            return
+        entries = er.async_entries_for_config_entry(er.async_get(self.hass), self._config_entry.entry_id)
+        self.disabled_location_ids = frozenset(entry.unique_id for entry in entries if entry.disabled_by is not None)
+
+    def _enabled(self, records: Iterable[WaterTemperatureRecord]) -> Iterable[WaterTemperatureRecord]:
+        """Return the records of locations whose sensor is not disabled."""
+        disabled = self.disabled_location_ids
+        if not disabled:
+            return records
+        return [record for record in records if record.location_id not in disabled]
+
     async def _async_filter_locations(
-        self, locations: list[WaterTemperatureData]
-    ) -> list[WaterTemperatureData]:
+        self, locations: dict[str, WaterTemperatureRecord]
+    ) -> dict[str, WaterTemperatureRecord]:
         """Filter locations based on current config options."""
-        get_all_locations = self._config_entry.options.get(CONF_GET_ALL_LOCATIONS, False)
-        monitored_locations_config = self._config_entry.options.get(CONF_LOCATIONS, None)
-
-        if not monitored_locations_config and not get_all_locations:
+        options = self._config_entry.options
+        get_all_locations = options.get(CONF_GET_ALL_LOCATIONS, False)
+        monitored_locations_list = _split_option(options.get(CONF_LOCATIONS))
+        counties = _split_option(options.get(CONF_COUNTIES))
+        municipalities = _split_option(options.get(CONF_MUNICIPALITIES))
+        spatial_selection = options.get(CONF_SPATIAL_SELECTION, DEFAULT_SPATIAL_SELECTION)
+
+        if (
+            not get_all_locations
+            and not monitored_locations_list
+            and not counties
+            and not municipalities
+            and spatial_selection == SPATIAL_SELECTION_NONE
+        ):
+            if self._config_entry.options.get(CONF_ENABLE_ESTIMATE, False):
+                # Only the estimated temperature sensor is wanted
+                return {}
             _LOGGER.warning("No monitored locations configured and not set to get all locations.")
-            return []
-
-        if get_all_locations:
-            return locations
-
-        monitored_locations_list = [
-            str(loc).strip().lower()
-            for loc in monitored_locations_config.split(',')
-            if loc.strip()
-        ]
-        monitored_data = [
-            loc for loc in locations
-            if str(loc.location_id).lower() in monitored_locations_list
-            or loc.name.lower() in monitored_locations_list
-        ]
-
-        unmonitored_ids = [loc.location_id for loc in locations if loc not in monitored_data]
+            return {}
+
+        if self._all_locations_with_sensors():
+            if options.get(CONF_DISABLE_UNSELECTED, DEFAULT_DISABLE_UNSELECTED):
+                self.selected_location_ids = frozenset(self._selected_ids())
+            # Locations of disabled sensors stay in the snapshot, so region
+            # aggregates cover every monitored location
+            return dict(locations)
+
+        selected_ids = self._selected_ids()
+        monitored_data = {
+            location_id: locations[location_id]
+            for location_id in sorted(selected_ids)
+            if location_id in locations
+        }
+
+        unmonitored_ids = [location_id for location_id in locations if location_id not in monitored_data]
         if unmonitored_ids:
             await self.cleanup_old_entities(unmonitored_ids)
 
         return monitored_data
 
     async def _async_cleanup_stale_locations(
-        self, locations: list[WaterTemperatureData]
-    ) -> list[WaterTemperatureData]:
+        self, locations: dict[str, WaterTemperatureRecord]
+    ) -> dict[str, WaterTemperatureRecord]:
         """Remove locations that are too old when cleanup is enabled."""
         if not self._config_entry.options.get(CONF_ENABLE_CLEANUP, False):
             return locations
 
         cleanup_days = self._config_entry.options.get(CONF_CLEANUP_DAYS, 365)
         cutoff_date = dt.now().astimezone() - timedelta(days=cleanup_days)
-        to_remove = [loc for loc in locations if loc.time is not None and loc.time < cutoff_date]
+        if self._columns is not None:
+            to_remove = [
+                location_id for location_id in self._columns.ids_older_than(cutoff_date)
+                if location_id in locations
+            ]
+        else:
+            to_remove = [
+                location_id for location_id, loc in locations.items()
+                if loc.time is not None and loc.time < cutoff_date
+            ]
         if not to_remove:
             return locations
 
-        await self.cleanup_old_entities([loc.location_id for loc in to_remove])
-        return [loc for loc in locations if loc not in to_remove]
+        await self.cleanup_old_entities(to_remove)
+        for location_id in to_remove:
+            del locations[location_id]
+        return locations
+
+    async def _async_fetch(self) -> list[WaterTemperatureData]:
+        """Fetch all water temperatures within the total timeout, hedging slow requests when enabled."""
+        options = self._config_entry.options
+        delay = None
+        if options.get(CONF_ENABLE_HEDGING, DEFAULT_ENABLE_HEDGING):
+            delay = self.fetch_latency.hedge_delay(options.get(CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE))
+
+        if self.session_stats is not None:
+            self.session_stats.start_refresh()
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(options.get(CONF_FETCH_TIMEOUT, DEFAULT_FETCH_TIMEOUT)):
+                locations, hedge_won = await async_hedged(
+                    lambda: self.client.async_get_all_water_temperatures(), delay
+                )
+        except TimeoutError:
+            self.fetch_latency.timeouts += 1
+            raise
+        elapsed = time.monotonic() - start
+        self.fetch_latency.record(elapsed)
+        if delay is not None and elapsed >= delay:
+            self.fetch_latency.hedged += 1
+            self.fetch_latency.hedge_wins += hedge_won
+        if self.session_stats is not None:
+            transfer = self.session_stats.refresh
+            _LOGGER.debug(
+                "Fetched %d bytes (%d decompressed, %s) in %d requests, %d on a reused connection",
+                transfer.compressed_bytes,
+                transfer.decompressed_bytes,
+                transfer.content_encoding,
+                transfer.requests,
+                transfer.connections_reused,
+            )
+        return locations
+
+    async def _async_save_snapshot(self) -> None:
+        """Write the binary snapshot of the cache when enabled."""
+        if not self._config_entry.options.get(CONF_BINARY_CACHE, DEFAULT_BINARY_CACHE):
+            return
+        try:
+            await self.hass.async_add_executor_job(
+                write_snapshot, self._snapshot_path, list(self._locations.values()), dict(self.history)
+            )
+        except OSError as err:
+            _LOGGER.warning("Failed to save the binary water temperature cache: %s", err)
+
+    def _evict_locations(self, pinned: Collection[str]) -> None:
+        """Evict unmonitored locations beyond the configured cache age and size."""
+        options = self._config_entry.options
+        max_age_days = options.get(CONF_CACHE_MAX_AGE_DAYS, DEFAULT_CACHE_MAX_AGE_DAYS)
+        now = dt.now().astimezone()
+        expired, overflow = select_evictions(
+            self._locations,
+            pinned,
+            int(options.get(CONF_CACHE_MAX_ENTRIES, DEFAULT_CACHE_MAX_ENTRIES)),
+            timedelta(days=max_age_days) if max_age_days else None,
+            now,
+        )
+        evicted = expired + overflow
+        if evicted:
+            for location_id in evicted:
+                self._evicted[location_id] = (self._locations[location_id].time, now)
+            self._remove_locations(evicted)
+            _LOGGER.debug("Evicted %s unmonitored locations from the cache", len(evicted))
+
+        # Forget evictions older than the cache age, so locations the API stops returning do not pile up
+        forget_before = now - timedelta(days=max_age_days or DEFAULT_CACHE_MAX_AGE_DAYS)
+        for location_id in [
+            location_id for location_id, (_, evicted_at) in self._evicted.items() if evicted_at < forget_before
+        ]:
+            del self._evicted[location_id]
+
+        stats = self.cache_stats
+        stats.size = len(self._locations)
+        stats.pinned = len(pinned)
+        stats.evicted_expired += len(expired)
+        stats.evicted_overflow += len(overflow)
+        stats.last_evicted = len(evicted)
+
+    def _remove_locations(self, location_ids: list[str]) -> None:
+        """Remove locations from the cache and everything derived from it."""
+        for location_id in location_ids:
+            del self._locations[location_id]
+            self.history.pop(location_id, None)
+            self._pending_readings.pop(location_id, None)
+            if self.catalog is not None:
+                self.catalog.discard(location_id)
+        self.spatial_index.remove(location_ids)
+        self.location_index.remove(location_ids)
+        if self._columns is not None:
+            self._columns.remove(location_ids)
+        if self.alerts is not None:
+            self.alerts.remove(location_ids)
+
+    def _record_history(self, records: Iterable[WaterTemperatureRecord]) -> None:
+        """Add new readings to the history and set the trend values of their records."""
+        for record in records:
+            if record.temperature is None or not isinstance(record.time, datetime):
+                continue
+            if (history := self.history.get(record.location_id)) is None:
+                history = self.history[record.location_id] = ReadingHistory()
+            history.append(record.time.timestamp(), float(record.temperature))
+            record.trend_per_day = history.trend_per_day()
+            record.change_24h = history.change()
+
+    def _create_alert_engine(self) -> AlertEngine | None:
+        """Return an alert engine for the configured rules, if any."""
+        try:
+            rules = parse_alert_rules(self._config_entry.options.get(CONF_ALERT_RULES))
+        except ValueError as err:
+            _LOGGER.warning("Ignoring invalid alert rules: %s", err)
+            return None
+        return AlertEngine(rules) if rules else None
+
+    def _evaluate_alerts(self, records: Iterable[WaterTemperatureRecord], fire_event: bool = True) -> None:
+        """Evaluate the alert rules against new readings and fire one event for all crossings."""
+        if self.alerts is None:
+            return
+        crossings = self.alerts.evaluate(records, self.selection_center())
+        if crossings and fire_event:
+            self.hass.bus.async_fire(
+                EVENT_THRESHOLD_CROSSED,
+                {"entry_id": self._config_entry.entry_id, "crossings": crossings},
+            )
+
+    def _queue_readings_event(
+        self, records: Iterable[WaterTemperatureRecord], previous_records: Mapping[str, WaterTemperatureRecord]
+    ) -> None:
+        """Add changed readings to the next readings changed event and fire it unless rate limited."""
+        options = self._config_entry.options
+        if not options.get(CONF_ENABLE_READINGS_EVENT, False):
+            return
+        for record in records:
+            pending = self._pending_readings.get(record.location_id)
+            if pending is not None:
+                # Keep the delta relative to the reading before the first pending change
+                start = pending["_start"]
+            else:
+                previous = previous_records.get(record.location_id)
+                start = previous.temperature if previous is not None else None
+            self._pending_readings[record.location_id] = {
+                "location_id": record.location_id,
+                "temperature": record.temperature,
+                "time": record.time.isoformat() if isinstance(record.time, datetime) else record.time,
+                "delta": (
+                    round(record.temperature - start, 2)
+                    if record.temperature is not None and start is not None else None
+                ),
+                "_start": start,
+            }
+        if not self._pending_readings or self._cancel_readings_event is not None:
+            return
+
+        interval = float(options.get(CONF_READINGS_EVENT_INTERVAL, 0))
+        elapsed = time.monotonic() - self._readings_event_fired_at if self._readings_event_fired_at else None
+        if not interval or elapsed is None or elapsed >= interval:
+            self._fire_readings_event()
+        else:
+            self._cancel_readings_event = async_call_later(
+                self.hass, interval - elapsed, self._async_fire_delayed_readings_event
+            )
+
+    async def _async_fire_delayed_readings_event(self, _now: datetime) -> None:
+        """Fire the rate limited readings changed event."""
+        self._cancel_readings_event = None
+        self._fire_readings_event()
+
+    def _fire_readings_event(self) -> None:
+        """Fire one event with every pending changed reading."""
+        readings = [
+            {key: value for key, value in reading.items() if key != "_start"}
+            for reading in self._pending_readings.values()
+        ]
+        self._pending_readings = {}
+        self._readings_event_fired_at = time.monotonic()
+        self.hass.bus.async_fire(
+            EVENT_READINGS_CHANGED, {"entry_id": self._config_entry.entry_id, "readings": readings}
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, coalescing the sensor state writes they request."""
+        with self.write_scheduler.batch():
+            super().async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Cancel a pending readings changed event and queued state writes and close the session on shutdown."""
+        if self._cancel_readings_event is not None:
+            self._cancel_readings_event()
+            self._cancel_readings_event = None
+        self.write_scheduler.async_cancel()
+        await super().async_shutdown()
+        if self._session is not None:
+            await self._session.close()
+
+    def _update_catalog(self, location_ids: Iterable[str]) -> None:
+        """Apply new readings to the catalog aggregates and drop readings that have become too old.
+
+        Runs after the columnar store is updated, so its times are current.
+        """
+        if self.catalog is None:
+            return
+        cutoff = dt.now().astimezone() - CATALOG_MAX_READING_AGE
+        for location_id in location_ids:
+            record = self._locations.get(location_id)
+            if record is None or record.temperature is None or record.time is None or record.time < cutoff:
+                self.catalog.discard(location_id)
+            else:
+                self.catalog.set(location_id, float(record.temperature))
+        # Readings age without a refresh of their location
+        if self._columns is not None:
+            expired = self._columns.ids_older_than(cutoff)
+        else:
+            expired = [
+                location_id for location_id, record in self._locations.items()
+                if record.time is not None and record.time < cutoff
+            ]
+        for location_id in expired:
+            self.catalog.discard(location_id)
+
+    def _async_import_statistics(self, records: Iterable[WaterTemperatureRecord], backfill: bool = False) -> None:
+        """Import new readings, or with backfill every hour in their history, into long-term statistics when enabled."""
+        if not self._config_entry.options.get(CONF_IMPORT_STATISTICS, False):
+            return
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.debug("Recorder is not loaded; skipping the statistics import")
+            return
+        imported = async_import_readings(self.hass, records, self.history, backfill)
+        _LOGGER.debug("Queued statistics import for %s locations", imported)
+
+    def _set_snapshot(
+        self,
+        locations: dict[str, WaterTemperatureRecord],
+        previous: LocationSnapshot | None,
+        changed_candidates: Iterable[str] | None,
+    ) -> LocationSnapshot:
+        """Publish a new snapshot and apply its changes to the region aggregates."""
+        self.data = LocationSnapshot.from_previous(locations, previous, changed_candidates)
+        if self._config_entry.options.get(CONF_ENABLE_REGION_SENSORS, False):
+            self.updated_regions = frozenset(self.region_aggregates.apply(self.data))
+        return self.data
 
     def _iter_exception_chain(self, err: Exception):
         """Yield an exception and its causes for classification."""
@@ -187,26 +708,75 @@ class ApiCoordinator(DataUpdateCoordinator[list[WaterTemperatureData]]):
         # Get all entity IDs for the domain
         entities = er.async_entries_for_config_entry(entity_registry, self._config_entry.entry_id)
 
+        location_ids = set(location_ids)
         for entity in entities:
             if entity.unique_id in location_ids:
                 entity_registry.async_remove(entity.entity_id)
                 _LOGGER.debug(f"Removed entity: {entity.entity_id}")
 
 
-    async def _async_update_data(self) -> list[WaterTemperatureData]:
+    async def _async_update_data(self) -> LocationSnapshot:
         """Fetch data from the API."""
-        stored_locations = await self._async_load_stored_locations()
-        current_locations = getattr(self, "data", []) or []
-        fallback_locations = current_locations or stored_locations
+        self.updated_location_ids = frozenset()
+        self.updated_regions = frozenset()
+        self._update_disabled_location_ids()
+        if not self._cache_loaded:
+            # The cache only needs to be read once, later refreshes work on the in-memory locations
+            self._cache_loaded = True
+            for location in await self._async_load_stored_locations():
+                self._locations.setdefault(location.location_id, location)
+            if self._config_entry.options.get(CONF_GET_ALL_LOCATIONS, False):
+                self._columns = _create_columnar_locations()
+                if self._config_entry.options.get(CONF_CATALOG_MODE, False):
+                    self.catalog = RegionAccumulator()
+            if self._columns is not None:
+                self._columns.update(self._locations.values())
+            self.spatial_index.update(self._locations.values())
+            self.location_index.update(self._locations.values())
+            self.updated_location_ids = frozenset(self._locations)
+            self._record_history(self._enabled(self._locations.values()))
+            self._update_catalog(self._locations)
+            # Alerts already active at startup set the initial state without firing events
+            self.alerts = self._create_alert_engine()
+            self._evaluate_alerts(self._locations.values(), fire_event=False)
+            # Import the cached history again, for hours whose import was lost on
+            # shutdown or that were read before the import was enabled
+            self._async_import_statistics(self._enabled(self._locations.values()), backfill=True)
+
+        previous = getattr(self, "data", None)
         try:
             # Fetch water temperatures and merge existing data not in the API response
-            updated_locations = await self.client.async_get_all_water_temperatures()
-            merged_locations = _merge_locations(stored_locations, current_locations, updated_locations)
-            filtered_locations = await self._async_filter_locations(merged_locations)
+            self.quarantine.start_refresh()
+            updated_locations = validate_api_records(await self._async_fetch(), self.quarantine)
+            if self.quarantine.last_refresh:
+                _LOGGER.warning("Ignored %s invalid locations from the API", self.quarantine.last_refresh)
+            previous_records: dict[str, WaterTemperatureRecord] = {}
+            replaced_locations = _merge_locations(
+                self._locations, updated_locations, previous_records, self._evicted
+            )
+            # Disabled sensors keep their cached reading but get no history or statistics
+            enabled_locations = self._enabled(replaced_locations)
+            self._record_history(enabled_locations)
+            self.spatial_index.update(replaced_locations)
+            self.location_index.update(replaced_locations)
+            self.updated_location_ids |= {location.location_id for location in replaced_locations}
+            self._async_import_statistics(enabled_locations)
+            # The first refresh only sets the initial alert state
+            self._evaluate_alerts(replaced_locations, fire_event=previous is not None)
+            if self._columns is not None:
+                self._columns.update(replaced_locations)
+            self._update_catalog(location.location_id for location in replaced_locations)
+
+            filtered_locations = await self._async_filter_locations(self._locations)
             filtered_locations = await self._async_cleanup_stale_locations(filtered_locations)
+            self._evict_locations(filtered_locations.keys())
 
-            self.data = filtered_locations
-            await self.store.async_save(_serialize_locations(merged_locations))
+            # Every record that differs in any field was replaced, including region and name changes
+            self._set_snapshot(filtered_locations, previous, [location.location_id for location in replaced_locations])
+            if previous is not None:
+                self._queue_readings_event(replaced_locations, previous_records)
+            await self.store.async_save(_serialize_locations(self._locations.values(), self.history))
+            await self._async_save_snapshot()
 
             return self.data
 
@@ -216,9 +786,14 @@ class ApiCoordinator(DataUpdateCoordinator[list[WaterTemperatureData]]):
             if self._is_auth_failure(err):
                 raise ConfigEntryAuthFailed("Invalid API key") from err
 
-            if fallback_locations:
-                filtered_fallback = await self._async_filter_locations(fallback_locations)
-                self.data = filtered_fallback
+            if self._locations:
+                if self.alerts is not None:
+                    # No readings were evaluated, so no alert sensor has changed
+                    self.alerts.changed_rules = frozenset()
+                self._update_catalog(())
+                filtered_fallback = await self._async_filter_locations(self._locations)
+                # No record was replaced, so only locations entering or leaving the filters change
+                self._set_snapshot(filtered_fallback, previous, ())
                 _LOGGER.warning(
                     "Yr API update failed; using %s cached water temperature readings: %s",
                     len(filtered_fallback),
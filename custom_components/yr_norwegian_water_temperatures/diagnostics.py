@@ -0,0 +1,29 @@
+"""Diagnostics support for the Yr Norwegian Water Temperatures integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from . import YrNorwegianWaterTemperaturesConfigEntry
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: YrNorwegianWaterTemperaturesConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = config_entry.runtime_data.coordinator
+    return {
+        "data": async_redact_data(dict(config_entry.data), TO_REDACT),
+        "options": dict(config_entry.options),
+        "monitored_locations": len(coordinator.data) if coordinator.data else 0,
+        "cache": coordinator.cache_stats.as_dict(),
+        "fetch_latency": coordinator.fetch_latency.as_dict(),
+        "quarantine": coordinator.quarantine.as_dict(),
+        "session": coordinator.session_stats.as_dict() if coordinator.session_stats else None,
+    }
@@ -0,0 +1,54 @@
+"""Inverse-distance and recency weighted water temperature estimate."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from .models import WaterTemperatureRecord
+from .spatial import SpatialIndex
+
+MIN_DISTANCE_KM = 0.1  # Readings closer than this count as being at the location
+DISTANCE_POWER = 2  # Inverse-distance weighting exponent
+RECENCY_HALF_LIFE = timedelta(hours=24)  # Weight of a reading halves for every day of age
+MAX_READING_AGE = timedelta(days=7)  # Older readings are not used for the estimate
+CANDIDATE_FACTOR = 4  # Neighbours to consider per wanted neighbour, to skip old readings
+
+
+def nearest_recent_readings(
+    index: SpatialIndex,
+    locations: dict[str, WaterTemperatureRecord],
+    latitude: float,
+    longitude: float,
+    count: int,
+    now: datetime,
+) -> list[tuple[float, WaterTemperatureRecord]]:
+    """Return up to count (distance_km, record) pairs of the closest usable readings."""
+    readings = []
+    for distance, location_id in index.nearest(latitude, longitude, count * CANDIDATE_FACTOR):
+        record = locations.get(location_id)
+        if record is None or record.temperature is None or record.time is None:
+            continue
+        if now - record.time > MAX_READING_AGE:
+            continue
+        readings.append((distance, record))
+        if len(readings) == count:
+            break
+    return readings
+
+
+def weighted_estimate(
+    readings: list[tuple[float, WaterTemperatureRecord]], now: datetime
+) -> float | None:
+    """Return the inverse-distance and recency weighted mean temperature."""
+    total_weight = 0.0
+    weighted_sum = 0.0
+    half_life = RECENCY_HALF_LIFE.total_seconds()
+    for distance, record in readings:
+        age = max(0.0, (now - record.time).total_seconds())
+        weight = 0.5 ** (age / half_life) / max(distance, MIN_DISTANCE_KM) ** DISTANCE_POWER
+        total_weight += weight
+        weighted_sum += weight * record.temperature
+
+    if not total_weight:
+        return None
+    return round(weighted_sum / total_weight, 1)
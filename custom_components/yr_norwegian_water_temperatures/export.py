@@ -0,0 +1,240 @@
+"""Streaming export of readings and reading history to a file."""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from itertools import batched
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = [FORMAT_NDJSON, FORMAT_CSV, FORMAT_PARQUET]
+
+EXPORT_CHUNK_SIZE = 500  # Locations prepared and written per executor job
+READ_SIZE = 65536  # Characters read at a time when streaming a storage file
+MAX_ITEM_SIZE = 16 * READ_SIZE  # Largest stored location decoded when streaming a storage file
+
+# Columns of the flat formats, one row per reading
+COLUMNS = (
+    "location_id", "name", "county", "municipality", "latitude", "longitude", "elevation", "source",
+    "time", "temperature",
+)
+
+# A location in storage format and its history as (timestamp, temperature) pairs, if exported
+type ExportItem = tuple[dict[str, Any], list[list[float]] | None]
+
+
+def _rows(item: ExportItem) -> Iterator[tuple[Any, ...]]:
+    """Yield one flat row per reading, the history if exported, otherwise the current reading."""
+    stored, history = item
+    location = tuple(stored[column] for column in COLUMNS[:-2])
+    if history:
+        for timestamp, temperature in history:
+            yield (*location, datetime.fromtimestamp(timestamp, UTC), temperature)
+    else:
+        time = stored["time"]
+        yield (*location, datetime.fromisoformat(time) if time else None, stored["temperature"])
+
+
+def iter_storage_items(path: str) -> Iterator[Any]:
+    """Yield the items of the data list of a Home Assistant storage file, decoding one at a time.
+
+    Only the item being decoded and one read buffer are held in memory. Nothing
+    is yielded when the file does not exist. Raises ValueError for a file that
+    is not a storage file.
+    """
+    decoder = json.JSONDecoder()
+    try:
+        file = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with file:
+        buffer = ""
+        position = 0
+
+        def skip_whitespace() -> str:
+            """Skip whitespace, reading more as needed, and return the next character or "" at the end."""
+            nonlocal buffer, position
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if not (more := file.read(READ_SIZE)):
+                    return ""
+                buffer, position = more, 0
+
+        def expect(characters: str) -> str:
+            """Consume and return the next character, which must be one of characters."""
+            nonlocal position
+            character = skip_whitespace()
+            if not character or character not in characters:
+                raise ValueError(f"Expected one of {characters!r} at {position} in {path}")
+            position += 1
+            return character
+
+        def decode() -> Any:
+            """Decode the next value, reading more until it is complete."""
+            nonlocal buffer, position
+            skip_whitespace()
+            while True:
+                try:
+                    value, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # A malformed item would otherwise read the rest of the file into memory
+                    if len(buffer) - position > MAX_ITEM_SIZE or not (more := file.read(READ_SIZE)):
+                        raise
+                    buffer, position = buffer[position:] + more, 0
+                else:
+                    return value
+
+        expect("{")
+        if skip_whitespace() == "}":
+            return
+        while True:
+            key = decode()
+            expect(":")
+            if key != "data":
+                decode()
+            else:
+                expect("[")
+                if skip_whitespace() == "]":
+                    position += 1
+                else:
+                    while True:
+                        yield decode()
+                        if expect(",]") == "]":
+                            break
+            if expect(",}") == "}":
+                return
+
+
+class _NdjsonWriter:
+    """One JSON object per location, with its history nested."""
+
+    def __init__(self, path: str) -> None:
+        """Open the file."""
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, items: Iterable[ExportItem]) -> int:
+        """Write a chunk of locations and return the number of lines written."""
+        lines = []
+        for stored, history in items:
+            if history is not None:
+                stored = {**stored, "history": history}
+            lines.append(json.dumps(stored, ensure_ascii=False) + "\n")
+        self._file.writelines(lines)
+        return len(lines)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class _CsvWriter:
+    """One row per reading."""
+
+    def __init__(self, path: str) -> None:
+        """Open the file and write the header."""
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, items: Iterable[ExportItem]) -> int:
+        """Write a chunk of locations and return the number of rows written."""
+        rows = [
+            (*row[:-2], row[-2].isoformat() if row[-2] else None, row[-1])
+            for item in items
+            for row in _rows(item)
+        ]
+        self._writer.writerows(rows)
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class _ParquetWriter:
+    """One row per reading, written as one row group per chunk."""
+
+    def __init__(self, path: str) -> None:
+        """Open the file with the export schema."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            *((column, pa.string()) for column in ("location_id", "name", "county", "municipality")),
+            *((column, pa.float64()) for column in ("latitude", "longitude", "elevation")),
+            ("source", pa.string()),
+            ("time", pa.timestamp("us", tz="UTC")),
+            ("temperature", pa.float64()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, items: Iterable[ExportItem]) -> int:
+        """Write a chunk of locations and return the number of rows written."""
+        rows = [row for item in items for row in _rows(item)]
+        columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(column, type=field.type) for column, field in zip(columns, self._schema)],
+            schema=self._schema,
+        ))
+        return len(rows)
+
+    def close(self) -> None:
+        """Write the footer and close the file."""
+        self._writer.close()
+
+
+_WRITERS = {FORMAT_NDJSON: _NdjsonWriter, FORMAT_CSV: _CsvWriter, FORMAT_PARQUET: _ParquetWriter}
+
+
+def parquet_available() -> bool:
+    """Return True if pyarrow is installed."""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def async_export(
+    hass: HomeAssistant,
+    path: str,
+    export_format: str,
+    items: Iterable[ExportItem],
+    blocking_items: bool = False,
+) -> dict[str, int]:
+    """Write items to path chunk by chunk in the executor, replacing the file only when complete.
+
+    Items are pulled from the iterable one chunk at a time, so memory stays
+    bounded by the chunk size however many locations there are. They are
+    pulled in the event loop, or in the executor when blocking_items is set
+    because the iterable does file I/O.
+    """
+    temporary = f"{path}.tmp"
+    writer = await hass.async_add_executor_job(_WRITERS[export_format], temporary)
+    chunks = batched(items, EXPORT_CHUNK_SIZE)
+    locations = rows = 0
+    try:
+        while chunk := (
+            await hass.async_add_executor_job(next, chunks, None) if blocking_items else next(chunks, None)
+        ):
+            rows += await hass.async_add_executor_job(writer.write, chunk)
+            locations += len(chunk)
+    except BaseException:
+        await hass.async_add_executor_job(writer.close)
+        await hass.async_add_executor_job(os.remove, temporary)
+        raise
+    await hass.async_add_executor_job(writer.close)
+    await hass.async_add_executor_job(os.replace, temporary, path)
+    return {"locations": locations, "rows": rows}
@@ -0,0 +1,89 @@
+"""Fetch latency tracking and hedged requests."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+LATENCY_SAMPLES = 100  # Recent fetch latencies kept for the percentiles
+MIN_HEDGE_SAMPLES = 10  # Fetches needed before the hedge delay is trusted
+
+
+class FetchLatency:
+    """Latency percentiles of recent fetches and counters of hedges and timeouts."""
+
+    def __init__(self, size: int = LATENCY_SAMPLES) -> None:
+        """Initialize without samples."""
+        self._samples: deque[float] = deque(maxlen=size)
+        self.hedged = 0  # Fetches that sent a second request
+        self.hedge_wins = 0  # Hedged fetches answered by the second request
+        self.timeouts = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a successful fetch."""
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the recent latencies in seconds."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+    def hedge_delay(self, percent: float) -> float | None:
+        """Return how long to wait before hedging, or None until enough fetches are known."""
+        if len(self._samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return self.percentile(percent)
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        """Return the percentiles and counters."""
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+        }
+
+
+async def async_hedged[T](fetch: Callable[[], Awaitable[T]], delay: float | None) -> tuple[T, bool]:
+    """Run fetch, and run it a second time if the first has not finished after delay seconds.
+
+    Returns the first successful result and whether the second request won.
+    A failure only counts once both requests have failed. The request that
+    loses is cancelled and awaited.
+    """
+    first = asyncio.ensure_future(fetch())
+    tasks = [first]
+    pending = {first}
+    try:
+        if delay is None:
+            return await first, False
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result(), False
+
+        second = asyncio.ensure_future(fetch())
+        tasks.append(second)
+        pending.add(second)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if (error := task.exception()) is None:
+                    return task.result(), task is second
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        # Wait for the cancelled request and retrieve any failure of the request that lost
+        await asyncio.gather(*tasks, return_exceptions=True)
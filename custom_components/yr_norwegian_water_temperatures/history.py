@@ -0,0 +1,139 @@
+"""Fixed-size in-memory reading history per location with incremental trends."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+
+HISTORY_SIZE = 48  # Readings kept per location
+SECONDS_PER_DAY = 86400.0
+DELTA_PERIOD = 24 * 3600.0  # Period of the change attribute, in seconds
+
+
+class ReadingHistory:
+    """Ring buffer of the last readings of one location.
+
+    Times and temperatures live in two preallocated arrays of doubles, so memory
+    is bounded by the buffer size. The sums behind the least-squares trend are
+    updated as readings enter and leave the buffer instead of refitting the
+    whole buffer, and recomputed exactly every time the buffer wraps around.
+    """
+
+    __slots__ = ("_times", "_values", "_next", "_count", "_origin", "_sum_t", "_sum_v", "_sum_tt", "_sum_tv")
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Initialize an empty buffer holding up to size readings."""
+        self._times = array("d", bytes(8 * size))
+        self._values = array("d", bytes(8 * size))
+        self._next = 0
+        self._count = 0
+        # Reference time of the trend sums, keeping them small for numerical accuracy
+        self._origin = 0.0
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of readings in the buffer."""
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        """Iterate over (timestamp, temperature) pairs, oldest first."""
+        size = len(self._times)
+        start = (self._next - self._count) % size
+        for offset in range(self._count):
+            index = (start + offset) % size
+            yield self._times[index], self._values[index]
+
+    @property
+    def full(self) -> bool:
+        """Return True when the oldest readings are being dropped for new ones."""
+        return self._count == len(self._times)
+
+    @property
+    def latest_time(self) -> float | None:
+        """Return the timestamp of the newest reading."""
+        return self._times[self._next - 1] if self._count else None
+
+    def _add_to_sums(self, timestamp: float, value: float, sign: float) -> None:
+        """Add or remove a reading from the trend sums."""
+        t = (timestamp - self._origin) / SECONDS_PER_DAY
+        self._sum_t += sign * t
+        self._sum_v += sign * value
+        self._sum_tt += sign * t * t
+        self._sum_tv += sign * t * value
+
+    def _recompute_sums(self) -> None:
+        """Recompute the trend sums from the buffer to drop accumulated rounding errors."""
+        readings = list(self)
+        self._origin = readings[0][0] if readings else 0.0
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+        for timestamp, value in readings:
+            self._add_to_sums(timestamp, value, 1.0)
+
+    def append(self, timestamp: float, temperature: float) -> bool:
+        """Add a reading newer than the latest one, returning False if it is not newer."""
+        if self._count and timestamp <= self._times[self._next - 1]:
+            return False
+        if not self._count:
+            self._origin = timestamp
+
+        size = len(self._times)
+        if self._count == size:
+            self._add_to_sums(self._times[self._next], self._values[self._next], -1.0)
+        else:
+            self._count += 1
+        self._times[self._next] = timestamp
+        self._values[self._next] = temperature
+        self._add_to_sums(timestamp, temperature, 1.0)
+        self._next = (self._next + 1) % size
+        if self._next == 0:
+            self._recompute_sums()
+        return True
+
+    def trend_per_day(self) -> float | None:
+        """Return the least-squares slope of the readings in degrees per day."""
+        if self._count < 2:
+            return None
+        denominator = self._count * self._sum_tt - self._sum_t ** 2
+        if denominator <= 0:
+            return None
+        return (self._count * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+    def change(self, period: float = DELTA_PERIOD) -> float | None:
+        """Return the change since the newest reading at least period seconds older than the latest."""
+        if self._count < 2:
+            return None
+        size = len(self._times)
+        latest = self._next - 1
+        cutoff = self._times[latest] - period
+        for offset in range(1, self._count):
+            index = (latest - offset) % size
+            if self._times[index] <= cutoff:
+                return self._values[latest] - self._values[index]
+        return None
+
+    def to_stored(self) -> list[list[float]]:
+        """Convert the buffer to JSON-safe stored data."""
+        return [[timestamp, value] for timestamp, value in self]
+
+    @classmethod
+    def from_stored(cls, items: Iterable[Iterable[float]], size: int = HISTORY_SIZE) -> ReadingHistory:
+        """Create a buffer from stored data, keeping the newest readings."""
+        history = cls(size)
+        for timestamp, value in items:
+            history.append(float(timestamp), float(value))
+        return history
+
+    @classmethod
+    def from_sorted(
+        cls, times: Sequence[float], values: Sequence[float], size: int = HISTORY_SIZE
+    ) -> ReadingHistory:
+        """Create a buffer from readings already sorted oldest first, keeping the newest ones."""
+        history = cls(size)
+        count = min(len(times), size)
+        if count:
+            history._times[:count] = array("d", times[len(times) - count:])
+            history._values[:count] = array("d", values[len(values) - count:])
+            history._count = count
+            history._next = count % size
+            history._recompute_sums()
+        return history
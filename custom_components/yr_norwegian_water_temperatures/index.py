@@ -0,0 +1,101 @@
+"""Inverted indexes from names and regions to location IDs."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from .models import WaterTemperatureRecord
+
+
+def _key(value: str | None) -> str | None:
+    """Return the case-insensitive lookup key for a name."""
+    return value.strip().lower() if value else None
+
+
+class _InvertedIndex:
+    """Map from a lookup key to the set of location IDs having that key."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._ids_by_key: dict[str, set[str]] = {}
+        self._key_by_id: dict[str, str] = {}
+        self._display_names: dict[str, str] = {}
+
+    def set(self, location_id: str, value: str | None) -> None:
+        """Set the value for a location, moving it between keys if needed."""
+        key = _key(value)
+        previous = self._key_by_id.get(location_id)
+        if previous == key:
+            return
+        if previous is not None:
+            self.discard(location_id)
+        if key is not None:
+            self._key_by_id[location_id] = key
+            self._ids_by_key.setdefault(key, set()).add(location_id)
+            self._display_names.setdefault(key, value.strip())
+
+    def discard(self, location_id: str) -> None:
+        """Remove a location from the index."""
+        key = self._key_by_id.pop(location_id, None)
+        if key is None:
+            return
+        members = self._ids_by_key[key]
+        members.discard(location_id)
+        if not members:
+            del self._ids_by_key[key]
+            del self._display_names[key]
+
+    def lookup(self, values: Iterable[str]) -> set[str]:
+        """Return the IDs of locations matching any of the values."""
+        ids: set[str] = set()
+        for value in values:
+            ids |= self._ids_by_key.get(_key(value), set())
+        return ids
+
+    def names(self) -> list[str]:
+        """Return the display names of all keys, sorted."""
+        return sorted(self._display_names.values())
+
+
+class LocationIndex:
+    """Indexes resolving configured names, IDs, counties and municipalities.
+
+    Kept up to date incrementally as readings are merged, so resolving the
+    monitored locations is a set of lookups rather than a scan of every location.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty indexes."""
+        self._ids: dict[str, str] = {}
+        self.names = _InvertedIndex()
+        self.counties = _InvertedIndex()
+        self.municipalities = _InvertedIndex()
+
+    def __len__(self) -> int:
+        """Return the number of indexed locations."""
+        return len(self._ids)
+
+    def update(self, records: Iterable[WaterTemperatureRecord]) -> None:
+        """Add records or move them to their new name and region."""
+        for record in records:
+            self._ids[_key(str(record.location_id))] = record.location_id
+            self.names.set(record.location_id, record.name)
+            self.counties.set(record.location_id, record.county)
+            self.municipalities.set(record.location_id, record.municipality)
+
+    def remove(self, location_ids: Iterable[str]) -> None:
+        """Remove locations from the indexes."""
+        for location_id in location_ids:
+            self._ids.pop(_key(str(location_id)), None)
+            self.names.discard(location_id)
+            self.counties.discard(location_id)
+            self.municipalities.discard(location_id)
+
+    def ids_for_names(self, values: Iterable[str]) -> set[str]:
+        """Return the IDs of locations whose ID or name matches any value."""
+        values = list(values)
+        ids = self.names.lookup(values)
+        for value in values:
+            if (location_id := self._ids.get(_key(value))) is not None:
+                ids.add(location_id)
+        return ids
@@ -0,0 +1,215 @@
+"""Internal data model for the Yr Norwegian Water Temperatures integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, KeysView
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from yrwatertemperatures import WaterTemperatureData
+
+
+class WaterTemperatureRecord:
+    """Reading for a single location.
+
+    Records are treated as immutable once created: a new reading replaces the
+    record, so the coordinator, its snapshot and the sensors can all share the
+    same instance without copying. The coordinator sets the trend values from
+    the reading history right after creating a record, before it is shared.
+    """
+
+    __slots__ = (
+        "name",
+        "location_id",
+        "latitude",
+        "longitude",
+        "elevation",
+        "county",
+        "municipality",
+        "temperature",
+        "time",
+        "source",
+        "trend_per_day",
+        "change_24h",
+        "_attributes",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        location_id: str,
+        latitude: float | None,
+        longitude: float | None,
+        elevation: int | None,
+        county: str | None,
+        municipality: str | None,
+        temperature: float | None,
+        time: datetime | None,
+        source: str | None,
+    ) -> None:
+        """Initialize the record."""
+        self.name = name
+        self.location_id = location_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation = elevation
+        self.county = county
+        self.municipality = municipality
+        self.temperature = temperature
+        self.time = time
+        self.source = source
+        self.trend_per_day: float | None = None
+        self.change_24h: float | None = None
+        self._attributes: dict[str, Any] | None = None
+
+    @classmethod
+    def from_api(cls, data: WaterTemperatureData) -> WaterTemperatureRecord:
+        """Create a record from the API client's data class."""
+        return cls(
+            data.name,
+            data.location_id,
+            data.latitude,
+            data.longitude,
+            data.elevation,
+            data.county,
+            data.municipality,
+            data.temperature,
+            data.time,
+            data.source,
+        )
+
+    def to_stored(self) -> dict[str, Any]:
+        """Convert the record to JSON-safe stored data."""
+        return {
+            "name": self.name,
+            "location_id": self.location_id,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "elevation": self.elevation,
+            "county": self.county,
+            "municipality": self.municipality,
+            "temperature": self.temperature,
+            "time": self.time.isoformat() if isinstance(self.time, datetime) else self.time,
+            "source": self.source,
+        }
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the sensor state attributes, built on first use and shared."""
+        if self._attributes is None:
+            self._attributes = {
+                "location_id": self.location_id,
+                "latitude": self.latitude,
+                "longitude": self.longitude,
+                "elevation": self.elevation,
+                "county": self.county,
+                "municipality": self.municipality,
+                "source": self.source,
+                "time": self.time.isoformat() if self.time else None,
+            }
+            if self.trend_per_day is not None:
+                self._attributes["trend_per_day"] = round(self.trend_per_day, 2)
+            if self.change_24h is not None:
+                self._attributes["change_24h"] = round(self.change_24h, 1)
+        return self._attributes
+
+    def _key(self) -> tuple[Any, ...]:
+        """Return the values that identify this reading."""
+        return (
+            self.name,
+            self.location_id,
+            self.latitude,
+            self.longitude,
+            self.elevation,
+            self.county,
+            self.municipality,
+            self.temperature,
+            self.time,
+            self.source,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if other holds the same reading."""
+        if not isinstance(other, WaterTemperatureRecord):
+            return NotImplemented
+        return self is other or self._key() == other._key()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return f"WaterTemperatureRecord({self.location_id!r}, {self.name!r}, {self.temperature!r}, {self.time!r})"
+
+
+class LocationSnapshot:
+    """Read-only view of the monitored locations after a refresh.
+
+    One snapshot is shared by the coordinator and all of its entities. It also
+    records which locations changed or disappeared compared to the previous one.
+    """
+
+    __slots__ = ("_records", "changed_ids", "removed_ids")
+
+    def __init__(
+        self,
+        records: dict[str, WaterTemperatureRecord] | None = None,
+        changed_ids: frozenset[str] = frozenset(),
+        removed_ids: frozenset[str] = frozenset(),
+    ) -> None:
+        """Initialize the snapshot, taking ownership of records."""
+        self._records = records if records is not None else {}
+        self.changed_ids = changed_ids
+        self.removed_ids = removed_ids
+
+    @classmethod
+    def from_previous(
+        cls,
+        records: dict[str, WaterTemperatureRecord],
+        previous: LocationSnapshot | None,
+        changed_candidates: Iterable[str] | None = None,
+    ) -> LocationSnapshot:
+        """Create a snapshot with the changes compared to the previous snapshot.
+
+        When the caller already knows which locations got new readings, it can
+        pass them as changed_candidates to avoid comparing every record.
+        """
+        if previous is None:
+            return cls(records, frozenset(records))
+
+        previous_records = previous._records
+        if changed_candidates is None:
+            changed_ids = frozenset(
+                location_id for location_id, record in records.items()
+                if previous_records.get(location_id) is not record
+            )
+        else:
+            changed_ids = frozenset(
+                location_id for location_id in changed_candidates if location_id in records
+            ) | (records.keys() - previous_records.keys())
+        removed_ids = frozenset(previous_records.keys() - records.keys())
+        return cls(records, changed_ids, removed_ids)
+
+    def get(self, location_id: str) -> WaterTemperatureRecord | None:
+        """Return the record for a location ID if present."""
+        return self._records.get(location_id)
+
+    def ids(self) -> KeysView[str]:
+        """Return the location IDs in the snapshot."""
+        return self._records.keys()
+
+    def __contains__(self, location_id: object) -> bool:
+        """Return True if the location ID is in the snapshot."""
+        return location_id in self._records
+
+    def __iter__(self) -> Iterator[WaterTemperatureRecord]:
+        """Iterate over the records."""
+        return iter(self._records.values())
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self._records)
+
+    def __bool__(self) -> bool:
+        """Return True if the snapshot holds any records."""
+        return bool(self._records)
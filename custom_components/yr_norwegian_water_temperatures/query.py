@@ -0,0 +1,138 @@
+"""Ad-hoc queries over every cached location, answered from the coordinator indexes."""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from .index import LocationIndex
+from .models import WaterTemperatureRecord
+from .spatial import SpatialIndex, haversine_km
+
+SORT_TEMPERATURE = "temperature"
+SORT_DISTANCE = "distance"
+SORT_TIME = "time"
+SORT_NAME = "name"
+SORT_KEYS = [SORT_TEMPERATURE, SORT_DISTANCE, SORT_TIME, SORT_NAME]
+
+ORDER_ASCENDING = "asc"
+ORDER_DESCENDING = "desc"
+ORDERS = [ORDER_ASCENDING, ORDER_DESCENDING]
+# Warmest and most recent first, closest and alphabetical first
+DEFAULT_ORDERS = {
+    SORT_TEMPERATURE: ORDER_DESCENDING,
+    SORT_DISTANCE: ORDER_ASCENDING,
+    SORT_TIME: ORDER_DESCENDING,
+    SORT_NAME: ORDER_ASCENDING,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class LocationQuery:
+    """Filters, sort order and limit of a location query."""
+
+    latitude: float
+    longitude: float
+    counties: tuple[str, ...] = ()
+    municipalities: tuple[str, ...] = ()
+    radius_km: float | None = None
+    min_temperature: float | None = None
+    max_temperature: float | None = None
+    max_age: timedelta | None = None
+    sort_by: str = SORT_TEMPERATURE
+    order: str | None = None
+    limit: int = 10
+
+
+def _sort_key(sort_by: str, distance: Callable[[WaterTemperatureRecord], float]) -> Callable[[WaterTemperatureRecord], Any]:
+    """Return a sort key putting records without a value last in either order."""
+    if sort_by == SORT_DISTANCE:
+        return distance
+    if sort_by == SORT_NAME:
+        return lambda record: record.name.casefold()
+    attribute = "temperature" if sort_by == SORT_TEMPERATURE else "time"
+    return lambda record: getattr(record, attribute)
+
+
+def run_query(
+    query: LocationQuery,
+    locations: Mapping[str, WaterTemperatureRecord],
+    location_index: LocationIndex,
+    spatial_index: SpatialIndex,
+    now: datetime,
+) -> list[dict[str, Any]]:
+    """Return the locations matching a query as JSON-compatible dicts.
+
+    Region and radius filters are answered from the indexes, so only their
+    candidates are scanned for the temperature and recency filters.
+    """
+    candidates: set[str] | None = None
+    distances: dict[str, float] = {}
+
+    def narrow(ids: set[str]) -> None:
+        nonlocal candidates
+        candidates = ids if candidates is None else candidates & ids
+
+    if query.counties:
+        narrow(location_index.counties.lookup(query.counties))
+    if query.municipalities:
+        narrow(location_index.municipalities.lookup(query.municipalities))
+    if query.radius_km is not None:
+        distances = {
+            location_id: distance
+            for distance, location_id in spatial_index.within(query.latitude, query.longitude, query.radius_km)
+        }
+        narrow(set(distances))
+
+    cutoff = now - query.max_age if query.max_age is not None else None
+    records = []
+    for location_id in (candidates if candidates is not None else locations.keys()):
+        record = locations.get(location_id)
+        if record is None:
+            continue
+        temperature = record.temperature
+        if query.min_temperature is not None and (temperature is None or temperature < query.min_temperature):
+            continue
+        if query.max_temperature is not None and (temperature is None or temperature > query.max_temperature):
+            continue
+        if cutoff is not None and (record.time is None or record.time < cutoff):
+            continue
+        records.append(record)
+
+    def distance(record: WaterTemperatureRecord) -> float:
+        """Return the distance to the query center, computing it on demand."""
+        if record.location_id not in distances:
+            if record.latitude is None or record.longitude is None:
+                distances[record.location_id] = float("inf")
+            else:
+                distances[record.location_id] = haversine_km(
+                    query.latitude, query.longitude, record.latitude, record.longitude
+                )
+        return distances[record.location_id]
+
+    # Records without a value for the sort key are only used to fill up the limit
+    key = _sort_key(query.sort_by, distance)
+    sortable = [record for record in records if key(record) is not None]
+    order = query.order or DEFAULT_ORDERS[query.sort_by]
+    select = heapq.nlargest if order == ORDER_DESCENDING else heapq.nsmallest
+    selected = select(query.limit, sortable, key=key)
+    if len(selected) < query.limit:
+        selected += [record for record in records if key(record) is None][: query.limit - len(selected)]
+
+    return [
+        {
+            "location_id": record.location_id,
+            "name": record.name,
+            "temperature": record.temperature,
+            "time": record.time.isoformat() if record.time else None,
+            "county": record.county,
+            "municipality": record.municipality,
+            "latitude": record.latitude,
+            "longitude": record.longitude,
+            "distance_km": None if distance(record) == float("inf") else round(distance(record), 2),
+        }
+        for record in selected
+    ]
@@ -1,25 +1,43 @@
 """Sensor definition for the Yr Norwegian Water Temperatures integration."""
 
+import asyncio
 import logging
+from collections.abc import Iterable
+from itertools import islice
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass, SensorDeviceClass
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt
 
-from yrwatertemperatures import WaterTemperatureData
-
-from custom_components.yr_norwegian_water_temperatures import (
-    RuntimeData,
-    YrNorwegianWaterTemperaturesConfigEntry,
+from . import RuntimeData, YrNorwegianWaterTemperaturesConfigEntry
+from .aggregates import RegionSummary
+from .const import (
+    CONF_ENABLE_REGION_SENSORS,
+    CONF_IMPORT_STATISTICS,
+    CONF_ENABLE_ESTIMATE,
+    CONF_ESTIMATE_NEIGHBOURS,
+    DEFAULT_ENABLE_REGION_SENSORS,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_ENABLE_ESTIMATE,
+    DEFAULT_ESTIMATE_NEIGHBOURS,
 )
-from custom_components.yr_norwegian_water_temperatures.coordinator import ApiCoordinator
+from .coordinator import ApiCoordinator
+from .estimate import nearest_recent_readings, weighted_estimate
+from .models import WaterTemperatureRecord
 
 _LOGGER = logging.getLogger(__name__)
 
+CATALOG_MEAN = "mean"
+CATALOG_WARMEST = "warmest"
+CATALOG_SENSOR_KINDS = (CATALOG_MEAN, CATALOG_WARMEST)
+
+ENTITY_CHUNK_SIZE = 500  # Sensors created and added per event loop iteration during setup
+
 if TYPE_CHECKING:
     class _CoordinatorEntityBase:
         """Type-checking shim for CoordinatorEntity."""
@@ -42,44 +60,78 @@ async def async_setup_entry(
 
     coordinator = config_entry.runtime_data.coordinator
 
+    if config_entry.options.get(CONF_ENABLE_ESTIMATE, DEFAULT_ENABLE_ESTIMATE):
+        neighbours = config_entry.options.get(CONF_ESTIMATE_NEIGHBOURS, DEFAULT_ESTIMATE_NEIGHBOURS)
+        async_add_entities([EstimatedWaterTemperatureSensor(coordinator, config_entry.entry_id, neighbours)])
+
+    if coordinator.catalog is not None:
+        async_add_entities([
+            CatalogWaterTemperatureSensor(coordinator, config_entry.entry_id, kind) for kind in CATALOG_SENSOR_KINDS
+        ])
+
     if not coordinator.data:
+        if coordinator.catalog is not None:
+            # Catalog mode without pinned locations only has the summary sensors
+            return
         _LOGGER.warning("No water temperature data available. Ensure the API is configured correctly.")
         return
 
-    sensors = [
-        WaterTemperatureSensor(coordinator, data)
-        for data in coordinator.data
-        if isinstance(data, WaterTemperatureData)
-    ]
+    # Imported statistics replace the ones the recorder would compile from the sensor states
+    record_statistics = not config_entry.options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS)
+    region_sensors_enabled = config_entry.options.get(CONF_ENABLE_REGION_SENSORS, DEFAULT_ENABLE_REGION_SENSORS)
+    known_regions: set[tuple[str, str]] = set()
 
-    async_add_entities(sensors)
+    def _new_region_sensors() -> list[RegionalWaterTemperatureSensor]:
+        """Return sensors for regions that do not have one yet."""
+        if not region_sensors_enabled:
+            return []
+        new_regions = [region for region in coordinator.region_aggregates.regions() if region not in known_regions]
+        known_regions.update(new_regions)
+        return [
+            RegionalWaterTemperatureSensor(coordinator, config_entry.entry_id, level, name)
+            for level, name in new_regions
+        ]
 
     # Since the API only returns the locations that have been changed recently, we need to
     # look for new sensors that might not be in the initial data and add them dynamically.
-    # We will keep track of the known unique IDs to avoid duplicates.
-    # Then register a listener to add new sensors when the coordinator updates.
-    known_unique_ids = set()
-    entity_registry = async_get_entity_registry(hass)
+    # We will keep track of the known unique IDs to avoid duplicates, using the registry
+    # index of this config entry instead of scanning every entity of every integration.
+    # Sensors disabled in the registry are never added by Home Assistant, so they are not
+    # created at all. Enabling one reloads the config entry, which creates it then.
+    registry_entries = er.async_entries_for_config_entry(er.async_get(hass), config_entry.entry_id)
+    known_unique_ids = {entry.unique_id for entry in registry_entries}
+    disabled_unique_ids = {entry.unique_id for entry in registry_entries if entry.disabled_by is not None}
 
-    for entity in entity_registry.entities.values():
-        if entity.config_entry_id == config_entry.entry_id:
-            known_unique_ids.add(entity.unique_id)
+    def _location_sensors(records: Iterable[WaterTemperatureRecord]) -> Iterable[SensorEntity]:
+        """Lazily create sensors for the records, skipping disabled ones."""
+        # With all locations, new sensors of locations that are not selected are registered disabled
+        selected = coordinator.selected_location_ids
+        for record in records:
+            known_unique_ids.add(record.location_id)
+            if record.location_id not in disabled_unique_ids:
+                yield WaterTemperatureSensor(
+                    coordinator, record, record_statistics, selected is None or record.location_id in selected
+                )
 
+    sensors = _location_sensors(coordinator.data)
+    while chunk := list(islice(sensors, ENTITY_CHUNK_SIZE)):
+        async_add_entities(chunk)
+        # Let the event loop run between chunks when setting up thousands of locations
+        await asyncio.sleep(0)
+    if region_sensors := _new_region_sensors():
+        async_add_entities(region_sensors)
 
+    # Then register a listener to add new sensors when the coordinator updates.
     def _async_add_new_sensors():
         """Add new sensors to HA."""
-        new_sensors = [
-            WaterTemperatureSensor(coordinator, data)
-            for data in coordinator.data
-            if isinstance(data, WaterTemperatureData) and data.location_id not in known_unique_ids
-        ]
+        new_sensors: list[SensorEntity] = list(_location_sensors(
+            record for record in coordinator.data if record.location_id not in known_unique_ids
+        ))
+        new_sensors.extend(_new_region_sensors())
 
         if new_sensors:
             async_add_entities(new_sensors)
             _LOGGER.debug("Adding new water temperature sensors: %s", [sensor.name for sensor in new_sensors])
-            # Update the set of known IDs
-            for sensor in new_sensors:
-                known_unique_ids.add(sensor.unique_id)
 
     coordinator_listener = coordinator.async_add_listener(_async_add_new_sensors)
 
@@ -95,43 +147,196 @@ class WaterTemperatureSensor(_CoordinatorEntityBase, SensorEntity):
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
     _attr_state_class = SensorStateClass.MEASUREMENT
+    # Location metadata never changes between readings and the trends are derived from
+    # the readings, so they are kept out of the recorder database
+    _unrecorded_attributes = frozenset({
+        "location_id", "latitude", "longitude", "elevation", "county", "municipality", "source",
+        "trend_per_day", "change_24h",
+    })
 
-    def __init__(self, coordinator: ApiCoordinator, data: WaterTemperatureData):
+    def __init__(
+        self,
+        coordinator: ApiCoordinator,
+        record: WaterTemperatureRecord,
+        record_statistics: bool = True,
+        enabled_default: bool = True,
+    ):
         """Initialize the water temperature sensor."""
         super().__init__(coordinator)
-        self._data = data
-        self._attr_unique_id = data.location_id
-        self._update_from_data(data)
-
-    def _update_from_data(self, data: WaterTemperatureData) -> None:
-        """Update the sensor from new coordinator data."""
-        self._data = data
-        self._attr_name = data.name
-        self._attr_native_value = data.temperature
+        self._attr_unique_id = record.location_id
+        self._attr_entity_registry_enabled_default = enabled_default
+        if not record_statistics:
+            self._attr_state_class = None
+        self._written_available = True
+        self._update_from_record(record)
+
+    def _update_from_record(self, record: WaterTemperatureRecord) -> None:
+        """Point the sensor at a new record from the coordinator."""
+        self._record = record
+        self._attr_name = record.name
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the water temperature of the current record."""
+        return self._record.temperature
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the attributes shared with the current record."""
+        return self._record.attributes
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write a new state only for a new reading or an availability change."""
+        # Unchanged readings keep their record, so a different record means a new reading
+        record = self.coordinator.data.get(self._attr_unique_id)
+        new_reading = record is not None and record is not self._record
+        if new_reading:
+            self._update_from_record(record)
+        if new_reading or self.available != self._written_available:
+            self._written_available = self.available
+            self.coordinator.write_scheduler.schedule(self)
+
+
+class EstimatedWaterTemperatureSensor(_CoordinatorEntityBase, SensorEntity):
+    """Water temperature at the configured center, estimated from nearby readings."""
+
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_name = "Estimated water temperature"
+
+    def __init__(self, coordinator: ApiCoordinator, entry_id: str, neighbours: int):
+        """Initialize the estimated water temperature sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry_id}_estimate"
+        self._neighbours = neighbours
+        self._neighbour_ids: tuple[str, ...] = ()
+        self._written_available = True
+        self._update_estimate()
+
+    def _update_estimate(self) -> bool:
+        """Recompute the estimate, returning True if its inputs changed."""
+        latitude, longitude = self.coordinator.selection_center()
+        now = dt.now()
+        readings = nearest_recent_readings(
+            self.coordinator.spatial_index,
+            self.coordinator.locations,
+            latitude,
+            longitude,
+            self._neighbours,
+            now,
+        )
+        neighbour_ids = tuple(record.location_id for _distance, record in readings)
+        if neighbour_ids == self._neighbour_ids and self.coordinator.updated_location_ids.isdisjoint(neighbour_ids):
+            return False
+
+        self._neighbour_ids = neighbour_ids
+        self._attr_native_value = weighted_estimate(readings, now)
+        self._attr_extra_state_attributes = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "neighbours": [
+                {"location_id": record.location_id, "name": record.name, "distance_km": round(distance, 2)}
+                for distance, record in readings
+            ],
+        }
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write a new state only when one of the nearby readings or availability changed."""
+        if self._update_estimate() or self.available != self._written_available:
+            self._written_available = self.available
+            self.async_write_ha_state()
+
+
+class RegionalWaterTemperatureSensor(_CoordinatorEntityBase, SensorEntity):
+    """Mean water temperature of the monitored locations in a county or municipality."""
+
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: ApiCoordinator, entry_id: str, level: str, region: str):
+        """Initialize the regional water temperature sensor."""
+        super().__init__(coordinator)
+        self._region = (level, region)
+        self._attr_unique_id = f"{entry_id}_{level}_{region.lower()}"
+        self._attr_name = f"{region} {level} water temperature"
+        self._written_available = True
+        self._update_from_summary(coordinator.region_aggregates.summary(level, region))
+
+    def _update_from_summary(self, summary: RegionSummary) -> None:
+        """Set the state and attributes from the region aggregates."""
+        self._summary = summary
+        warmest = self.coordinator.data.get(summary.warmest_location_id) if summary.warmest_location_id else None
+        self._attr_native_value = summary.mean
         self._attr_extra_state_attributes = {
-            "location_id": data.location_id,
-            "latitude": data.latitude,
-            "longitude": data.longitude,
-            "elevation": data.elevation,
-            "county": data.county,
-            "municipality": data.municipality,
-            "source": data.source,
-            "time": data.time.isoformat() if data.time else None,
+            "count": summary.count,
+            "min": summary.minimum,
+            "max": summary.maximum,
+            "warmest_location_id": summary.warmest_location_id,
+            "warmest_location": warmest.name if warmest else None,
         }
 
-    def _get_coordinator_data(self) -> WaterTemperatureData | None:
-        """Return this sensor's data from the coordinator if present."""
-        return next(
-            (
-                data for data in self.coordinator.data or []
-                if isinstance(data, WaterTemperatureData) and data.location_id == self._attr_unique_id
-            ),
-            None
-        )
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write a new state only when the region aggregates or availability changed."""
+        changed = False
+        if self._region in self.coordinator.updated_regions:
+            summary = self.coordinator.region_aggregates.summary(*self._region)
+            if summary != self._summary:
+                self._update_from_summary(summary)
+                changed = True
+        if changed or self.available != self._written_available:
+            self._written_available = self.available
+            self.async_write_ha_state()
+
+
+class CatalogWaterTemperatureSensor(_CoordinatorEntityBase, SensorEntity):
+    """Summary of every known location, used in catalog mode instead of a sensor per location."""
+
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: ApiCoordinator, entry_id: str, kind: str):
+        """Initialize the catalog summary sensor."""
+        super().__init__(coordinator)
+        self._kind = kind
+        self._attr_unique_id = f"{entry_id}_catalog_{kind}"
+        self._attr_name = "Mean water temperature" if kind == CATALOG_MEAN else "Warmest water temperature"
+        self._written_available = True
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = {}
+        self._update_from_summary(coordinator.catalog.summary())
+
+    def _update_from_summary(self, summary: RegionSummary) -> bool:
+        """Set the state and attributes from the catalog aggregates, returning True if they changed."""
+        if self._kind == CATALOG_MEAN:
+            value = summary.mean
+            attributes = {"count": summary.count, "min": summary.minimum, "max": summary.maximum}
+        else:
+            value = summary.maximum
+            warmest = self.coordinator.locations.get(summary.warmest_location_id) if summary.warmest_location_id else None
+            attributes = {
+                "location_id": summary.warmest_location_id,
+                "name": warmest.name if warmest else None,
+                "county": warmest.county if warmest else None,
+                "municipality": warmest.municipality if warmest else None,
+            }
+        if value == self._attr_native_value and attributes == self._attr_extra_state_attributes:
+            return False
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        return True
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        if data := self._get_coordinator_data():
-            self._update_from_data(data)
-        self.async_write_ha_state()
+        """Write a new state only when the summary or availability changed."""
+        # Read the summary on every refresh, as aged readings leave the catalog without a new reading
+        changed = self._update_from_summary(self.coordinator.catalog.summary())
+        if changed or self.available != self._written_available:
+            self._written_available = self.available
+            self.async_write_ha_state()
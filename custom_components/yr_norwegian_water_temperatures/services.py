@@ -0,0 +1,206 @@
+"""Services for the Yr Norwegian Water Temperatures integration."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from datetime import timedelta
+from functools import partial
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt
+
+from .const import DOMAIN
+from .export import (
+    EXPORT_FORMATS,
+    FORMAT_NDJSON,
+    FORMAT_PARQUET,
+    ExportItem,
+    async_export,
+    iter_storage_items,
+    parquet_available,
+)
+from .query import ORDERS, SORT_KEYS, SORT_TEMPERATURE, LocationQuery, run_query
+from .validation import stored_error
+
+SERVICE_QUERY = "query"
+SERVICE_EXPORT = "export"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_COUNTIES = "counties"
+ATTR_MUNICIPALITIES = "municipalities"
+ATTR_RADIUS_KM = "radius_km"
+ATTR_MIN_TEMPERATURE = "min_temperature"
+ATTR_MAX_TEMPERATURE = "max_temperature"
+ATTR_MAX_AGE_HOURS = "max_age_hours"
+ATTR_SORT_BY = "sort_by"
+ATTR_ORDER = "order"
+ATTR_LIMIT = "limit"
+ATTR_FORMAT = "format"
+ATTR_SOURCE = "source"
+ATTR_INCLUDE_HISTORY = "include_history"
+ATTR_FILENAME = "filename"
+
+SOURCE_MEMORY = "memory"  # The coordinator's current in-memory locations
+SOURCE_CACHE = "cache"  # The locations cache as last saved to storage
+EXPORT_SOURCES = [SOURCE_MEMORY, SOURCE_CACHE]
+EXPORT_DIR = DOMAIN  # Directory in the config directory that exports are written to
+
+DEFAULT_QUERY_LIMIT = 10
+MAX_QUERY_LIMIT = 1000
+
+QUERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_COUNTIES): vol.All(cv.ensure_list_csv, [cv.string]),
+        vol.Optional(ATTR_MUNICIPALITIES): vol.All(cv.ensure_list_csv, [cv.string]),
+        vol.Inclusive(ATTR_LATITUDE, "center"): cv.latitude,
+        vol.Inclusive(ATTR_LONGITUDE, "center"): cv.longitude,
+        vol.Optional(ATTR_RADIUS_KM): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(ATTR_MIN_TEMPERATURE): vol.Coerce(float),
+        vol.Optional(ATTR_MAX_TEMPERATURE): vol.Coerce(float),
+        vol.Optional(ATTR_MAX_AGE_HOURS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(ATTR_SORT_BY, default=SORT_TEMPERATURE): vol.In(SORT_KEYS),
+        vol.Optional(ATTR_ORDER): vol.In(ORDERS),
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_QUERY_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_QUERY_LIMIT)
+        ),
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_NDJSON): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_SOURCE, default=SOURCE_MEMORY): vol.In(EXPORT_SOURCES),
+        vol.Optional(ATTR_INCLUDE_HISTORY, default=False): cv.boolean,
+        # A plain file name, always written to the export directory
+        vol.Optional(ATTR_FILENAME): vol.All(cv.string, vol.Match(r"^[\w][\w.-]*$")),
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str | None):
+    """Return the coordinator of the given or the first loaded config entry."""
+    if entry_id is not None:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is None or entry.domain != DOMAIN or entry.state is not ConfigEntryState.LOADED:
+            raise ServiceValidationError(f"Config entry {entry_id} is not loaded")
+        return entry.runtime_data.coordinator
+
+    entries = hass.config_entries.async_loaded_entries(DOMAIN)
+    if not entries:
+        raise ServiceValidationError("No loaded Yr Norwegian Water Temperatures config entry")
+    return entries[0].runtime_data.coordinator
+
+
+async def _async_query(call: ServiceCall) -> ServiceResponse:
+    """Return the cached locations matching the query."""
+    coordinator = _get_coordinator(call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    latitude, longitude = coordinator.selection_center()
+    max_age_hours = call.data.get(ATTR_MAX_AGE_HOURS)
+    query = LocationQuery(
+        latitude=call.data.get(ATTR_LATITUDE, latitude),
+        longitude=call.data.get(ATTR_LONGITUDE, longitude),
+        counties=tuple(call.data.get(ATTR_COUNTIES, ())),
+        municipalities=tuple(call.data.get(ATTR_MUNICIPALITIES, ())),
+        radius_km=call.data.get(ATTR_RADIUS_KM),
+        min_temperature=call.data.get(ATTR_MIN_TEMPERATURE),
+        max_temperature=call.data.get(ATTR_MAX_TEMPERATURE),
+        max_age=timedelta(hours=max_age_hours) if max_age_hours is not None else None,
+        sort_by=call.data[ATTR_SORT_BY],
+        order=call.data.get(ATTR_ORDER),
+        limit=call.data[ATTR_LIMIT],
+    )
+    locations = run_query(
+        query,
+        coordinator.locations,
+        coordinator.location_index,
+        coordinator.spatial_index,
+        dt.now(),
+    )
+    return {"locations": locations}
+
+
+def _memory_export_items(coordinator, include_history: bool) -> Iterator[ExportItem]:
+    """Yield the in-memory locations, converted lazily as the export pulls them."""
+    # Records are immutable and shared, so a list of the current ones is a consistent view
+    records = list(coordinator.locations.values())
+    for record in records:
+        stored = record.to_stored()
+        stored["trend_per_day"] = record.trend_per_day
+        stored["change_24h"] = record.change_24h
+        if not include_history:
+            yield stored, None
+        elif (history := coordinator.history.get(record.location_id)) is not None:
+            yield stored, history.to_stored()
+        else:
+            yield stored, []
+
+
+def _cache_export_items(path: str, include_history: bool, skipped: list[int]) -> Iterator[ExportItem]:
+    """Yield the valid locations of the stored cache, read one at a time from its file.
+
+    Invalid locations are counted in skipped. This does blocking I/O, so it
+    must be iterated in the executor.
+    """
+    for item in iter_storage_items(path):
+        if stored_error(item, {}) is not None:
+            skipped[0] += 1
+            continue
+        stored = {key: value for key, value in item.items() if key != "history"}
+        yield stored, item.get("history", []) if include_history else None
+
+
+async def _async_export(call: ServiceCall) -> ServiceResponse:
+    """Export locations, and optionally their history, to a file in the export directory."""
+    coordinator = _get_coordinator(call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    export_format = call.data[ATTR_FORMAT]
+    filename = call.data.get(ATTR_FILENAME) or f"{DOMAIN}_{dt.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    if not filename.endswith(f".{export_format}"):
+        raise ServiceValidationError(f"The file name of a {export_format} export must end with .{export_format}")
+    if export_format == FORMAT_PARQUET and not await call.hass.async_add_executor_job(parquet_available):
+        raise ServiceValidationError("Parquet export requires the pyarrow package")
+
+    include_history = call.data[ATTR_INCLUDE_HISTORY]
+    skipped = [0]
+    from_cache = call.data[ATTR_SOURCE] == SOURCE_CACHE
+    if from_cache:
+        items = _cache_export_items(coordinator.store.path, include_history, skipped)
+    else:
+        items = _memory_export_items(coordinator, include_history)
+
+    directory = call.hass.config.path(EXPORT_DIR)
+    path = os.path.join(directory, filename)
+    try:
+        await call.hass.async_add_executor_job(partial(os.makedirs, directory, exist_ok=True))
+        counts = await async_export(call.hass, path, export_format, items, blocking_items=from_cache)
+    except (OSError, ValueError) as err:
+        raise HomeAssistantError(f"Failed to export to {path}: {err}") from err
+    return {"path": path, **counts, "skipped": skipped[0]}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        _async_query,
+        schema=QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    # Exports write files, so only administrators may call it
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_EXPORT,
+        _async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,138 @@
+"""Dedicated HTTP session for the API, with transfer counters."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import (
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionReuseconnParams,
+    TraceRequestEndParams,
+    TraceRequestStartParams,
+    TraceResponseChunkReceivedParams,
+    hdrs,
+)
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context
+
+CONNECTION_LIMIT = 4  # Connections to the API, enough for a hedged fetch
+KEEPALIVE_TIMEOUT = 75  # Seconds an idle connection to the API is kept open for the next request
+DNS_CACHE_TTL = 300  # Seconds a resolved API host name is reused
+
+
+@dataclass(slots=True)
+class TransferStats:
+    """Requests, connections and response bytes of the dedicated session."""
+
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    compressed_bytes: int = 0  # Response bytes as sent by the API
+    decompressed_bytes: int = 0  # Response bytes after decompression
+    content_encoding: str | None = None  # Encoding of the last response
+
+    @property
+    def reuse_rate(self) -> float | None:
+        """Return the share of requests sent on an already open connection."""
+        connections = self.connections_created + self.connections_reused
+        return self.connections_reused / connections if connections else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and the reuse rate as a dict."""
+        return {**asdict(self), "reuse_rate": self.reuse_rate}
+
+
+class SessionStats:
+    """Transfer counters of the current refresh and since setup, fed by aiohttp request tracing."""
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self.refresh = TransferStats()
+        self.total = TransferStats()
+
+    def start_refresh(self) -> None:
+        """Start counting a new refresh."""
+        self.refresh = TransferStats()
+
+    def _add(self, name: str, amount: int) -> None:
+        """Add to a counter of the refresh and of the total."""
+        for stats in (self.refresh, self.total):
+            setattr(stats, name, getattr(stats, name) + amount)
+
+    async def _on_request_start(
+        self, session: ClientSession, context: SimpleNamespace, params: TraceRequestStartParams
+    ) -> None:
+        """Count a request."""
+        self._add("requests", 1)
+
+    async def _on_connection_create_end(
+        self, session: ClientSession, context: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        """Count a new connection."""
+        self._add("connections_created", 1)
+
+    async def _on_connection_reuseconn(
+        self, session: ClientSession, context: SimpleNamespace, params: TraceConnectionReuseconnParams
+    ) -> None:
+        """Count a request sent on a kept-alive connection."""
+        self._add("connections_reused", 1)
+
+    async def _on_request_end(
+        self, session: ClientSession, context: SimpleNamespace, params: TraceRequestEndParams
+    ) -> None:
+        """Note the encoding of the response and count its compressed size."""
+        encoding = params.response.headers.get(hdrs.CONTENT_ENCODING, "identity")
+        self.refresh.content_encoding = self.total.content_encoding = encoding
+        context.encoded = encoding != "identity"
+        # The body is decompressed before it reaches the chunk trace, so the size
+        # on the wire is only known from the header
+        if context.encoded and params.response.content_length is not None:
+            self._add("compressed_bytes", params.response.content_length)
+
+    async def _on_response_chunk_received(
+        self, session: ClientSession, context: SimpleNamespace, params: TraceResponseChunkReceivedParams
+    ) -> None:
+        """Count the decompressed size of the response body."""
+        self._add("decompressed_bytes", len(params.chunk))
+        if not getattr(context, "encoded", False):
+            self._add("compressed_bytes", len(params.chunk))
+
+    def trace_config(self) -> TraceConfig:
+        """Return a trace config feeding these counters."""
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_response_chunk_received.append(self._on_response_chunk_received)
+        return trace_config
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the last refresh and since setup."""
+        return {"last_refresh": self.refresh.as_dict(), "total": self.total.as_dict()}
+
+
+def create_api_session(timeout: ClientTimeout, stats: SessionStats) -> ClientSession:
+    """Create a session with its own connection pool, kept alive between requests to the API.
+
+    The session must be closed when it is no longer used. aiohttp asks for gzip
+    and deflate responses, and brotli when the Brotli package is installed.
+    """
+    connector = TCPConnector(
+        ssl=client_context(),
+        limit=CONNECTION_LIMIT,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={hdrs.USER_AGENT: SERVER_SOFTWARE},
+        trace_configs=[stats.trace_config()],
+    )
@@ -0,0 +1,310 @@
+"""Binary, memory-mapped snapshot of the locations cache.
+
+Layout, all little-endian:
+
+- header: magic, version, record and string counts, and the offsets of the sections below
+- string table: string_count + 1 uint32 offsets into a UTF-8 blob, each distinct
+  string stored once
+- records: fixed-width rows of string table indexes and doubles, one per location
+- index: uint32 row numbers sorted by location ID, for binary search lookups
+- history: (timestamp, temperature) double pairs referenced by the rows
+
+The coordinator needs every location at startup, so it decodes the whole file
+with load(). That saves the JSON parse and the per-item dicts of the JSON cache,
+not the decoding itself. The index also allows reading one location with get()
+and history(), which only touch the pages they need, but startup does not use them.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime, timedelta, timezone
+
+from .history import ReadingHistory
+from .models import WaterTemperatureRecord
+
+MAGIC = b"YRWT"
+VERSION = 1
+
+NO_STRING = 0xFFFFFFFF  # String index of None
+NAIVE_TIME = -(2 ** 31)  # UTC offset of times without a time zone
+
+_HEADER = struct.Struct("<4sHHIIQQQQ")
+# location_id, name, county, municipality, source, latitude, longitude, elevation,
+# temperature, epoch, UTC offset in seconds, first history pair, history length
+_RECORD = struct.Struct("<5I5diII")
+_UINT32 = struct.Struct("<I")
+_PAIR = struct.Struct("<dd")
+
+
+def _float(value: float | None) -> float:
+    """Return the value as a double, NaN for None."""
+    return math.nan if value is None else float(value)
+
+
+def _optional(value: float) -> float | None:
+    """Return None for NaN."""
+    return None if math.isnan(value) else value
+
+
+def write_snapshot(
+    path: str, records: Iterable[WaterTemperatureRecord], history: Mapping[str, ReadingHistory]
+) -> None:
+    """Write records and their reading history to path, replacing it atomically."""
+    strings: dict[str, int] = {}
+
+    def intern(value: str | None) -> int:
+        return NO_STRING if value is None else strings.setdefault(value, len(strings))
+
+    rows = bytearray()
+    location_ids: list[str] = []
+    pairs = array("d")
+    for record in records:
+        time = record.time if isinstance(record.time, datetime) else None
+        offset = time.utcoffset() if time is not None else None
+        start = len(pairs) // 2
+        readings = history.get(record.location_id)
+        for timestamp, value in readings or ():
+            pairs.append(timestamp)
+            pairs.append(value)
+        location_ids.append(record.location_id)
+        rows += _RECORD.pack(
+            intern(record.location_id),
+            intern(record.name),
+            intern(record.county),
+            intern(record.municipality),
+            intern(record.source),
+            _float(record.latitude),
+            _float(record.longitude),
+            _float(record.elevation),
+            _float(record.temperature),
+            time.timestamp() if time is not None else math.nan,
+            int(offset.total_seconds()) if offset is not None else NAIVE_TIME,
+            start,
+            len(pairs) // 2 - start,
+        )
+
+    encoded = [value.encode() for value in strings]
+    string_offsets = array("I", [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+    index = array("I", sorted(range(len(location_ids)), key=location_ids.__getitem__))
+
+    strings_offset = _HEADER.size
+    records_offset = strings_offset + len(string_offsets) * 4 + string_offsets[-1]
+    index_offset = records_offset + len(rows)
+    history_offset = index_offset + len(index) * 4
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0, len(location_ids), len(encoded),
+        strings_offset, records_offset, index_offset, history_offset,
+    )
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(string_offsets.tobytes())
+        file.writelines(encoded)
+        file.write(rows)
+        file.write(index.tobytes())
+        file.write(pairs.tobytes())
+    os.replace(temporary, path)
+
+
+class SnapshotReader:
+    """Read-only view of a snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        """Map the file and validate its header, raising ValueError for an invalid snapshot."""
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < _HEADER.size:
+                raise ValueError("Snapshot is truncated")
+            (
+                magic, version, _reserved, self._count, string_count,
+                self._strings_offset, self._records_offset, self._index_offset, self._history_offset,
+            ) = _HEADER.unpack_from(self._map)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Unsupported snapshot format {magic!r} version {version}")
+            self._blob_offset = self._strings_offset + (string_count + 1) * 4
+            self._string_count = string_count
+            if self._blob_offset > len(self._map):
+                raise ValueError("Snapshot is truncated")
+            if (
+                self._records_offset != self._blob_offset + self._string_offset(string_count)
+                or self._index_offset != self._records_offset + self._count * _RECORD.size
+                or self._history_offset != self._index_offset + self._count * 4
+                or self._history_offset > len(self._map)
+                or (len(self._map) - self._history_offset) % _PAIR.size
+            ):
+                raise ValueError("Snapshot sections are inconsistent")
+        except BaseException:
+            self._map.close()
+            raise
+        self._strings: dict[int, str] = {}
+        self._times: dict[tuple[float, int], datetime] = {}
+
+    def __enter__(self) -> SnapshotReader:
+        """Return the reader."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Unmap the file."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self._count
+
+    def _string_offset(self, index: int) -> int:
+        """Return the offset of a string in the blob."""
+        return _UINT32.unpack_from(self._map, self._strings_offset + index * 4)[0]
+
+    def _string(self, index: int) -> str | None:
+        """Return a string from the table, decoding each one only once."""
+        if index == NO_STRING:
+            return None
+        if (value := self._strings.get(index)) is None:
+            if index >= self._string_count:
+                raise ValueError(f"Invalid string index {index}")
+            start, end = self._string_offset(index), self._string_offset(index + 1)
+            value = self._strings[index] = self._map[self._blob_offset + start:self._blob_offset + end].decode()
+        return value
+
+    def _time(self, epoch: float, offset: int) -> datetime | None:
+        """Return the measurement time, sharing one datetime per distinct time."""
+        if math.isnan(epoch):
+            return None
+        if (time := self._times.get((epoch, offset))) is None:
+            if offset == NAIVE_TIME:
+                time = datetime.fromtimestamp(epoch)
+            else:
+                time = datetime.fromtimestamp(epoch, timezone(timedelta(seconds=offset)))
+            self._times[(epoch, offset)] = time
+        return time
+
+    def _string_table(self) -> dict[int, str | None]:
+        """Decode every string in the table at once."""
+        offsets = array("I")
+        offsets.frombytes(self._map[self._strings_offset:self._blob_offset])
+        blob = self._map[self._blob_offset:self._records_offset]
+        strings: dict[int, str | None] = {
+            index: blob[offsets[index]:offsets[index + 1]].decode() for index in range(self._string_count)
+        }
+        strings[NO_STRING] = None
+        return strings
+
+    def _record(self, row: tuple, string: Callable[[int], str | None]) -> WaterTemperatureRecord:
+        """Create a record from an unpacked row."""
+        location_id, name, county, municipality, source, latitude, longitude, elevation, temperature, epoch, offset = row[:11]
+        elevation = _optional(elevation)
+        return WaterTemperatureRecord(
+            string(name),
+            string(location_id),
+            _optional(latitude),
+            _optional(longitude),
+            int(elevation) if elevation is not None and elevation.is_integer() else elevation,
+            string(county),
+            string(municipality),
+            _optional(temperature),
+            self._time(epoch, offset),
+            string(source),
+        )
+
+    def _row(self, row: int) -> tuple:
+        """Unpack one row."""
+        return _RECORD.unpack_from(self._map, self._records_offset + row * _RECORD.size)
+
+    def _pairs(self, start: int, length: int) -> array:
+        """Return the flattened (timestamp, temperature) pairs of a pair range."""
+        offset = self._history_offset + start * _PAIR.size
+        if offset + length * _PAIR.size > len(self._map):
+            raise ValueError("Snapshot history is out of range")
+        pairs = array("d")
+        pairs.frombytes(self._map[offset:offset + length * _PAIR.size])
+        return pairs
+
+    def _find(self, location_id: str) -> tuple | None:
+        """Return the row of a location by bisecting the ID index."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            row_number = _UINT32.unpack_from(self._map, self._index_offset + middle * 4)[0]
+            row = self._row(row_number)
+            found = self._string(row[0])
+            if found == location_id:
+                return row
+            if found < location_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, location_id: str) -> WaterTemperatureRecord | None:
+        """Return the record of one location."""
+        row = self._find(location_id)
+        return self._record(row, self._string) if row is not None else None
+
+    def history(self, location_id: str) -> ReadingHistory | None:
+        """Return the reading history of one location."""
+        row = self._find(location_id)
+        if row is None or not row[12]:
+            return None
+        pairs = self._pairs(row[11], row[12])
+        return ReadingHistory.from_sorted(pairs[0::2], pairs[1::2])
+
+    def load(self) -> tuple[list[WaterTemperatureRecord], dict[str, ReadingHistory]]:
+        """Return every record in file order and the reading history of every location that has one."""
+        end = self._records_offset + self._count * _RECORD.size
+        with memoryview(self._map)[self._records_offset:end] as view:
+            rows = list(_RECORD.iter_unpack(view))
+        try:
+            string = self._string_table().__getitem__
+            records = [self._record(row, string) for row in rows]
+        except (IndexError, KeyError) as err:
+            raise ValueError(f"Snapshot string table is inconsistent: {err}") from None
+
+        pairs = self._pairs(0, (len(self._map) - self._history_offset) // _PAIR.size)
+        times, values = pairs[0::2], pairs[1::2]
+        histories = {}
+        for record, row in zip(records, rows):
+            start, length = row[11], row[12]
+            if length:
+                if start + length > len(times):
+                    raise ValueError("Snapshot history is out of range")
+                histories[record.location_id] = ReadingHistory.from_sorted(
+                    times[start:start + length], values[start:start + length]
+                )
+        return records, histories
+
+
+def read_snapshot(path: str) -> tuple[list[WaterTemperatureRecord], dict[str, ReadingHistory]]:
+    """Return every record and reading history in a snapshot file."""
+    with SnapshotReader(path) as reader:
+        return reader.load()
+
+
+def read_current_snapshot(
+    path: str, json_path: str
+) -> tuple[list[WaterTemperatureRecord], dict[str, ReadingHistory]] | None:
+    """Return the contents of a snapshot, or None if it is missing or older than the JSON cache."""
+    try:
+        modified = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+    try:
+        if os.stat(json_path).st_mtime > modified:
+            # The JSON cache was saved while the snapshot was turned off
+            return None
+    except FileNotFoundError:
+        pass
+    return read_snapshot(path)
@@ -0,0 +1,163 @@
+"""Spatial index over location coordinates."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections.abc import Iterable
+
+from .models import WaterTemperatureRecord
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = math.pi * EARTH_RADIUS_KM / 180
+DEFAULT_CELL_SIZE = 0.25  # Degrees, roughly 28 km north-south
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two coordinates in km."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(lon2 - lon1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """Grid index answering nearest-N and within-radius queries.
+
+    Locations are bucketed into fixed-size latitude/longitude cells. Queries scan
+    rings of cells around the query point and stop as soon as no unscanned cell
+    can hold a closer location. The index is updated incrementally as readings
+    arrive and locations without coordinates are left out.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        """Initialize an empty index."""
+        self._cell_size = cell_size
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self._points: dict[str, tuple[float, float]] = {}
+        self._max_abs_latitude = 0.0
+        # Bounding box of cells ever occupied, as (min_row, max_row, min_col, max_col)
+        self._bounds: tuple[int, int, int, int] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of indexed locations."""
+        return len(self._points)
+
+    def __contains__(self, location_id: object) -> bool:
+        """Return True if the location is indexed."""
+        return location_id in self._points
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        """Return the grid cell holding a coordinate."""
+        return (math.floor(latitude / self._cell_size), math.floor(longitude / self._cell_size))
+
+    def update(self, records: Iterable[WaterTemperatureRecord]) -> None:
+        """Add records to the index or move them to their new coordinates."""
+        for record in records:
+            if record.latitude is None or record.longitude is None:
+                self.remove([record.location_id])
+                continue
+            point = (float(record.latitude), float(record.longitude))
+            previous = self._points.get(record.location_id)
+            if previous == point:
+                continue
+            if previous is not None:
+                self._discard(record.location_id, previous)
+            self._points[record.location_id] = point
+            row, col = cell = self._cell(*point)
+            self._cells.setdefault(cell, set()).add(record.location_id)
+            self._max_abs_latitude = max(self._max_abs_latitude, abs(point[0]))
+            if self._bounds is None:
+                self._bounds = (row, row, col, col)
+            else:
+                min_row, max_row, min_col, max_col = self._bounds
+                self._bounds = (min(min_row, row), max(max_row, row), min(min_col, col), max(max_col, col))
+
+    def remove(self, location_ids: Iterable[str]) -> None:
+        """Remove locations from the index."""
+        for location_id in location_ids:
+            if (point := self._points.pop(location_id, None)) is not None:
+                self._discard(location_id, point)
+
+    def _discard(self, location_id: str, point: tuple[float, float]) -> None:
+        """Remove a location from its cell."""
+        cell = self._cell(*point)
+        members = self._cells[cell]
+        members.discard(location_id)
+        if not members:
+            del self._cells[cell]
+
+    def _ring(self, center: tuple[int, int], radius: int) -> Iterable[tuple[int, int]]:
+        """Yield the cells at the given ring distance around a center cell."""
+        row, col = center
+        if radius == 0:
+            yield center
+            return
+        for dcol in range(-radius, radius + 1):
+            yield (row - radius, col + dcol)
+            yield (row + radius, col + dcol)
+        for drow in range(-radius + 1, radius):
+            yield (row + drow, col - radius)
+            yield (row + drow, col + radius)
+
+    def _ring_lower_bound_km(self, radius: int, latitude: float) -> float:
+        """Return a lower bound on the distance to any location beyond the given ring."""
+        gap = radius * self._cell_size
+        # Longitude degrees are shortest at the highest latitude involved
+        highest = min(90.0, max(self._max_abs_latitude, abs(latitude)) + self._cell_size)
+        by_longitude = 2 * EARTH_RADIUS_KM * math.asin(
+            min(1.0, math.cos(math.radians(highest)) * math.sin(math.radians(gap) / 2))
+        )
+        return min(gap * KM_PER_DEGREE_LATITUDE, by_longitude)
+
+    def _max_ring(self, center: tuple[int, int]) -> int:
+        """Return the ring distance that covers every occupied cell."""
+        if self._bounds is None:
+            return 0
+        min_row, max_row, min_col, max_col = self._bounds
+        row, col = center
+        return max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+
+    def nearest(self, latitude: float, longitude: float, count: int) -> list[tuple[float, str]]:
+        """Return up to count (distance_km, location_id) pairs closest to a coordinate."""
+        if count <= 0 or not self._points:
+            return []
+
+        center = self._cell(latitude, longitude)
+        max_ring = self._max_ring(center)
+        # Max-heap of the best candidates so far, as negated distances
+        best: list[tuple[float, str]] = []
+        for radius in range(max_ring + 1):
+            for cell in self._ring(center, radius):
+                for location_id in self._cells.get(cell, ()):
+                    distance = haversine_km(latitude, longitude, *self._points[location_id])
+                    if len(best) < count:
+                        heapq.heappush(best, (-distance, location_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, location_id))
+            if len(best) == count and -best[0][0] <= self._ring_lower_bound_km(radius, latitude):
+                break
+
+        return sorted((-distance, location_id) for distance, location_id in best)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> list[tuple[float, str]]:
+        """Return (distance_km, location_id) pairs within radius_km, closest first."""
+        if radius_km < 0 or not self._points:
+            return []
+
+        center = self._cell(latitude, longitude)
+        max_ring = self._max_ring(center)
+        found: list[tuple[float, str]] = []
+        for radius in range(max_ring + 1):
+            if radius and self._ring_lower_bound_km(radius - 1, latitude) > radius_km:
+                break
+            for cell in self._ring(center, radius):
+                for location_id in self._cells.get(cell, ()):
+                    distance = haversine_km(latitude, longitude, *self._points[location_id])
+                    if distance <= radius_km:
+                        found.append((distance, location_id))
+
+        found.sort()
+        return found
@@ -0,0 +1,91 @@
+"""Import water temperature readings into long-term statistics."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMeanType, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .history import ReadingHistory
+from .models import WaterTemperatureRecord
+
+
+def statistic_id(location_id: str) -> str:
+    """Return the external statistic ID of a location."""
+    return f"{DOMAIN}:{slugify(str(location_id))}"
+
+
+def _hour_start(time: datetime) -> datetime:
+    """Return the start of the hour a reading belongs to."""
+    return time.replace(minute=0, second=0, microsecond=0)
+
+
+def _history_hours(
+    history: ReadingHistory, time: datetime, hours: set[datetime] | None
+) -> dict[datetime, list[float]]:
+    """Return the readings in the history per hour, limited to the given hours unless None.
+
+    Hours are in the time zone of time. The oldest hour of a full buffer may
+    have lost readings, so it is left out when importing every hour.
+    """
+    readings: dict[datetime, list[float]] = {}
+    skipped = None
+    for timestamp, value in history:
+        start = _hour_start(datetime.fromtimestamp(timestamp, time.tzinfo))
+        if hours is None and history.full and skipped in (None, start):
+            skipped = start
+            continue
+        if hours is None or start in hours:
+            readings.setdefault(start, []).append(value)
+    return readings
+
+
+@callback
+def async_import_readings(
+    hass: HomeAssistant,
+    records: Iterable[WaterTemperatureRecord],
+    history: Mapping[str, ReadingHistory],
+    backfill: bool = False,
+) -> int:
+    """Queue hourly statistics for new readings at their measurement time.
+
+    Importing an hour replaces it, so each hour is built from every reading of
+    that hour in the history, not only from the new one. With backfill, every
+    hour in the history of the locations is imported again. Readings are
+    grouped per location so each call queues one batch per location.
+    Returns the number of locations imported.
+    """
+    batches: dict[str, tuple[WaterTemperatureRecord, dict[datetime, list[float]]]] = {}
+    for record in records:
+        if record.temperature is None or record.time is None:
+            continue
+        _, hours = batches.setdefault(record.location_id, (record, {}))
+        hours.setdefault(_hour_start(record.time), []).append(float(record.temperature))
+
+    for record, hours in batches.values():
+        if (location_history := history.get(record.location_id)) is not None:
+            # Readings that are not in the history, such as older ones, keep their own hour
+            hours.update(_history_hours(location_history, record.time, None if backfill else set(hours)))
+
+    for record, hours in batches.values():
+        metadata = StatisticMetaData(
+            mean_type=StatisticMeanType.ARITHMETIC,
+            has_sum=False,
+            name=f"{record.name} water temperature",
+            source=DOMAIN,
+            statistic_id=statistic_id(record.location_id),
+            unit_class="temperature",
+            unit_of_measurement=UnitOfTemperature.CELSIUS,
+        )
+        statistics = [
+            StatisticData(start=start, mean=sum(values) / len(values), min=min(values), max=max(values))
+            for start, values in sorted(hours.items())
+        ]
+        async_add_external_statistics(hass, metadata, statistics)
+    return len(batches)
@@ -0,0 +1,169 @@
+"""Per-record validation of API and cached readings."""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from yrwatertemperatures import WaterTemperatureData
+
+SOURCE_API = "api"
+SOURCE_CACHE = "cache"
+
+MIN_TEMPERATURE = -30.0  # Lowest plausible reading, anything colder is a sensor or feed error
+MAX_TEMPERATURE = 60.0  # Highest plausible reading
+QUARANTINE_SAMPLES = 10  # Recently quarantined records kept for diagnostics
+
+STORED_FIELDS = frozenset(
+    ("name", "location_id", "latitude", "longitude", "elevation",
+     "county", "municipality", "temperature", "time", "source")
+)
+
+
+@dataclass(slots=True)
+class QuarantineStats:
+    """Counters and recent samples of records dropped by validation."""
+
+    api: int = 0  # API records quarantined since setup
+    cache: int = 0  # Cached records quarantined when loading
+    last_refresh: int = 0  # API records quarantined since the last refresh started
+    reasons: Counter[str] = field(default_factory=Counter)
+    samples: deque[dict[str, Any]] = field(default_factory=lambda: deque(maxlen=QUARANTINE_SAMPLES))
+
+    def start_refresh(self) -> None:
+        """Start counting the API records quarantined by a new refresh."""
+        self.last_refresh = 0
+
+    def add(self, source: str, index: int, location_id: Any, reason: str) -> None:
+        """Count a quarantined record."""
+        if source == SOURCE_API:
+            self.api += 1
+            self.last_refresh += 1
+        else:
+            self.cache += 1
+        self.reasons[reason] += 1
+        self.samples.append({
+            "source": source,
+            "index": index,
+            "location_id": None if location_id is None else str(location_id),
+            "reason": reason,
+        })
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and samples as a dict."""
+        return {
+            "api": self.api,
+            "cache": self.cache,
+            "last_refresh": self.last_refresh,
+            "reasons": dict(self.reasons),
+            "samples": list(self.samples),
+        }
+
+
+def _is_finite(value: Any) -> bool:
+    """Return True for an int or a finite float, but not a bool."""
+    value_type = type(value)
+    return value_type is int or (value_type is float and math.isfinite(value))
+
+
+def reading_error(
+    name: Any,
+    location_id: Any,
+    latitude: Any,
+    longitude: Any,
+    elevation: Any,
+    county: Any,
+    municipality: Any,
+    temperature: Any,
+    source: Any,
+) -> str | None:
+    """Return why the fields of a reading are invalid, or None if they are valid.
+
+    Only exact types are accepted, which keeps the checks to a few comparisons
+    per field without allocating.
+    """
+    if type(location_id) is not str or not location_id:
+        return "invalid_id"
+    if type(name) is not str:
+        return "invalid_name"
+    if latitude is not None or longitude is not None:
+        if not (
+            _is_finite(latitude) and _is_finite(longitude)
+            and -90 <= latitude <= 90 and -180 <= longitude <= 180
+        ):
+            return "invalid_coordinates"
+    if elevation is not None and not _is_finite(elevation):
+        return "invalid_elevation"
+    if temperature is not None and not (
+        _is_finite(temperature) and MIN_TEMPERATURE <= temperature <= MAX_TEMPERATURE
+    ):
+        return "invalid_temperature"
+    if (
+        (county is not None and type(county) is not str)
+        or (municipality is not None and type(municipality) is not str)
+        or (source is not None and type(source) is not str)
+    ):
+        return "invalid_text"
+    return None
+
+
+def stored_error(item: Any, parsed_times: dict[str, datetime]) -> str | None:
+    """Return why a cached location is invalid, or None if it is valid.
+
+    Its time is parsed into parsed_times, once per distinct time string.
+    """
+    if type(item) is not dict:
+        return "not_an_object"
+    if not item.keys() >= STORED_FIELDS:
+        return "missing_field"
+    time = item["time"]
+    if time is not None:
+        if type(time) is not str:
+            return "invalid_time"
+        if time not in parsed_times:
+            try:
+                parsed_times[time] = datetime.fromisoformat(time)
+            except ValueError:
+                return "invalid_time"
+    return reading_error(
+        item["name"], item["location_id"], item["latitude"], item["longitude"], item["elevation"],
+        item["county"], item["municipality"], item["temperature"], item["source"],
+    )
+
+
+def validate_api_records(
+    records: Sequence[WaterTemperatureData], stats: QuarantineStats
+) -> Sequence[WaterTemperatureData]:
+    """Return the API records that are valid, quarantining the others.
+
+    When every record is valid, which is the common case, records itself is
+    returned and nothing is copied.
+    """
+    kept: list[WaterTemperatureData] | None = None
+    for index, data in enumerate(records):
+        try:
+            time = data.time
+            reason = (
+                reading_error(
+                    data.name, data.location_id, data.latitude, data.longitude, data.elevation,
+                    data.county, data.municipality, data.temperature, data.source,
+                )
+                if time is None or isinstance(time, datetime)
+                else "invalid_time"
+            )
+        except AttributeError:
+            reason = "not_a_record"
+        if reason is None:
+            if kept is not None:
+                kept.append(data)
+            continue
+        if kept is None:
+            kept = list(records[:index])
+        stats.add(SOURCE_API, index, getattr(data, "location_id", None), reason)
+
+    return records if kept is None else kept
@@ -0,0 +1,89 @@
+"""Coalesced, chunked entity state writes."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import islice
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+DEFAULT_WRITE_CHUNK_SIZE = 50  # Entity states written per event loop iteration
+
+
+class WriteScheduler:
+    """Batches the state writes of one refresh into chunks.
+
+    Writes requested while a batch is open are queued, with repeated writes of
+    the same entity coalesced, and written in chunks by a background task that
+    yields to the event loop between chunks. With a window the chunks are
+    spread evenly over that many seconds. Outside a batch, writes happen
+    immediately.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE,
+        window: float = 0.0,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._chunk_size = chunk_size
+        self._window = window
+        self._pending: dict[Entity, None] = {}
+        self._batching = False
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """Return the number of queued writes."""
+        return len(self._pending)
+
+    @callback
+    def schedule(self, entity: Entity) -> None:
+        """Write the state of an entity now, or queue it while a batch is open or being written."""
+        if not self._batching and self._task is None:
+            entity.async_write_ha_state()
+            return
+        self._pending[entity] = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Queue writes until the block exits, then start writing them in chunks."""
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+            if self._pending and self._task is None:
+                self._task = self._hass.async_create_background_task(
+                    self._async_write_pending(), "yr_norwegian_water_temperatures state writes"
+                )
+
+    async def _async_write_pending(self) -> None:
+        """Write queued states chunk by chunk, yielding to the event loop in between."""
+        try:
+            chunks = math.ceil(len(self._pending) / self._chunk_size)
+            delay = self._window / chunks if self._window and chunks else 0
+            while self._pending:
+                for entity in list(islice(self._pending, self._chunk_size)):
+                    del self._pending[entity]
+                    # Entities removed while queued have nothing to write
+                    if entity.hass is not None:
+                        entity.async_write_ha_state()
+                if self._pending:
+                    await asyncio.sleep(delay)
+        finally:
+            self._task = None
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop queued writes and stop writing."""
+        self._pending.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
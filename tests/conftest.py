@@ -9,6 +9,28 @@ from homeassistant.const import CONF_API_KEY
 from yrwatertemperatures import WaterTemperatureData
 
 
+def pytest_addoption(parser):
+    """Add the option running the wall-clock timing budgets."""
+    parser.addoption(
+        "--run-timing", action="store_true", default=False, help="run the wall-clock timing budgets"
+    )
+
+
+def pytest_configure(config):
+    """Register the timing marker."""
+    config.addinivalue_line("markers", "timing: wall-clock timing budget, only run with --run-timing")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the timing budgets unless asked for, as they depend on the load of the machine."""
+    if config.getoption("--run-timing"):
+        return
+    skip_timing = pytest.mark.skip(reason="wall-clock timing budget, run with --run-timing")
+    for item in items:
+        if "timing" in item.keywords:
+            item.add_marker(skip_timing)
+
+
 @pytest.fixture
 def mock_hass():
     """Create a mock Home Assistant instance."""
@@ -0,0 +1,273 @@
+"""Local stand-in for the Yr badetemperaturer API used for load and fault testing.
+
+The simulator serves the same JSON shape as ``/api/watertemperatures`` on a local
+aiohttp server, seeded from ``testdata.json`` or from generated locations. All
+knobs live on ``SimulatorSettings`` and can be changed between requests.
+
+Run it standalone with ``python -m tests.simulator --port 8080`` and point the
+client at ``http://127.0.0.1:8080/api``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+TEST_DATA_PATH = Path(__file__).parent / "testdata.json"
+WATER_TEMPERATURES_PATH = "/api/watertemperatures"
+
+
+@dataclass
+class SimulatorSettings:
+    """Knobs controlling how the simulator answers requests."""
+
+    api_key: str | None = None
+    payload_size: int | None = None
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (500,)
+    scripted_statuses: list[int] = field(default_factory=list)
+    truncate_ratio: float | None = None
+    drip_chunk_size: int | None = None
+    drip_delay: float = 0.0
+    compress: bool = False
+    seed: int = 0
+
+
+def load_seed_locations() -> list[dict[str, Any]]:
+    """Load the stored-format locations in testdata.json."""
+    with open(TEST_DATA_PATH, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def generate_locations(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Generate stored-format locations spread over Norway."""
+    rng = random.Random(seed)
+    base_time = datetime(2025, 7, 8, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    counties = ["Vestland", "Viken", "Vestfold", "Nordland", "Agder", "Rogaland", "Troms"]
+    return [
+        {
+            "name": f"Simulated spot {index}",
+            "location_id": f"sim-{index}",
+            "latitude": round(rng.uniform(58.0, 71.0), 5),
+            "longitude": round(rng.uniform(5.0, 30.0), 5),
+            "elevation": rng.randint(0, 500),
+            "county": counties[index % len(counties)],
+            "municipality": f"Municipality {index % 350}",
+            "temperature": round(rng.uniform(8.0, 24.0), 1),
+            # Real data clusters on a small set of measurement times
+            "time": (base_time - timedelta(minutes=10 * rng.randint(0, 144))).isoformat(),
+            "source": "Simulator",
+        }
+        for index in range(count)
+    ]
+
+
+def to_api_format(location: dict[str, Any]) -> dict[str, Any]:
+    """Convert a stored-format location to the Yr API response format."""
+    return {
+        "locationName": location["name"],
+        "locationId": location["location_id"],
+        "position": {"lat": location["latitude"], "lon": location["longitude"]},
+        "elevation": location["elevation"],
+        "county": location["county"],
+        "municipality": location["municipality"],
+        "temperature": location["temperature"],
+        "time": location["time"],
+        "sourceDisplayName": location["source"],
+    }
+
+
+class YrApiSimulator:
+    """Async context manager running the simulated API on a local port."""
+
+    def __init__(
+        self,
+        settings: SimulatorSettings | None = None,
+        locations: list[dict[str, Any]] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialize the simulator."""
+        self.settings = settings or SimulatorSettings()
+        self.host = host
+        self.port = port
+        self.status_counts: Counter[int] = Counter()
+        self.request_count = 0
+        self._rng = random.Random(self.settings.seed)
+        self._runner: web.AppRunner | None = None
+        self.set_locations(locations if locations is not None else self._default_locations())
+
+    def _default_locations(self) -> list[dict[str, Any]]:
+        """Return seed data, padded with generated locations to the payload size."""
+        locations = load_seed_locations()
+        size = self.settings.payload_size
+        if size is None:
+            return locations
+        if size <= len(locations):
+            return locations[:size]
+        return locations + generate_locations(size - len(locations), self.settings.seed)
+
+    def set_locations(self, locations: list[dict[str, Any]]) -> None:
+        """Replace the served locations and pre-encode the response body."""
+        self.locations = locations
+        self._body = json.dumps([to_api_format(location) for location in locations]).encode()
+
+    @property
+    def api_url(self) -> str:
+        """Return the base URL to configure on the client."""
+        return f"http://{self.host}:{self.port}/api"
+
+    async def __aenter__(self) -> YrApiSimulator:
+        """Start the server."""
+        app = web.Application()
+        app.router.add_get(WATER_TEMPERATURES_PATH, self._handle_water_temperatures)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Resolve the ephemeral port when started with port 0
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _next_status(self) -> int:
+        """Pick the status code for the next response."""
+        settings = self.settings
+        if settings.scripted_statuses:
+            return settings.scripted_statuses.pop(0)
+        if settings.error_rate and self._rng.random() < settings.error_rate:
+            return self._rng.choice(settings.error_statuses)
+        return 200
+
+    async def _handle_water_temperatures(self, request: web.Request) -> web.StreamResponse:
+        """Serve the water temperature list with the configured faults."""
+        settings = self.settings
+        self.request_count += 1
+
+        delay = settings.latency + (self._rng.uniform(-settings.jitter, settings.jitter) if settings.jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        status = 401 if settings.api_key and request.headers.get("apikey") != settings.api_key else self._next_status()
+        self.status_counts[status] += 1
+        if status != 200:
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return web.Response(status=status, text=f"Simulated {status}", headers=headers)
+
+        body = self._body
+        if settings.truncate_ratio is not None:
+            body = body[: int(len(body) * settings.truncate_ratio)]
+
+        if not settings.drip_chunk_size:
+            response = web.Response(body=body, content_type="application/json")
+            if settings.compress:
+                # Uses the best encoding the client accepts
+                response.enable_compression()
+            return response
+
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        response.content_length = len(body)
+        await response.prepare(request)
+        for start in range(0, len(body), settings.drip_chunk_size):
+            await response.write(body[start:start + settings.drip_chunk_size])
+            await asyncio.sleep(settings.drip_delay)
+        await response.write_eof()
+        return response
+
+
+@dataclass
+class LoadReport:
+    """Outcome of driving a coordinator against the simulator."""
+
+    durations: list[float] = field(default_factory=list)
+    failures: Counter[str] = field(default_factory=Counter)
+    location_counts: list[int] = field(default_factory=list)
+
+    def percentile(self, percent: float) -> float:
+        """Return the given percentile of refresh durations in seconds."""
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def summary(self) -> str:
+        """Return a one-line human readable summary."""
+        return (
+            f"refreshes={len(self.durations)} "
+            f"p50={self.percentile(50) * 1000:.1f}ms "
+            f"p95={self.percentile(95) * 1000:.1f}ms "
+            f"max={max(self.durations, default=0) * 1000:.1f}ms "
+            f"failures={dict(self.failures)}"
+        )
+
+
+async def async_drive_coordinator(coordinator: Any, refreshes: int) -> LoadReport:
+    """Run the coordinator's update path repeatedly and collect timings."""
+    report = LoadReport()
+    for _ in range(refreshes):
+        start = time.perf_counter()
+        try:
+            data = await coordinator._async_update_data()
+        except Exception as err:  # noqa: BLE001 - every failure is counted
+            report.failures[type(err).__name__] += 1
+        else:
+            report.location_counts.append(len(data))
+        report.durations.append(time.perf_counter() - start)
+    return report
+
+
+def main() -> None:
+    """Run the simulator standalone until interrupted."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--api-key")
+    parser.add_argument("--payload-size", type=int)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", type=int, nargs="+", default=[500])
+    parser.add_argument("--truncate-ratio", type=float)
+    parser.add_argument("--drip-chunk-size", type=int)
+    parser.add_argument("--drip-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    settings = SimulatorSettings(
+        api_key=args.api_key,
+        payload_size=args.payload_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_statuses),
+        truncate_ratio=args.truncate_ratio,
+        drip_chunk_size=args.drip_chunk_size,
+        drip_delay=args.drip_delay,
+    )
+
+    async def _run() -> None:
+        async with YrApiSimulator(settings, port=args.port) as simulator:
+            print(f"Serving simulated Yr API at {simulator.api_url}")
+            await asyncio.Event().wait()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
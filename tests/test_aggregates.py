@@ -0,0 +1,99 @@
+"""Tests for the incrementally maintained regional aggregates."""
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.aggregates import (
+    REGION_COUNTY,
+    REGION_MUNICIPALITY,
+    RegionAccumulator,
+    RegionalAggregates,
+)
+from custom_components.yr_norwegian_water_temperatures.models import LocationSnapshot, WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.sensor import RegionalWaterTemperatureSensor
+from tests.conftest import mock_location
+
+
+def record(location_id: str, temperature: float | None, county: str = "Vestland", municipality: str = "Bergen"):
+    """Return a record in the given regions."""
+    return WaterTemperatureRecord.from_api(
+        mock_location(location_id=location_id, temperature=temperature, county=county, municipality=municipality)
+    )
+
+
+def snapshot(*records: WaterTemperatureRecord, previous: LocationSnapshot | None = None) -> LocationSnapshot:
+    """Return a snapshot of records with the changes compared to previous."""
+    return LocationSnapshot.from_previous({item.location_id: item for item in records}, previous)
+
+
+def test_accumulator_matches_full_recomputation():
+    """Test that random updates and removals give the same aggregates as a rescan."""
+    accumulator = RegionAccumulator()
+    expected: dict[str, float] = {}
+    rng = random.Random(3)
+
+    for _ in range(2000):
+        location_id = f"loc-{rng.randrange(50)}"
+        if rng.random() < 0.3:
+            accumulator.discard(location_id)
+            expected.pop(location_id, None)
+        else:
+            temperature = round(rng.uniform(5, 25), 1)
+            accumulator.set(location_id, temperature)
+            expected[location_id] = temperature
+
+        summary = accumulator.summary()
+        assert summary.count == len(expected)
+        if expected:
+            assert summary.minimum == min(expected.values())
+            assert summary.maximum == max(expected.values())
+            assert summary.mean == pytest.approx(sum(expected.values()) / len(expected), abs=0.01)
+            assert expected[summary.warmest_location_id] == summary.maximum
+
+
+def test_aggregates_follow_changes_moves_and_removals():
+    """Test that only changed locations are applied and touched regions are reported."""
+    aggregates = RegionalAggregates()
+    first = snapshot(record("a", 14.0), record("b", 18.0), record("c", 10.0, "Agder", "Arendal"))
+    assert aggregates.apply(first) == {
+        (REGION_COUNTY, "Vestland"), (REGION_MUNICIPALITY, "Bergen"),
+        (REGION_COUNTY, "Agder"), (REGION_MUNICIPALITY, "Arendal"),
+    }
+
+    # b moves to Askøy, c disappears and a keeps its record
+    second = snapshot(first.get("a"), record("b", 18.0, municipality="Askøy"), previous=first)
+    touched = aggregates.apply(second)
+
+    assert (REGION_MUNICIPALITY, "Arendal") in touched
+    assert aggregates.summary(REGION_MUNICIPALITY, "Bergen").maximum == 14.0
+    assert aggregates.summary(REGION_MUNICIPALITY, "Askøy").warmest_location_id == "b"
+    assert aggregates.summary(REGION_COUNTY, "Vestland").count == 2
+    assert aggregates.summary(REGION_COUNTY, "Agder").count == 0
+
+
+def test_regional_sensor_only_writes_when_its_aggregates_change():
+    """Test that a touched region with unchanged aggregates does not write state."""
+    coordinator = MagicMock()
+    coordinator.last_update_success = True
+    coordinator.region_aggregates = RegionalAggregates()
+    coordinator.data = snapshot(record("a", 14.0), record("b", 18.0))
+    coordinator.region_aggregates.apply(coordinator.data)
+    sensor = RegionalWaterTemperatureSensor(coordinator, "entry", REGION_COUNTY, "Vestland")
+    sensor.async_write_ha_state = MagicMock()
+    assert sensor.native_value == 16.0
+    assert sensor.extra_state_attributes["warmest_location"] == "Test Name"
+
+    # A new record with the same temperature touches the region without changing it
+    coordinator.data = LocationSnapshot.from_previous(
+        {"a": coordinator.data.get("a"), "b": record("b", 18.0)}, coordinator.data, ["b"]
+    )
+    coordinator.updated_regions = frozenset(coordinator.region_aggregates.apply(coordinator.data))
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_not_called()
+
+    coordinator.data = snapshot(coordinator.data.get("a"), record("b", 20.0), previous=coordinator.data)
+    coordinator.updated_regions = frozenset(coordinator.region_aggregates.apply(coordinator.data))
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == 17.0
@@ -0,0 +1,83 @@
+"""Tests for the threshold alert engine."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.alerts import AlertEngine, parse_alert_rule, parse_alert_rules
+from custom_components.yr_norwegian_water_temperatures.binary_sensor import ThresholdAlertBinarySensor
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from tests.conftest import mock_location
+
+CENTER = (60.0, 10.0)
+
+
+def record(location_id: str, temperature: float | None, county: str = "Vestland", latitude: float = 60.0):
+    """Return a record in a county at the given latitude."""
+    return WaterTemperatureRecord.from_api(
+        mock_location(location_id=location_id, temperature=temperature, county=county, latitude=latitude)
+    )
+
+
+def test_parse_alert_rules():
+    """Test the rule syntax with scopes, operators and hysteresis."""
+    above, below, named = parse_alert_rules("county:Vestland|Agder > 18 ± 1; radius:20 < 12 ;locations:Bygdøy > 20")
+
+    assert (above.scope, above.values, above.above, above.threshold, above.hysteresis) == (
+        "county", frozenset({"vestland", "agder"}), True, 18.0, 1.0
+    )
+    assert (below.scope, below.radius_km, below.above, below.hysteresis) == ("radius", 20.0, False, 0.5)
+    assert named.values == frozenset({"bygdøy"})
+
+
+@pytest.mark.parametrize("text", ["county:Vestland", "ocean:North > 18", "radius:far > 18", "county: > 18"])
+def test_parse_alert_rules_rejects_invalid_rules(text):
+    """Test that malformed rules raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_alert_rules(text)
+
+
+def test_engine_applies_hysteresis_and_scope():
+    """Test that alerts start at the threshold and only clear past the hysteresis."""
+    engine = AlertEngine(parse_alert_rules("county:Vestland > 18 ± 1; radius:5 > 18"))
+
+    crossings = engine.evaluate([record("a", 18.0), record("b", 25.0, county="Agder", latitude=61.0)], CENTER)
+    assert [(item["rule"], item["location_id"]) for item in crossings] == [
+        ("county:Vestland > 18 ± 1", "a"), ("radius:5 > 18", "a")
+    ]
+
+    assert engine.evaluate([record("a", 17.6)], CENTER) == []
+    assert engine.active[0] == {"a": 17.6}
+
+    crossings = engine.evaluate([record("a", 16.9)], CENTER)
+    assert [item["active"] for item in crossings] == [False, False]
+    assert engine.active == [{}, {}]
+    assert engine.changed_rules == {0, 1}
+
+
+def test_binary_sensor_only_writes_when_its_rule_changes():
+    """Test that the binary sensor reflects its rule and skips unrelated refreshes."""
+    coordinator = MagicMock()
+    coordinator.last_update_success = True
+    coordinator.alerts = AlertEngine(parse_alert_rules("all > 18; all < 10"))
+    coordinator.alerts.evaluate([record("a", 20.0)], CENTER)
+    warm = ThresholdAlertBinarySensor(coordinator, "entry", 0)
+    cold = ThresholdAlertBinarySensor(coordinator, "entry", 1)
+    cold.async_write_ha_state = MagicMock()
+
+    assert warm.is_on
+    assert warm.extra_state_attributes["locations"] == [{"location_id": "a", "temperature": 20.0}]
+    assert not cold.is_on
+
+    coordinator.alerts.evaluate([record("a", 21.0)], CENTER)
+    cold._handle_coordinator_update()
+    cold.async_write_ha_state.assert_not_called()
+
+
+def test_rule_key_ignores_order_and_spelling():
+    """Test that the unique ID key only depends on what the rule does."""
+    first = parse_alert_rule("county:Vestland|Agder > 18 ± 1")
+    second = parse_alert_rule("county: agder|vestland >18.0 +- 1.0")
+    other = parse_alert_rule("all > 18")
+
+    assert first.key == second.key != other.key
+    assert parse_alert_rules("all > 18; all  >  18.0") == [other]
@@ -0,0 +1,602 @@
+"""Performance budgets for hot paths of the integration.
+
+Allocation, size and operation count budgets always run. Wall-clock budgets
+depend on the load of the machine, so they are marked ``timing`` and only run
+with ``pytest --run-timing tests/test_benchmarks.py``; the measured times are
+part of their assertion messages.
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+import tracemalloc
+from collections import deque
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.helpers import entity_registry as er
+from yrwatertemperatures import WaterTemperatureData
+
+from custom_components.yr_norwegian_water_temperatures import sensor as sensor_platform
+from custom_components.yr_norwegian_water_temperatures.const import CONF_ENABLE_HEDGING, CONF_GET_ALL_LOCATIONS
+from custom_components.yr_norwegian_water_temperatures.coordinator import ApiCoordinator, _water_temperatures_from_stored
+from custom_components.yr_norwegian_water_temperatures.aggregates import RegionAccumulator
+from custom_components.yr_norwegian_water_temperatures.models import LocationSnapshot, WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.sensor import (
+    CATALOG_SENSOR_KINDS,
+    CatalogWaterTemperatureSensor,
+    WaterTemperatureSensor,
+)
+from custom_components.yr_norwegian_water_temperatures.fetch import LATENCY_SAMPLES, FetchLatency
+from custom_components.yr_norwegian_water_temperatures.history import ReadingHistory
+from custom_components.yr_norwegian_water_temperatures.snapshot import read_snapshot, write_snapshot
+from custom_components.yr_norwegian_water_temperatures.spatial import SpatialIndex
+from custom_components.yr_norwegian_water_temperatures.validation import QuarantineStats, validate_api_records
+from custom_components.yr_norwegian_water_temperatures.writes import WriteScheduler
+from tests.simulator import generate_locations
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Return the best wall time in seconds of calling func repeat times."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def retained_bytes(func) -> tuple[int, object]:
+    """Return the bytes still allocated after calling func, and its result."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+@pytest.fixture
+def coordinator(mock_hass, mock_config_entry, monkeypatch):
+    """Create an ApiCoordinator with mocked client, storage and registry."""
+    monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.async_get_clientsession', MagicMock())
+    monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.er', MagicMock())
+    mock_config_entry.entry_id = "test_entry"
+    mock_config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
+    coordinator = ApiCoordinator(mock_hass, mock_config_entry)
+    coordinator.client = AsyncMock()
+    coordinator.store = AsyncMock()
+    coordinator.store.async_load.return_value = []
+    monkeypatch.setattr(coordinator, 'cleanup_old_entities', AsyncMock())
+    return coordinator
+
+
+def api_data(stored: list[dict]) -> list[WaterTemperatureData]:
+    """Return API client data for stored-format locations."""
+    return [
+        WaterTemperatureData(**{**item, "time": record.time})
+        for item, record in zip(stored, _water_temperatures_from_stored(stored))
+    ]
+
+
+@pytest.mark.timing
+def test_bulk_decode_of_10k_cached_locations():
+    """Decoding a 10k-entry cache should take single-digit milliseconds."""
+    stored = generate_locations(10_000)
+
+    elapsed = best_of(lambda: _water_temperatures_from_stored(stored))
+
+    assert elapsed < 0.1, f"Decode 10k cached locations: {elapsed * 1000:.2f} ms"
+
+
+def test_memory_per_location_of_shared_records():
+    """Slotted records with shared attributes should use less memory than dataclass plus dict per sensor."""
+    locations = api_data(generate_locations(5_000))
+
+    def legacy():
+        # Previous layout: one dataclass per location plus one attribute dict per sensor
+        data = [WaterTemperatureData(**vars(location)) for location in locations]
+        attributes = [
+            {
+                "location_id": item.location_id,
+                "latitude": item.latitude,
+                "longitude": item.longitude,
+                "elevation": item.elevation,
+                "county": item.county,
+                "municipality": item.municipality,
+                "source": item.source,
+                "time": item.time.isoformat() if item.time else None,
+            }
+            for item in data
+        ]
+        return data, attributes
+
+    def current():
+        records = [WaterTemperatureRecord.from_api(location) for location in locations]
+        for record in records:
+            record.attributes
+        return records
+
+    legacy_bytes, _ = retained_bytes(legacy)
+    current_bytes, _ = retained_bytes(current)
+
+    assert current_bytes < legacy_bytes, (
+        f"Bytes per location: dataclass+dict={legacy_bytes / len(locations):.0f} "
+        f"record={current_bytes / len(locations):.0f}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_allocations_with_unchanged_readings(coordinator):
+    """A refresh that brings no new readings should keep every record and allocate little."""
+    locations = api_data(generate_locations(5_000))
+    coordinator.client.async_get_all_water_temperatures.return_value = locations
+    first = await coordinator._async_update_data()
+    coordinator.store.async_save = AsyncMock()
+
+    tracemalloc.start()
+    try:
+        second = await coordinator._async_update_data()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 2048 * len(locations), f"Peak allocation of an unchanged 5k refresh: {peak / 1024:.0f} KiB"
+    assert second.changed_ids == frozenset()
+    assert all(second.get(record.location_id) is record for record in first)
+
+
+@pytest.mark.timing
+def test_nearest_lookup_on_10k_locations_is_sub_millisecond():
+    """Resolving "nearest N" and "within R km" through the spatial index should be sub-millisecond."""
+    index = SpatialIndex()
+    index.update(_water_temperatures_from_stored(generate_locations(10_000)))
+
+    nearest = best_of(lambda: index.nearest(59.9139, 10.7522, 10), repeat=20)
+    within = best_of(lambda: index.within(59.9139, 10.7522, 25), repeat=20)
+
+    timings = f"Spatial lookups on 10k locations: nearest={nearest * 1e6:.0f} us within={within * 1e6:.0f} us"
+    assert nearest < 0.001, timings
+    assert within < 0.001, timings
+
+
+def catalog_mode_coordinator(count: int = 450) -> tuple[MagicMock, list[WaterTemperatureRecord]]:
+    """Return a coordinator with count locations and their catalog, and the records."""
+    records = _water_temperatures_from_stored(generate_locations(count))
+    coordinator = MagicMock()
+    coordinator.data = LocationSnapshot({record.location_id: record for record in records})
+    coordinator.locations = {record.location_id: record for record in records}
+    coordinator.catalog = RegionAccumulator()
+    for record in records:
+        if record.temperature is not None:
+            coordinator.catalog.set(record.location_id, record.temperature)
+    return coordinator, records
+
+
+def test_catalog_mode_footprint_compared_to_sensor_per_location():
+    """Catalog mode should retain less and record far less than a sensor per location."""
+    coordinator, records = catalog_mode_coordinator()
+
+    def recorded_bytes_per_day(entities) -> int:
+        # Every entity writes its state and attributes once per hourly refresh
+        per_refresh = sum(
+            len(json.dumps({"state": entity.native_value, "attributes": entity.extra_state_attributes}, default=str))
+            for entity in entities
+        )
+        return per_refresh * 24
+
+    per_location_retained, per_location = retained_bytes(
+        lambda: [WaterTemperatureSensor(coordinator, record) for record in records]
+    )
+    catalog_retained, catalog = retained_bytes(
+        lambda: [CatalogWaterTemperatureSensor(coordinator, "entry", kind) for kind in CATALOG_SENSOR_KINDS]
+    )
+
+    assert len(catalog) < len(per_location)
+    assert catalog_retained < per_location_retained, (
+        f"Retained: per-location={per_location_retained / 1024:.0f} KiB catalog={catalog_retained / 1024:.0f} KiB"
+    )
+    assert recorded_bytes_per_day(catalog) * 50 < recorded_bytes_per_day(per_location)
+
+
+@pytest.mark.timing
+def test_catalog_mode_starts_faster_than_a_sensor_per_location():
+    """Creating the catalog sensors should be faster than a sensor per location."""
+    coordinator, records = catalog_mode_coordinator()
+
+    per_location = best_of(lambda: [WaterTemperatureSensor(coordinator, record) for record in records])
+    catalog = best_of(
+        lambda: [CatalogWaterTemperatureSensor(coordinator, "entry", kind) for kind in CATALOG_SENSOR_KINDS]
+    )
+
+    assert catalog < per_location, f"Startup: per-location={per_location * 1000:.2f} ms catalog={catalog * 1000:.2f} ms"
+
+
+class SQLiteRecorder:
+    """Minimal model of the recorder tables, deduplicating attributes like the recorder does."""
+
+    def __init__(self) -> None:
+        """Create the in-memory states and state_attributes tables."""
+        self.db = sqlite3.connect(":memory:")
+        self.db.executescript(
+            """
+            CREATE TABLE state_attributes (
+                attributes_id INTEGER PRIMARY KEY, hash INTEGER, shared_attrs TEXT
+            );
+            CREATE INDEX ix_state_attributes_hash ON state_attributes (hash);
+            CREATE TABLE states (
+                state_id INTEGER PRIMARY KEY, metadata_id INTEGER, state TEXT,
+                attributes_id INTEGER, last_updated_ts REAL
+            );
+            """
+        )
+        self._attributes_ids: dict[str, int] = {}
+        self._metadata_ids: dict[str, int] = {}
+
+    def record(self, entity, timestamp: float, unrecorded: frozenset[str] = frozenset()) -> None:
+        """Store one state write of an entity."""
+        attributes = {
+            "unit_of_measurement": "°C",
+            "device_class": "temperature",
+            "state_class": "measurement",
+            "friendly_name": entity.name,
+            **{key: value for key, value in entity.extra_state_attributes.items() if key not in unrecorded},
+        }
+        shared_attrs = json.dumps(attributes, default=str, separators=(",", ":"))
+        if (attributes_id := self._attributes_ids.get(shared_attrs)) is None:
+            cursor = self.db.execute(
+                "INSERT INTO state_attributes (hash, shared_attrs) VALUES (?, ?)", (hash(shared_attrs), shared_attrs)
+            )
+            attributes_id = self._attributes_ids[shared_attrs] = cursor.lastrowid
+        metadata_id = self._metadata_ids.setdefault(entity.unique_id, len(self._metadata_ids) + 1)
+        self.db.execute(
+            "INSERT INTO states (metadata_id, state, attributes_id, last_updated_ts) VALUES (?, ?, ?, ?)",
+            (metadata_id, str(entity.native_value), attributes_id, timestamp),
+        )
+
+    def usage(self) -> tuple[int, int]:
+        """Return the number of rows and the database size in bytes."""
+        rows = sum(self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("states", "state_attributes"))
+        page_count = self.db.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.db.execute("PRAGMA page_size").fetchone()[0]
+        return rows, page_count * page_size
+
+
+def test_recorder_rows_and_bytes_per_day():
+    """Skipping static attributes and unchanged readings should shrink a day of recorder data."""
+    stored = generate_locations(450)
+    coordinator = MagicMock()
+    coordinator.last_update_success = True
+    coordinator.write_scheduler = WriteScheduler(MagicMock())
+    coordinator.data = LocationSnapshot(
+        {record.location_id: record for record in _water_temperatures_from_stored(stored)}
+    )
+    before, after = SQLiteRecorder(), SQLiteRecorder()
+    sensors = [WaterTemperatureSensor(coordinator, record) for record in coordinator.data]
+    for sensor in sensors:
+        sensor.async_write_ha_state = (
+            lambda sensor=sensor: after.record(sensor, refresh_time, WaterTemperatureSensor._unrecorded_attributes)
+        )
+
+    # Hourly refreshes for a day, where every location gets a new reading every 6 hours
+    for hour in range(24):
+        refresh_time = hour * 3600.0
+        records = dict(zip(coordinator.data.ids(), coordinator.data))
+        for index, item in enumerate(stored):
+            if index % 6 == hour % 6:
+                item["temperature"] = round(item["temperature"] + 0.1, 1) if item["temperature"] is not None else 10.0
+                item["time"] = f"2025-06-28T{hour:02d}:00:00+00:00"
+                records[item["location_id"]] = _water_temperatures_from_stored([item])[0]
+        coordinator.data = LocationSnapshot(records)
+        for sensor in sensors:
+            sensor._handle_coordinator_update()
+            # Previously every sensor wrote all attributes on every refresh
+            before.record(sensor, refresh_time)
+
+    (before_rows, before_bytes), (after_rows, after_bytes) = before.usage(), after.usage()
+    usage = f"before={before_rows} rows/{before_bytes / 1024:.0f} KiB after={after_rows} rows/{after_bytes / 1024:.0f} KiB"
+    assert after_rows * 3 < before_rows, usage
+    assert after_bytes * 2 < before_bytes, usage
+
+
+class BurstSensor:
+    """Sensor stand-in whose state write serializes its state into a recorder queue."""
+
+    def __init__(self, index: int, queue: deque) -> None:
+        self.hass = True
+        self.index = index
+        self.queue = queue
+
+    def async_write_ha_state(self) -> None:
+        state = {"entity_id": f"sensor.water_temperature_{self.index}", "state": 15.0 + self.index % 10}
+        state["attributes"] = {f"attribute_{key}": self.index * key for key in range(10)}
+        self.queue.append(json.dumps(state))
+
+
+async def measure_state_writes(write_all, sensor_count: int = 5000) -> tuple[float, int]:
+    """Return the peak event loop latency in seconds and the peak recorder queue depth of writing every sensor."""
+    loop = asyncio.get_running_loop()
+    queue: deque = deque()
+    sensors = [BurstSensor(index, queue) for index in range(sensor_count)]
+    peak_latency = 0.0
+    peak_depth = 0
+    written = 0
+
+    async def ticker() -> None:
+        nonlocal peak_latency
+        while written < sensor_count:
+            expected = loop.time() + 0.001
+            await asyncio.sleep(0.001)
+            peak_latency = max(peak_latency, loop.time() - expected)
+
+    async def recorder() -> None:
+        nonlocal peak_depth, written
+        while written < sensor_count:
+            peak_depth = max(peak_depth, len(queue))
+            for _ in range(min(len(queue), 100)):
+                queue.popleft()
+                written += 1
+            await asyncio.sleep(0)
+
+    tasks = [loop.create_task(ticker()), loop.create_task(recorder())]
+    await asyncio.sleep(0.005)
+    await write_all(sensors)
+    await asyncio.gather(*tasks)
+    return peak_latency, peak_depth
+
+
+@pytest.mark.timing
+@pytest.mark.asyncio
+async def test_chunked_writes_of_5k_sensors_keep_the_loop_responsive():
+    """Chunked writes should bound both event loop stalls and the recorder backlog of a refresh."""
+    hass = MagicMock()
+    hass.async_create_background_task = lambda target, name: asyncio.get_running_loop().create_task(target)
+
+    async def burst(sensors) -> None:
+        for sensor in sensors:
+            sensor.async_write_ha_state()
+
+    async def chunked(sensors) -> None:
+        scheduler = WriteScheduler(hass)
+        with scheduler.batch():
+            for sensor in sensors:
+                scheduler.schedule(sensor)
+        while scheduler.pending:
+            await asyncio.sleep(0)
+
+    burst_latency, burst_depth = await measure_state_writes(burst)
+    chunked_latency, chunked_depth = await measure_state_writes(chunked)
+    measured = (
+        f"Writing 5k sensors: burst={burst_latency * 1000:.1f} ms peak latency/{burst_depth} queued "
+        f"chunked={chunked_latency * 1000:.1f} ms peak latency/{chunked_depth} queued"
+    )
+    assert chunked_depth * 10 < burst_depth, measured
+    assert chunked_latency * 2 < burst_latency, measured
+
+
+def large_registry(stored: list[dict]) -> MagicMock:
+    """Return a 50k entity registry of other integrations that also holds a sensor per stored location."""
+    registry = MagicMock()
+    registry.entities = er.EntityRegistryItems()
+    for index in range(50_000):
+        entry = er.RegistryEntry(
+            entity_id=f"sensor.other_{index}", unique_id=str(index), platform="other", config_entry_id=f"other_{index % 50}"
+        )
+        registry.entities[entry.entity_id] = entry
+    # A previously set up entry monitoring all locations, with most sensors disabled
+    for index, item in enumerate(stored):
+        entry = er.RegistryEntry(
+            entity_id=f"sensor.water_temperature_{index}",
+            unique_id=item["location_id"],
+            platform="yr_norwegian_water_temperatures",
+            config_entry_id="entry",
+            disabled_by=er.RegistryEntryDisabler.INTEGRATION if index % 10 else None,
+        )
+        registry.entities[entry.entity_id] = entry
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_sensor_setup_of_10k_locations_on_a_large_registry(monkeypatch):
+    """Setup should look up its own registry entries by index and only create enabled sensors."""
+    stored = generate_locations(10_000)
+    registry = large_registry(stored)
+    monkeypatch.setattr(er, "async_get", lambda hass: registry)
+    entries_for_config_entry = MagicMock(wraps=er.async_entries_for_config_entry)
+    monkeypatch.setattr(er, "async_entries_for_config_entry", entries_for_config_entry)
+
+    coordinator = MagicMock()
+    coordinator.catalog = None
+    coordinator.selected_location_ids = None
+    coordinator.data = LocationSnapshot(
+        {record.location_id: record for record in _water_temperatures_from_stored(stored)}
+    )
+    config_entry = MagicMock()
+    config_entry.entry_id = "entry"
+    config_entry.options = {}
+    config_entry.runtime_data.coordinator = coordinator
+    added = []
+
+    await sensor_platform.async_setup_entry(MagicMock(), config_entry, added.extend)
+
+    assert len(added) == 1000
+    entries_for_config_entry.assert_called_once_with(registry, "entry")
+
+
+@pytest.mark.timing
+def test_registry_index_lookup_beats_a_scan_of_a_large_registry():
+    """Looking up the entries of one config entry by index should beat scanning the whole registry."""
+    registry = large_registry(generate_locations(10_000))
+
+    scan_seconds = best_of(
+        lambda: {entity.unique_id for entity in registry.entities.values() if entity.config_entry_id == "entry"}
+    )
+    index_seconds = best_of(
+        lambda: {entity.unique_id for entity in er.async_entries_for_config_entry(registry, "entry")}
+    )
+    assert index_seconds < scan_seconds, (
+        f"Registry of 60k entities: scan={scan_seconds * 1000:.1f} ms index={index_seconds * 1000:.1f} ms"
+    )
+
+
+@pytest.mark.timing
+@pytest.mark.parametrize("count", [1_000, 10_000, 100_000])
+def test_warm_start_from_binary_snapshot_compared_to_json(tmp_path, count):
+    """Loading the binary snapshot should beat parsing the JSON cache it mirrors."""
+    stored = generate_locations(count)
+    records = _water_temperatures_from_stored(stored)
+    history = {
+        record.location_id: ReadingHistory.from_stored([[1_750_000_000.0 + hour * 3600, 15.0] for hour in range(4)])
+        for record in records
+    }
+    json_path = tmp_path / "cache.json"
+    json_path.write_text(json.dumps([
+        {**record.to_stored(), "history": history[record.location_id].to_stored()} for record in records
+    ]))
+    snapshot_path = str(tmp_path / "cache.snapshot")
+    write_snapshot(snapshot_path, records, history)
+
+    def load_json():
+        items = json.loads(json_path.read_text())
+        return _water_temperatures_from_stored(items), {
+            item["location_id"]: ReadingHistory.from_stored(item["history"]) for item in items
+        }
+
+    json_seconds = best_of(load_json, repeat=3)
+    binary_seconds = best_of(lambda: read_snapshot(snapshot_path), repeat=3)
+    assert read_snapshot(snapshot_path)[0] == records
+    if count >= 10_000:
+        assert binary_seconds < json_seconds, (
+            f"Warm start of {count} locations: json={json_seconds * 1000:.1f} ms "
+            f"({json_path.stat().st_size / 1024:.0f} KiB) binary={binary_seconds * 1000:.1f} ms "
+            f"({os.path.getsize(snapshot_path) / 1024:.0f} KiB)"
+        )
+
+
+@pytest.mark.timing
+@pytest.mark.asyncio
+async def test_hedged_fetches_cut_the_tail_of_a_heavy_tailed_api(coordinator):
+    """Hedging at the 95th percentile should keep stalls of a few percent of requests out of p99."""
+    async def measure(hedging: bool) -> dict:
+        rng = random.Random(7)
+
+        async def fetch():
+            # 3% of requests stall for 150 ms, the rest answer in 2-4 ms
+            await asyncio.sleep(0.15 if rng.random() < 0.03 else rng.uniform(0.002, 0.004))
+            return []
+
+        coordinator.client.async_get_all_water_temperatures.side_effect = fetch
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_ENABLE_HEDGING: hedging}
+        coordinator.fetch_latency = FetchLatency()
+        for _ in range(LATENCY_SAMPLES):
+            await coordinator._async_fetch()
+        return coordinator.fetch_latency.as_dict()
+
+    plain = await measure(hedging=False)
+    hedged = await measure(hedging=True)
+    measured = (
+        "Fetch latency of 100 fetches with 3% stalls: "
+        + " ".join(
+            f"{name}=p50 {result['p50'] * 1000:.1f}/p95 {result['p95'] * 1000:.1f}/p99 {result['p99'] * 1000:.1f} ms"
+            for name, result in (("plain", plain), ("hedged", hedged))
+        )
+        + f" hedged={hedged['hedged']} wins={hedged['hedge_wins']}"
+    )
+    assert hedged["hedge_wins"] > 0, measured
+    assert hedged["p99"] * 3 < plain["p99"], measured
+
+
+def test_validation_of_10k_valid_api_records_allocates_nothing():
+    """With all records valid, validating every refresh should return the input and allocate nothing."""
+    large = api_data(generate_locations(10_000))
+    stats = QuarantineStats()
+
+    retained, result = retained_bytes(lambda: validate_api_records(large, stats))
+
+    assert result is large
+    assert retained == 0
+
+
+@pytest.mark.timing
+def test_validation_of_10k_api_records_is_linear():
+    """Validating every refresh should cost milliseconds and grow linearly with the number of records."""
+    small = api_data(generate_locations(1_000))
+    large = api_data(generate_locations(10_000))
+    stats = QuarantineStats()
+
+    small_seconds = best_of(lambda: validate_api_records(small, stats))
+    large_seconds = best_of(lambda: validate_api_records(large, stats))
+
+    timings = f"Validate API records: 1k={small_seconds * 1000:.2f} ms 10k={large_seconds * 1000:.2f} ms"
+    assert large_seconds < 0.05, timings
+    assert large_seconds < small_seconds * 20, timings
+
+
+@pytest.mark.asyncio
+async def test_refresh_of_10k_locations_skips_disabled_sensors(mock_hass, mock_config_entry, monkeypatch):
+    """With most sensors disabled, a refresh with new readings should only do entity work for the enabled ones."""
+    first_readings = api_data(generate_locations(10_000))
+    new_readings = [
+        WaterTemperatureData(**{**vars(data), "temperature": data.temperature + 0.5}) for data in first_readings
+    ]
+    monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.async_get_clientsession', MagicMock())
+    mock_config_entry.entry_id = "test_entry"
+    mock_config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
+    hass = MagicMock()
+    hass.async_create_background_task = lambda target, name: asyncio.get_running_loop().create_task(target)
+
+    def write_state(sensor: WaterTemperatureSensor, writes: list[str]) -> None:
+        # The state and attributes Home Assistant reads on every write
+        sensor.native_value, dict(sensor.extra_state_attributes)
+        writes.append(sensor.unique_id)
+
+    async def refresh(disabled_ids: list[str]) -> tuple[int, ApiCoordinator]:
+        registry = MagicMock()
+        registry.async_entries_for_config_entry.return_value = [
+            SimpleNamespace(unique_id=location_id, disabled_by=er.RegistryEntryDisabler.USER)
+            for location_id in disabled_ids
+        ]
+        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.er', registry)
+        coordinator = ApiCoordinator(mock_hass, mock_config_entry)
+        coordinator.client = AsyncMock()
+        coordinator.store = AsyncMock()
+        coordinator.store.async_load.return_value = []
+        coordinator.write_scheduler = WriteScheduler(hass)
+        monkeypatch.setattr(coordinator, 'cleanup_old_entities', AsyncMock())
+        coordinator.client.async_get_all_water_temperatures.return_value = first_readings
+        await coordinator._async_update_data()
+        # Home Assistant only adds the sensors that are not disabled
+        sensors = [
+            WaterTemperatureSensor(coordinator, record)
+            for record in coordinator.data
+            if record.location_id not in coordinator.disabled_location_ids
+        ]
+        writes: list[str] = []
+        for sensor in sensors:
+            sensor.hass = hass
+            sensor.async_write_ha_state = partial(write_state, sensor, writes)
+
+        # Alternate the readings so that every refresh brings a new reading for every location
+        for readings in (new_readings, first_readings, new_readings):
+            coordinator.client.async_get_all_water_temperatures.return_value = readings
+            await coordinator._async_update_data()
+            with coordinator.write_scheduler.batch():
+                for sensor in sensors:
+                    sensor._handle_coordinator_update()
+            while coordinator.write_scheduler.pending:
+                await asyncio.sleep(0)
+        return len(writes), coordinator
+
+    enabled_writes, _ = await refresh([])
+    disabled_writes, coordinator = await refresh([data.location_id for data in first_readings[1_000:]])
+
+    assert enabled_writes == 3 * 10_000
+    assert disabled_writes == 3 * 1_000
+    assert len(coordinator.data) == 10_000
+    assert len(coordinator.history) == 1_000
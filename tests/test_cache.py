@@ -0,0 +1,42 @@
+"""Tests for the bounds of the locations cache."""
+from datetime import datetime, timedelta, timezone
+
+from custom_components.yr_norwegian_water_temperatures.cache import select_evictions
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from tests.conftest import mock_location
+
+NOW = datetime(2025, 7, 1, 12, tzinfo=timezone.utc)
+
+
+def cached(**ages_in_days: float | None) -> dict[str, WaterTemperatureRecord]:
+    """Return cached records measured the given number of days ago, or without a time for None."""
+    locations = {}
+    for location_id, age in ages_in_days.items():
+        record = WaterTemperatureRecord.from_api(mock_location(location_id=location_id))
+        record.time = NOW - timedelta(days=age) if age is not None else None
+        locations[location_id] = record
+    return locations
+
+
+def test_expired_and_oldest_unmonitored_locations_are_evicted():
+    """Test that old readings expire, then the oldest unmonitored readings go to fit the size."""
+    locations = cached(pinned=400, expired=100, old=20, undated=None, recent=1, newest=0)
+
+    expired, overflow = select_evictions(locations, {"pinned"}, 3, timedelta(days=90), NOW)
+
+    assert expired == ["expired"]
+    assert overflow == ["undated", "old"]
+
+
+def test_no_bounds_keep_every_location():
+    """Test that a size and age of 0 disable eviction."""
+    locations = cached(a=400, b=1)
+
+    assert select_evictions(locations, set(), 0, None, NOW) == ([], [])
+
+
+def test_pinned_locations_are_kept_beyond_the_size():
+    """Test that only unmonitored locations are evicted even when pinned ones exceed the size."""
+    locations = cached(a=3, b=2, c=1)
+
+    assert select_evictions(locations, {"a", "b"}, 1, None, NOW) == ([], ["c"])
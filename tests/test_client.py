@@ -0,0 +1,58 @@
+"""Tests for the API client parsing each location on its own."""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import ClientTimeout
+
+from custom_components.yr_norwegian_water_temperatures.client import (
+    WaterTemperatureClient,
+    parse_water_temperatures,
+)
+from custom_components.yr_norwegian_water_temperatures.validation import QuarantineStats
+from tests.simulator import load_seed_locations, to_api_format
+
+
+def test_unparsable_items_are_quarantined():
+    """Test that items with an unreadable time or missing fields are skipped and counted."""
+    items = [to_api_format(location) for location in load_seed_locations()[:3]]
+    items[0]["time"] = "not a time"
+    del items[1]["position"]
+    stats = QuarantineStats()
+
+    records = parse_water_temperatures([*items, "text"], stats)
+
+    assert [record.location_id for record in records] == [items[2]["locationId"]]
+    assert stats.reasons == {"invalid_time": 1, "missing_field": 2}
+    assert stats.last_refresh == 3
+
+
+def test_missing_source_defaults_to_manual():
+    """Test that a reading without a source name gets the same source as from the library."""
+    item = to_api_format(load_seed_locations()[0])
+    item.pop("sourceDisplayName", None)
+
+    records = parse_water_temperatures([item], QuarantineStats())
+
+    assert records[0].source == "Manual"
+
+
+def test_response_that_is_not_a_list_is_refused():
+    """Test that an unexpected response fails instead of quarantining every item."""
+    with pytest.raises(ValueError):
+        parse_water_temperatures({"error": "unavailable"}, QuarantineStats())
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_set_on_each_request():
+    """Test that the timeouts apply to the request whichever session is used."""
+    response = MagicMock(status=200)
+    response.json = AsyncMock(return_value=[])
+    session = MagicMock()
+    session.get.return_value.__aenter__ = AsyncMock(return_value=response)
+    session.get.return_value.__aexit__ = AsyncMock(return_value=None)
+    timeout = ClientTimeout(total=60, connect=10, sock_read=30)
+    client = WaterTemperatureClient("key", session, QuarantineStats(), timeout)
+
+    assert await client.async_get_all_water_temperatures() == []
+    assert session.get.call_args.kwargs["timeout"] is timeout
+    assert session.get.call_args.kwargs["headers"] == {"apikey": "key"}
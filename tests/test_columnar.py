@@ -0,0 +1,61 @@
+"""Tests for the columnar location store."""
+from datetime import datetime
+
+from custom_components.yr_norwegian_water_temperatures.columnar import ColumnarLocations
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from tests.conftest import mock_location
+
+
+def record(location_id: str, temperature: float | None = 15.0, time: str = "2025-06-28T09:00:00+02:00"):
+    """Return a record for the given location."""
+    return WaterTemperatureRecord.from_api(
+        mock_location(location_id=location_id, temperature=temperature, time=time)
+    )
+
+
+def test_update_replaces_existing_rows():
+    """Test that updating a known location rewrites its row instead of appending one."""
+    columns = ColumnarLocations()
+    columns.update([record("a"), record("b")])
+
+    columns.update([record("b", time="2024-01-01T00:00:00+00:00")])
+
+    assert len(columns) == 2
+    assert columns.ids_older_than(datetime.fromisoformat("2025-01-01T00:00:00+00:00")) == ["b"]
+
+
+def test_rows_grow_beyond_initial_capacity():
+    """Test that appending many locations keeps earlier rows intact."""
+    columns = ColumnarLocations()
+    columns.update(record(f"id-{index}", temperature=index) for index in range(1999))
+    columns.update([record("id-1999", time="2024-01-01T00:00:00+00:00")])
+
+    assert len(columns) == 2000
+    assert columns.ids_older_than(datetime.fromisoformat("2025-01-01T00:00:00+00:00")) == ["id-1999"]
+
+
+def test_ids_older_than_ignores_missing_time():
+    """Test the vectorized stale cutoff."""
+    columns = ColumnarLocations()
+    columns.update([
+        record("old", time="2024-01-01T00:00:00+00:00"),
+        record("new", time="2025-06-28T00:00:00+00:00"),
+    ])
+    no_time = record("no-time")
+    no_time.time = None
+    columns.update([no_time])
+
+    assert columns.ids_older_than(datetime.fromisoformat("2025-01-01T00:00:00+00:00")) == ["old"]
+
+
+def test_remove_moves_last_row_into_freed_slot():
+    """Test that removing a row keeps the ID index consistent."""
+    columns = ColumnarLocations()
+    columns.update([record("a", 10.0), record("b", 20.0), record("c", 30.0)])
+
+    columns.remove(["a", "unknown"])
+    columns.update([record("c", 31.0, time="2024-01-01T00:00:00+00:00")])
+
+    assert len(columns) == 2
+    assert columns.ids_older_than(datetime.fromisoformat("2025-01-01T00:00:00+00:00")) == ["c"]
+    assert sorted(columns.ids_older_than(datetime.fromisoformat("2030-01-01T00:00:00+00:00"))) == ["b", "c"]
@@ -1,12 +1,14 @@
 """Tests for the coordinator module, specifically the _async_update_data function."""
+import asyncio
 from datetime import datetime, timedelta
 
 import pytest
-from unittest.mock import AsyncMock, patch, Mock
+from unittest.mock import AsyncMock, MagicMock, patch, Mock
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from custom_components.yr_norwegian_water_temperatures.coordinator import ApiCoordinator
 from custom_components.yr_norwegian_water_temperatures.const import *
+from custom_components.yr_norwegian_water_temperatures.models import LocationSnapshot, WaterTemperatureRecord
 from tests.conftest import mock_location, mock_water_temperature_data, load_test_data
 from yrwatertemperatures import WaterTemperatureData
 
@@ -27,6 +29,11 @@ def stored_location_data(location: WaterTemperatureData) -> dict:
     }
 
 
+def as_records(locations: list[WaterTemperatureData]) -> list[WaterTemperatureRecord]:
+    """Convert API data to the integration's internal records."""
+    return [WaterTemperatureRecord.from_api(location) for location in locations]
+
+
 def location_by_id(locations, location_id: str):
     """Return a location from a list by location ID."""
     return next(
@@ -42,8 +49,8 @@ class TestApiCoordinatorAsyncUpdateData:
     def coordinator(self, mock_hass, mock_config_entry, monkeypatch):
         """Create an ApiCoordinator instance for testing."""
         # Ensure mock_config_entry has options attribute
-        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.async_get_clientsession', AsyncMock())
-        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.er', AsyncMock())
+        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.async_get_clientsession', MagicMock())
+        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.er', MagicMock())
 
         coordinator = ApiCoordinator(mock_hass, mock_config_entry)
         coordinator.client = AsyncMock()
@@ -69,7 +76,7 @@ class TestApiCoordinatorAsyncUpdateData:
         result = await coordinator._async_update_data()
 
         # Assert
-        assert result == mock_water_temperature_data()
+        assert list(result) == as_records(mock_water_temperature_data())
         assert len(result) == len(mock_water_temperature_data())
 
     @pytest.mark.asyncio
@@ -179,7 +186,7 @@ class TestApiCoordinatorAsyncUpdateData:
         result = await coordinator._async_update_data()
 
         # Assert - should return empty list
-        assert result == []
+        assert len(result) == 0
 
 
     @pytest.mark.asyncio
@@ -197,7 +204,7 @@ class TestApiCoordinatorAsyncUpdateData:
         result = await coordinator._async_update_data()
 
         # Assert - should return empty list
-        assert result == []
+        assert len(result) == 0
 
 
     @pytest.mark.asyncio
@@ -216,6 +223,24 @@ class TestApiCoordinatorAsyncUpdateData:
         coordinator.store.async_save.assert_not_called()
 
 
+    @pytest.mark.asyncio
+    async def test_api_error_reports_no_changed_alert_rules(self, coordinator):
+        """Test that the cached fallback does not make alert sensors rewrite the previous refresh's changes."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = [mock_location(location_id="warm", temperature=25.0)]
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_ALERT_RULES: "all > 20"}
+        await coordinator._async_update_data()
+        assert coordinator.alerts.changed_rules == {0}
+        coordinator.client.async_get_all_water_temperatures.side_effect = Exception("API Error")
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        assert coordinator.alerts.changed_rules == frozenset()
+
+
     @pytest.mark.asyncio
     async def test_permission_error_raises_auth_failed(self, coordinator):
         """Test that permission errors (invalid API key) trigger reauth handling."""
@@ -244,6 +269,56 @@ class TestApiCoordinatorAsyncUpdateData:
         assert "Error fetching data: API Error" in str(exc_info.value)
 
 
+    @pytest.mark.asyncio
+    async def test_stalled_fetch_times_out_and_uses_cached_data(self, coordinator):
+        """Test that a fetch exceeding the total timeout is cancelled, counted and served from the cache."""
+        # Arrange
+        async def stall():
+            await asyncio.sleep(10)
+
+        coordinator.store.async_load.return_value = load_test_data()
+        coordinator.client.async_get_all_water_temperatures.side_effect = stall
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_FETCH_TIMEOUT: 0.05}
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert len(result) == len(load_test_data())
+        assert coordinator.fetch_latency.timeouts == 1
+        assert len(coordinator.fetch_latency) == 0
+
+
+    @pytest.mark.asyncio
+    async def test_slow_fetch_is_hedged_once_latencies_are_known(self, coordinator):
+        """Test that a fetch slower than the configured percentile is answered by a second request."""
+        # Arrange
+        calls = []
+
+        async def fetch():
+            calls.append(None)
+            # The first hedged fetch stalls, its second request answers at once
+            if len(calls) == 11:
+                await asyncio.sleep(10)
+            else:
+                await asyncio.sleep(0.01)
+            return mock_water_temperature_data()
+
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.side_effect = fetch
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_ENABLE_HEDGING: True}
+
+        # Act
+        for _ in range(11):
+            await coordinator._async_update_data()
+
+        # Assert
+        assert len(calls) == 12
+        assert coordinator.fetch_latency.hedged == 1
+        assert coordinator.fetch_latency.hedge_wins == 1
+        assert coordinator.fetch_latency.percentile(100) < 1
+
+
     @pytest.mark.asyncio
     async def test_loading_data_from_store(self, coordinator):
         """Test that data is loaded from the store and returned correctly."""
@@ -391,7 +466,7 @@ class TestApiCoordinatorAsyncUpdateData:
             temperature=17.5,
             time="2025-06-28T09:00:00+02:00",
         )
-        coordinator.data = [existing_location]
+        coordinator._locations = {existing_location.location_id: WaterTemperatureRecord.from_api(existing_location)}
         coordinator.store.async_load.return_value = []
         coordinator.client.async_get_all_water_temperatures.return_value = [updated_location]
         coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
@@ -498,7 +573,7 @@ class TestApiCoordinatorAsyncUpdateData:
         result = await coordinator._async_update_data()
 
         # Assert
-        assert result == [no_time_location]
+        assert list(result) == as_records([no_time_location])
         coordinator.cleanup_old_entities.assert_not_called()
 
 
@@ -523,4 +598,593 @@ class TestApiCoordinatorAsyncUpdateData:
         # Verify that cleanup_old_entities was called with the correct location ID
         coordinator.cleanup_old_entities.assert_called_once_with(
             [loc.location_id for loc in mock_water_temperature_data() if loc.location_id not in ["11-17685", "1-46482"]]
-        )
\ No newline at end of file
+        )
+
+    @pytest.mark.asyncio
+    async def test_cached_locations_share_parsed_timestamps(self, coordinator):
+        """Test that identical cached timestamps are parsed once and shared."""
+        # Arrange
+        first = mock_location(location_id="first", time="2025-06-27T09:00:00+02:00")
+        second = mock_location(location_id="second", time="2025-06-27T09:00:00+02:00")
+        coordinator.store.async_load.return_value = [stored_location_data(first), stored_location_data(second)]
+
+        # Act
+        result = await coordinator._async_load_stored_locations()
+
+        # Assert
+        assert [loc.location_id for loc in result] == ["first", "second"]
+        assert result[0].time == first.time
+        assert result[0].time is result[1].time
+
+
+    @pytest.mark.asyncio
+    async def test_invalid_cached_locations_are_quarantined(self, coordinator):
+        """Test that invalid cached items are skipped and counted while the rest of the cache loads."""
+        # Arrange
+        valid = stored_location_data(mock_location(location_id="valid"))
+        bad_time = {**valid, "location_id": "bad-time", "time": "not a time"}
+        missing_name = {key: value for key, value in valid.items() if key != "name"}
+        coordinator.store.async_load.return_value = [valid, bad_time, missing_name, "not an object"]
+
+        # Act
+        result = await coordinator._async_load_stored_locations()
+
+        # Assert
+        assert [location.location_id for location in result] == ["valid"]
+        assert coordinator.quarantine.cache == 3
+        assert coordinator.quarantine.reasons == {"invalid_time": 1, "missing_field": 1, "not_an_object": 1}
+        assert coordinator.quarantine.samples[0] == {
+            "source": "cache", "index": 1, "location_id": "bad-time", "reason": "invalid_time",
+        }
+
+
+    @pytest.mark.asyncio
+    async def test_invalid_api_records_are_quarantined(self, coordinator):
+        """Test that one malformed API record is dropped without failing the refresh."""
+        # Arrange
+        bad = mock_location(location_id="bad")
+        bad.temperature = float("nan")
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = [*mock_water_temperature_data(), bad]
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert len(result) == len(mock_water_temperature_data())
+        assert "bad" not in coordinator.locations
+        assert coordinator.quarantine.last_refresh == 1
+        assert coordinator.quarantine.reasons == {"invalid_temperature": 1}
+
+
+    @pytest.mark.asyncio
+    async def test_unchanged_readings_keep_shared_records(self, coordinator):
+        """Test that a refresh reuses records whose reading did not change and reports changes."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="same", temperature=15.0),
+            mock_location(location_id="changed", temperature=15.0),
+        ]
+        first = await coordinator._async_update_data()
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="same", temperature=15.0),
+            mock_location(location_id="changed", temperature=16.0),
+        ]
+
+        # Act
+        second = await coordinator._async_update_data()
+
+        # Assert
+        assert isinstance(second, LocationSnapshot)
+        assert second.get("same") is first.get("same")
+        assert second.get("changed").temperature == 16.0
+        assert first.changed_ids == {"same", "changed"}
+        assert second.changed_ids == {"changed"}
+        assert second.removed_ids == frozenset()
+        coordinator.store.async_load.assert_called_once()
+
+
+    @pytest.mark.asyncio
+    async def test_snapshot_reports_locations_no_longer_monitored(self, coordinator):
+        """Test that locations filtered out after an options change are reported as removed."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = mock_water_temperature_data()
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
+        await coordinator._async_update_data()
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: False, CONF_LOCATIONS: "1-46482"}
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert list(result.ids()) == ["1-46482"]
+        assert result.changed_ids == frozenset()
+        assert len(result.removed_ids) == len(mock_water_temperature_data()) - 1
+
+
+    @pytest.mark.asyncio
+    async def test_nearest_selection_picks_closest_locations(self, coordinator):
+        """Test that the nearest selection monitors the N locations closest to the center."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = mock_water_temperature_data()
+        coordinator.config_entry.options = {
+            CONF_SPATIAL_SELECTION: SPATIAL_SELECTION_NEAREST,
+            CONF_NEAREST_COUNT: 2,
+            CONF_CENTER_LATITUDE: 59.40971,
+            CONF_CENTER_LONGITUDE: 10.65492,
+        }
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert sorted(loc.name for loc in result) == ["Eldøya", "Nordre Feste"]
+
+
+    @pytest.mark.asyncio
+    async def test_radius_selection_around_home_is_combined_with_names(self, coordinator):
+        """Test that the radius selection defaults to home and adds to named locations."""
+        # Arrange
+        coordinator.hass.config.latitude = 59.39842
+        coordinator.hass.config.longitude = 10.47995
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = mock_water_temperature_data()
+        coordinator.config_entry.options = {
+            CONF_LOCATIONS: "Nordre Jarlsberg Brygge",
+            CONF_SPATIAL_SELECTION: SPATIAL_SELECTION_RADIUS,
+            CONF_RADIUS_KM: 5.7,
+        }
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert - Rørestrand is home, Åsgårdstrand is 5.5 km away and Løvøya 5.9 km
+        assert sorted(loc.name for loc in result) == ["Nordre Jarlsberg Brygge", "Rørestrand", "Åsgårdstrand"]
+
+
+    @pytest.mark.asyncio
+    async def test_county_and_municipality_selection(self, coordinator):
+        """Test that locations are selected by county or municipality, ignoring case."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = mock_water_temperature_data()
+        coordinator.config_entry.options = {CONF_COUNTIES: "østfold", CONF_MUNICIPALITIES: "Holmestrand"}
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert sorted(loc.name for loc in result) == ["Eldøya", "Nordre Feste", "Nordre Jarlsberg Brygge"]
+
+
+    @pytest.mark.asyncio
+    async def test_region_selection_follows_new_and_moved_locations(self, coordinator):
+        """Test that new spots in a selected region are picked up and moved spots are dropped."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.config_entry.options = {CONF_MUNICIPALITIES: "Bergen"}
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="a", municipality="Bergen"),
+            mock_location(location_id="b", municipality="Askøy"),
+        ]
+        first = await coordinator._async_update_data()
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="a", municipality="Bjørnafjorden"),
+            mock_location(location_id="c", municipality="Bergen"),
+        ]
+
+        # Act
+        second = await coordinator._async_update_data()
+
+        # Assert
+        assert list(first.ids()) == ["a"]
+        assert list(second.ids()) == ["c"]
+        assert second.removed_ids == {"a"}
+
+
+    @pytest.mark.asyncio
+    async def test_catalog_mode_only_monitors_pinned_locations(self, coordinator):
+        """Test that catalog mode keeps every location in memory but only pinned ones in the snapshot."""
+        # Arrange
+        locations = mock_water_temperature_data()
+        for location in locations:
+            # Recent enough for the catalog summary
+            location.time = datetime.now().astimezone() - timedelta(hours=1)
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = locations
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True,
+            CONF_CATALOG_MODE: True,
+            CONF_LOCATIONS: "1-46482",
+            # The test readings are older than the default age bound of unmonitored locations
+            CONF_CACHE_MAX_AGE_DAYS: 0,
+        }
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert list(result.ids()) == ["1-46482"]
+        assert len(coordinator.locations) == len(locations)
+        temperatures = [location.temperature for location in locations if location.temperature is not None]
+        summary = coordinator.catalog.summary()
+        assert summary.count == len(temperatures)
+        assert summary.maximum == max(temperatures)
+
+
+    @pytest.mark.asyncio
+    async def test_disabled_sensors_are_skipped_while_their_locations_stay_monitored(self, coordinator, monkeypatch):
+        """Test that in all-locations mode disabled sensors get no history but still count in region aggregates."""
+        # Arrange
+        registry = MagicMock()
+        registry.async_entries_for_config_entry.return_value = [
+            Mock(unique_id="11-17685", disabled_by="user"),
+            Mock(unique_id="unrelated", disabled_by=None),
+        ]
+        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.er', registry)
+        locations = mock_water_temperature_data()
+        disabled = next(location for location in locations if location.location_id == "11-17685")
+        selected_id = next(location.location_id for location in locations if location.name == "Løvøya")
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = locations
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True,
+            CONF_LOCATIONS: "Løvøya",
+            CONF_DISABLE_UNSELECTED: True,
+            CONF_ENABLE_REGION_SENSORS: True,
+        }
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert len(result) == len(locations)
+        assert "11-17685" not in coordinator.history
+        assert selected_id in coordinator.history
+        county_readings = [
+            location for location in locations
+            if location.county == disabled.county and location.temperature is not None
+        ]
+        assert coordinator.region_aggregates.summary("county", disabled.county).count == len(county_readings)
+        assert coordinator.selected_location_ids == {selected_id}
+
+
+    @pytest.mark.asyncio
+    async def test_region_change_with_the_same_reading_moves_the_location(self, coordinator):
+        """Test that a location moving to another municipality with an unchanged reading changes its region."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="moved", municipality="Bergen")
+        ]
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_ENABLE_REGION_SENSORS: True}
+        await coordinator._async_update_data()
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="moved", municipality="Askøy")
+        ]
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert result.changed_ids == {"moved"}
+        assert coordinator.region_aggregates.summary("municipality", "Askøy").count == 1
+        assert coordinator.region_aggregates.summary("municipality", "Bergen").count == 0
+
+
+    @pytest.mark.asyncio
+    async def test_catalog_drops_readings_that_age_past_the_cutoff(self, coordinator, monkeypatch):
+        """Test that a reading leaves the catalog summary once too old, even without a new reading."""
+        # Arrange
+        recent = mock_location(location_id="recent", time=(datetime.now().astimezone() - timedelta(hours=1)).isoformat())
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = [recent]
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_CATALOG_MODE: True}
+        await coordinator._async_update_data()
+        assert coordinator.catalog.summary().count == 1
+        monkeypatch.setattr(
+            'custom_components.yr_norwegian_water_temperatures.coordinator.CATALOG_MAX_READING_AGE',
+            timedelta(minutes=30),
+        )
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        assert coordinator.catalog.summary().count == 0
+        assert "recent" in coordinator.locations
+
+
+    @pytest.mark.asyncio
+    async def test_unmonitored_locations_are_evicted_beyond_cache_bounds(self, coordinator):
+        """Test that eviction keeps pinned locations and drops evicted ones from every index."""
+        # Arrange
+        now = datetime.now().astimezone()
+        locations = [
+            mock_location(location_id="pinned", time=(now - timedelta(days=400)).isoformat()),
+            mock_location(location_id="expired", time=(now - timedelta(days=100)).isoformat()),
+            mock_location(location_id="old", county="Old County", time=(now - timedelta(days=2)).isoformat()),
+            mock_location(location_id="recent", time=(now - timedelta(days=1)).isoformat()),
+        ]
+        coordinator.store.async_load.return_value = []
+        coordinator.client.async_get_all_water_temperatures.return_value = locations
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True,
+            CONF_CATALOG_MODE: True,
+            CONF_LOCATIONS: "pinned",
+            CONF_CACHE_MAX_ENTRIES: 2,
+            CONF_CACHE_MAX_AGE_DAYS: 90,
+            CONF_ALERT_RULES: "all > 10",
+        }
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        assert list(result.ids()) == ["pinned"]
+        assert sorted(coordinator.locations) == ["pinned", "recent"]
+        assert sorted(coordinator.history) == ["pinned", "recent"]
+        assert len(coordinator.spatial_index) == 2
+        assert coordinator.location_index.counties.lookup(["Old County"]) == set()
+        # The pinned reading is kept but too old for the catalog summary
+        assert coordinator.catalog.summary().count == 1
+        assert sorted(coordinator.alerts.active[0]) == ["pinned", "recent"]
+        assert coordinator.cache_stats.as_dict() == {
+            "size": 2, "pinned": 1, "evicted_expired": 1, "evicted_overflow": 1, "last_evicted": 2,
+        }
+        saved = coordinator.store.async_save.call_args.args[0]
+        assert sorted(item["location_id"] for item in saved) == ["pinned", "recent"]
+
+
+    @pytest.mark.asyncio
+    async def test_evicted_location_stays_out_until_it_reports_a_new_reading(self, coordinator):
+        """Test that the API returning an evicted stale location again does not re-admit it or fire events."""
+        # Arrange
+        now = datetime.now().astimezone()
+        stale = mock_location(location_id="stale", temperature=20.0, time=(now - timedelta(days=200)).isoformat())
+        pinned = mock_location(location_id="pinned", temperature=15.0, time=(now - timedelta(hours=1)).isoformat())
+        coordinator.store.async_load.return_value = []
+        coordinator.hass.config.latitude, coordinator.hass.config.longitude = 60.0, 10.0
+        coordinator.client.async_get_all_water_temperatures.return_value = [stale, pinned]
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True,
+            CONF_CATALOG_MODE: True,
+            CONF_LOCATIONS: "pinned",
+            CONF_CACHE_MAX_AGE_DAYS: 90,
+            CONF_ALERT_RULES: "all > 18",
+            CONF_ENABLE_READINGS_EVENT: True,
+        }
+        await coordinator._async_update_data()
+        assert sorted(coordinator.locations) == ["pinned"]
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        coordinator.hass.bus.async_fire.assert_not_called()
+        assert sorted(coordinator.locations) == ["pinned"]
+        assert "stale" not in coordinator.history
+        assert coordinator.cache_stats.last_evicted == 0
+
+        # A new reading brings it back
+        fresh = mock_location(location_id="stale", temperature=19.0, time=now.isoformat())
+        coordinator.client.async_get_all_water_temperatures.return_value = [fresh, pinned]
+        await coordinator._async_update_data()
+        assert sorted(coordinator.locations) == ["pinned", "stale"]
+
+
+    @pytest.mark.asyncio
+    async def test_evictions_are_forgotten_after_the_cache_age(self, coordinator, monkeypatch):
+        """Test that evictions of locations the API stopped returning do not accumulate."""
+        # Arrange
+        now = datetime.now().astimezone()
+        stale = mock_location(location_id="stale", time=(now - timedelta(days=200)).isoformat())
+        coordinator.store.async_load.return_value = []
+        pinned = mock_location(location_id="pinned", time=(now - timedelta(hours=1)).isoformat())
+        coordinator.client.async_get_all_water_temperatures.return_value = [stale, pinned]
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True,
+            CONF_CATALOG_MODE: True,
+            CONF_LOCATIONS: "pinned",
+            CONF_CACHE_MAX_AGE_DAYS: 90,
+        }
+        await coordinator._async_update_data()
+        assert list(coordinator._evicted) == ["stale"]
+        coordinator.client.async_get_all_water_temperatures.return_value = [pinned]
+        mock_dt = Mock()
+        mock_dt.now.return_value.astimezone.return_value = now + timedelta(days=91)
+        monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.dt', mock_dt)
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        assert coordinator._evicted == {}
+
+
+    @pytest.mark.asyncio
+    async def test_binary_cache_migrates_from_json_and_is_used_on_restart(self, coordinator, mock_config_entry, tmp_path):
+        """Test that the JSON cache seeds the binary snapshot, which is then loaded instead of the JSON cache."""
+        # Arrange
+        cached = mock_location(location_id="cached", temperature=14.0)
+        coordinator.hass.async_add_executor_job = AsyncMock(side_effect=lambda target, *args: target(*args))
+        coordinator._snapshot_path = str(tmp_path / "cache.snapshot")
+        coordinator.store.path = str(tmp_path / "cache")
+        coordinator.store.async_load.return_value = [stored_location_data(cached)]
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="cached", temperature=16.0, time="2023-10-02T12:00:00+00:00"),
+        ]
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True, CONF_BINARY_CACHE: True, CONF_CACHE_MAX_AGE_DAYS: 0,
+        }
+        await coordinator._async_update_data()
+
+        restarted = ApiCoordinator(coordinator.hass, mock_config_entry)
+        restarted._snapshot_path = coordinator._snapshot_path
+        restarted.store = AsyncMock()
+        restarted.store.path = coordinator.store.path
+        restarted.client = AsyncMock()
+        restarted.client.async_get_all_water_temperatures.return_value = []
+
+        # Act
+        result = await restarted._async_update_data()
+
+        # Assert
+        restarted.store.async_load.assert_not_called()
+        assert result.get("cached").temperature == 16.0
+        assert [value for _, value in restarted.history["cached"]] == [14.0, 16.0]
+
+
+    @pytest.mark.asyncio
+    async def test_statistics_import_backfills_history_then_imports_new_readings(self, coordinator, monkeypatch):
+        """Test that the cached history is backfilled once and later only new readings are imported."""
+        # Arrange
+        imported = []
+        monkeypatch.setattr(
+            "custom_components.yr_norwegian_water_temperatures.coordinator.async_import_readings",
+            lambda hass, records, history, backfill: imported.append(
+                (backfill, sorted(record.location_id for record in records), history is coordinator.history)
+            ),
+        )
+        coordinator.hass.config.components = {"recorder"}
+        cached = mock_location(location_id="cached")
+        coordinator.store.async_load.return_value = [stored_location_data(cached)]
+        coordinator.client.async_get_all_water_temperatures.return_value = [cached]
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_IMPORT_STATISTICS: True}
+        await coordinator._async_update_data()
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            cached, mock_location(location_id="new")
+        ]
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        assert imported == [(True, ["cached"], True), (False, [], True), (False, ["new"], True)]
+
+
+    @pytest.mark.asyncio
+    async def test_reading_history_sets_trend_and_is_persisted(self, coordinator):
+        """Test that new readings extend the history, set trend attributes and are saved with the cache."""
+        # Arrange
+        cached = mock_location(location_id="beach", temperature=14.0, time="2025-06-27T09:00:00+00:00")
+        stored = stored_location_data(cached)
+        stored["history"] = [[datetime.fromisoformat("2025-06-26T09:00:00+00:00").timestamp(), 12.0]]
+        coordinator.store.async_load.return_value = [stored]
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="beach", temperature=16.0, time="2025-06-28T09:00:00+00:00")
+        ]
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True}
+
+        # Act
+        result = await coordinator._async_update_data()
+
+        # Assert
+        attributes = result.get("beach").attributes
+        assert attributes["trend_per_day"] == 2.0
+        assert attributes["change_24h"] == 2.0
+        saved = coordinator.store.async_save.call_args.args[0]
+        assert [value for _, value in location_by_id(saved, "beach")["history"]] == [12.0, 14.0, 16.0]
+
+
+    @pytest.mark.asyncio
+    async def test_threshold_crossings_fire_one_event_per_refresh(self, coordinator):
+        """Test that the first refresh sets the alert state and later crossings fire a single event."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.hass.config.latitude, coordinator.hass.config.longitude = 60.0, 10.0
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_ALERT_RULES: "all > 18"}
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="a", temperature=19.0),
+            mock_location(location_id="b", temperature=15.0),
+            mock_location(location_id="c", temperature=15.0),
+        ]
+        await coordinator._async_update_data()
+        coordinator.hass.bus.async_fire.assert_not_called()
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="a", temperature=19.0),
+            mock_location(location_id="b", temperature=18.5),
+            mock_location(location_id="c", temperature=20.0),
+        ]
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        coordinator.hass.bus.async_fire.assert_called_once()
+        event_type, data = coordinator.hass.bus.async_fire.call_args.args
+        assert event_type == EVENT_THRESHOLD_CROSSED
+        assert sorted(item["location_id"] for item in data["crossings"]) == ["b", "c"]
+        assert coordinator.alerts.active[0].keys() == {"a", "b", "c"}
+
+
+    @pytest.mark.asyncio
+    async def test_changed_readings_fire_one_event_with_deltas(self, coordinator):
+        """Test that a refresh fires a single event listing the changed readings and their deltas."""
+        # Arrange
+        coordinator.store.async_load.return_value = []
+        coordinator.config_entry.options = {CONF_GET_ALL_LOCATIONS: True, CONF_ENABLE_READINGS_EVENT: True}
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="same", temperature=15.0),
+            mock_location(location_id="warmer", temperature=15.0),
+        ]
+        await coordinator._async_update_data()
+        coordinator.hass.bus.async_fire.assert_not_called()
+        coordinator.client.async_get_all_water_temperatures.return_value = [
+            mock_location(location_id="same", temperature=15.0),
+            mock_location(location_id="warmer", temperature=16.5, time="2023-10-02T12:00:00+00:00"),
+            mock_location(location_id="new", temperature=12.0),
+        ]
+
+        # Act
+        await coordinator._async_update_data()
+
+        # Assert
+        coordinator.hass.bus.async_fire.assert_called_once()
+        event_type, data = coordinator.hass.bus.async_fire.call_args.args
+        assert event_type == EVENT_READINGS_CHANGED
+        assert data["readings"] == [
+            {"location_id": "warmer", "temperature": 16.5, "time": "2023-10-02T12:00:00+00:00", "delta": 1.5},
+            {"location_id": "new", "temperature": 12.0, "time": "2023-10-01T12:00:00+00:00", "delta": None},
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_readings_event_collects_changes(self, coordinator, monkeypatch):
+        """Test that changes within the interval are merged into one delayed event."""
+        # Arrange
+        call_later = Mock()
+        monkeypatch.setattr(
+            "custom_components.yr_norwegian_water_temperatures.coordinator.async_call_later", call_later
+        )
+        coordinator.store.async_load.return_value = []
+        coordinator.config_entry.options = {
+            CONF_GET_ALL_LOCATIONS: True,
+            CONF_ENABLE_READINGS_EVENT: True,
+            CONF_READINGS_EVENT_INTERVAL: 3600,
+        }
+        for temperature in (15.0, 16.0, 17.0, 18.0):
+            coordinator.client.async_get_all_water_temperatures.return_value = [
+                mock_location(location_id="beach", temperature=temperature)
+            ]
+            await coordinator._async_update_data()
+
+        # Assert
+        assert coordinator.hass.bus.async_fire.call_count == 1
+        call_later.assert_called_once()
+        delayed_fire = call_later.call_args.args[2]
+
+        # Act
+        await delayed_fire(None)
+
+        # Assert
+        assert coordinator.hass.bus.async_fire.call_count == 2
+        _event_type, data = coordinator.hass.bus.async_fire.call_args.args
+        assert data["readings"] == [
+            {"location_id": "beach", "temperature": 18.0, "time": "2023-10-01T12:00:00+00:00", "delta": 2.0}
+        ]
@@ -0,0 +1,91 @@
+"""Tests for the estimated water temperature at a location."""
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.estimate import nearest_recent_readings, weighted_estimate
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.sensor import EstimatedWaterTemperatureSensor
+from custom_components.yr_norwegian_water_temperatures.spatial import SpatialIndex
+from tests.conftest import mock_location
+
+NOW = datetime.fromisoformat("2025-06-28T12:00:00+02:00")
+
+
+def record(location_id: str, latitude: float, temperature: float | None = 15.0, age_hours: float = 0):
+    """Return a record north of the origin measured age_hours before NOW."""
+    return WaterTemperatureRecord.from_api(
+        mock_location(
+            location_id=location_id,
+            latitude=latitude,
+            longitude=10.0,
+            temperature=temperature,
+            time=(NOW - timedelta(hours=age_hours)).isoformat(),
+        )
+    )
+
+
+def index_of(*records: WaterTemperatureRecord) -> tuple[SpatialIndex, dict[str, WaterTemperatureRecord]]:
+    """Return a spatial index and location dict for records."""
+    index = SpatialIndex()
+    index.update(records)
+    return index, {item.location_id: item for item in records}
+
+
+def test_estimate_weights_closer_readings_higher():
+    """Test that the estimate leans towards the closest reading."""
+    readings = [(1.0, record("near", 60.0, 20.0)), (3.0, record("far", 60.0, 10.0))]
+
+    # Weights 1 and 1/9 give (20 + 10/9) / (1 + 1/9) = 19.0
+    assert weighted_estimate(readings, NOW) == pytest.approx(19.0)
+
+
+def test_estimate_weights_recent_readings_higher():
+    """Test that older readings lose weight with their age."""
+    readings = [(1.0, record("fresh", 60.0, 20.0)), (1.0, record("old", 60.0, 10.0, age_hours=24))]
+
+    # The day-old reading has half the weight: (20 + 5) / 1.5
+    assert weighted_estimate(readings, NOW) == pytest.approx(16.7)
+
+
+def test_nearest_recent_readings_skips_unusable_readings():
+    """Test that old and temperature-less readings are skipped for the next neighbours."""
+    index, locations = index_of(
+        record("no-temperature", 60.00, temperature=None),
+        record("too-old", 60.01, age_hours=24 * 8),
+        record("usable-1", 60.02),
+        record("usable-2", 60.03),
+        record("usable-3", 60.04),
+    )
+
+    readings = nearest_recent_readings(index, locations, 60.0, 10.0, 2, NOW)
+
+    assert [item.location_id for _distance, item in readings] == ["usable-1", "usable-2"]
+
+
+def test_estimate_sensor_only_writes_when_a_neighbour_changes(monkeypatch):
+    """Test that refreshes not touching the k nearest readings do not write state."""
+    monkeypatch.setattr(
+        "custom_components.yr_norwegian_water_temperatures.sensor.dt.now", lambda: NOW
+    )
+    index, locations = index_of(record("near", 60.01, 16.0), record("far", 61.0, 12.0))
+    coordinator = MagicMock()
+    coordinator.spatial_index = index
+    coordinator.locations = locations
+    coordinator.selection_center.return_value = (60.0, 10.0)
+    coordinator.last_update_success = True
+    coordinator.updated_location_ids = frozenset({"near", "far"})
+    sensor = EstimatedWaterTemperatureSensor(coordinator, "entry", neighbours=1)
+    sensor.async_write_ha_state = MagicMock()
+    assert sensor.native_value == 16.0
+
+    coordinator.updated_location_ids = frozenset({"far"})
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_not_called()
+
+    locations["near"] = record("near", 60.01, 17.0)
+    coordinator.updated_location_ids = frozenset({"near"})
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == 17.0
@@ -0,0 +1,148 @@
+"""Tests for the export service."""
+import csv
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import voluptuous as vol
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.yr_norwegian_water_temperatures import export
+from custom_components.yr_norwegian_water_temperatures.const import DOMAIN
+from custom_components.yr_norwegian_water_temperatures.coordinator import _serialize_locations
+from custom_components.yr_norwegian_water_temperatures.history import ReadingHistory
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.services import EXPORT_SCHEMA, _async_export
+from tests.conftest import mock_water_temperature_data
+
+START = 1_750_000_000.0
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Return a Home Assistant mock with an inline executor and a temporary config directory."""
+    hass = MagicMock()
+    hass.async_add_executor_job = AsyncMock(side_effect=lambda target, *args: target(*args))
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+    return hass
+
+
+def write_store(path, data) -> None:
+    """Write data as a Home Assistant storage file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": 1, "minor_version": 1, "key": path.name, "data": data}, indent=2))
+
+
+@pytest.fixture
+def coordinator(hass, tmp_path):
+    """Return a coordinator-like object with test locations and history for the first one."""
+    records = [WaterTemperatureRecord.from_api(location) for location in mock_water_temperature_data()]
+    history = {records[0].location_id: ReadingHistory.from_stored([[START, 14.0], [START + 3600, 14.5]])}
+    records[0].trend_per_day = 12.0
+    coordinator = SimpleNamespace(
+        locations={record.location_id: record for record in records},
+        history=history,
+        store=SimpleNamespace(path=str(tmp_path / ".storage" / "locations_cache")),
+    )
+    write_store(tmp_path / ".storage" / "locations_cache", _serialize_locations(records, history))
+    hass.config_entries.async_loaded_entries.return_value = [
+        SimpleNamespace(runtime_data=SimpleNamespace(coordinator=coordinator))
+    ]
+    return coordinator
+
+
+async def run_export(hass, **data):
+    """Call the export service with the given data."""
+    return await _async_export(SimpleNamespace(hass=hass, data=EXPORT_SCHEMA(data)))
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_nests_history(hass, coordinator, tmp_path):
+    """Test one line per location with history and trend included."""
+    response = await run_export(hass, filename="export.ndjson", include_history=True)
+
+    path = tmp_path / DOMAIN / "export.ndjson"
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert response == {
+        "path": str(path), "locations": len(coordinator.locations), "rows": len(lines), "skipped": 0
+    }
+    assert [line["location_id"] for line in lines] == list(coordinator.locations)
+    assert lines[0]["history"] == [[START, 14.0], [START + 3600, 14.5]]
+    assert lines[0]["trend_per_day"] == 12.0
+    assert lines[1]["history"] == []
+
+
+@pytest.mark.asyncio
+async def test_csv_export_of_cache_has_a_row_per_reading(hass, coordinator, tmp_path, monkeypatch):
+    """Test that the cache source is written in chunks with history readings as rows."""
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(export, "READ_SIZE", 16)
+
+    response = await run_export(hass, format="csv", source="cache", include_history=True, filename="export.csv")
+
+    with open(tmp_path / DOMAIN / "export.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert response["rows"] == len(rows) == len(coordinator.locations) + 1
+    assert [row["temperature"] for row in rows[:2]] == ["14.0", "14.5"]
+    assert rows[0]["time"] == "2025-06-15T15:06:40+00:00"
+    writes = [call for call in hass.async_add_executor_job.await_args_list if getattr(call.args[0], "__name__", None) == "write"]
+    assert len(writes) == -(-len(coordinator.locations) // 2)
+
+
+@pytest.mark.asyncio
+async def test_failed_export_leaves_no_file(hass, coordinator, tmp_path):
+    """Test that a failure while exporting removes the partial file."""
+    coordinator.locations["broken"] = None
+
+    with pytest.raises(AttributeError):
+        await run_export(hass, filename="export.csv", format="csv")
+
+    assert list((tmp_path / DOMAIN).iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_parquet_export(hass, coordinator, tmp_path):
+    """Test the Parquet export when pyarrow is available."""
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    response = await run_export(hass, format="parquet", filename="export.parquet")
+
+    table = parquet.read_table(tmp_path / DOMAIN / "export.parquet")
+    assert table.num_rows == response["rows"] == len(coordinator.locations)
+
+
+def test_export_filename_must_stay_in_the_config_directory():
+    """Test that file names with a path are rejected."""
+    with pytest.raises(vol.Invalid):
+        EXPORT_SCHEMA({"filename": "../secrets.yaml"})
+
+
+@pytest.mark.asyncio
+async def test_export_filename_must_match_the_format(hass, coordinator):
+    """Test that a file name with another extension is refused."""
+    with pytest.raises(ServiceValidationError):
+        await run_export(hass, format="csv", filename="configuration.yaml")
+
+
+@pytest.mark.asyncio
+async def test_invalid_cached_locations_are_skipped(hass, coordinator, tmp_path):
+    """Test that cached locations with an unreadable time are left out of the export."""
+    stored = _serialize_locations(coordinator.locations.values(), {})
+    stored[1]["time"] = "yesterday"
+    write_store(tmp_path / ".storage" / "locations_cache", stored)
+
+    response = await run_export(hass, format="csv", source="cache", filename="export.csv")
+
+    assert response["locations"] == len(stored) - 1
+    assert response["skipped"] == 1
+
+
+@pytest.mark.parametrize("data", [[], [{"a": [1, 2]}, "text", 3.5]])
+def test_storage_items_are_streamed(tmp_path, monkeypatch, data):
+    """Test that the data list of a storage file is decoded across small reads."""
+    monkeypatch.setattr(export, "READ_SIZE", 3)
+    write_store(tmp_path / "store", data)
+
+    assert list(export.iter_storage_items(str(tmp_path / "store"))) == data
+    assert list(export.iter_storage_items(str(tmp_path / "missing"))) == []
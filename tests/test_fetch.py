@@ -0,0 +1,126 @@
+"""Tests for the fetch latency percentiles and hedged requests."""
+import asyncio
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.fetch import (
+    MIN_HEDGE_SAMPLES,
+    FetchLatency,
+    async_hedged,
+)
+
+
+def scripted_fetch(*responses: tuple[float, object]):
+    """Return a fetch answering each call after its delay with its result, raising exceptions."""
+    calls = []
+
+    async def fetch():
+        delay, result = responses[len(calls)]
+        calls.append(delay)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    fetch.calls = calls
+    return fetch
+
+
+def test_percentiles_use_the_nearest_rank():
+    """Test the percentiles of the recorded latencies."""
+    latency = FetchLatency()
+    assert latency.percentile(50) is None
+
+    for seconds in range(1, 101):
+        latency.record(seconds / 100)
+
+    assert latency.percentile(50) == 0.5
+    assert latency.percentile(95) == 0.95
+    assert latency.percentile(99) == 0.99
+    assert latency.as_dict()["samples"] == 100
+
+
+def test_hedge_delay_waits_for_enough_samples():
+    """Test that no hedge delay is given before enough fetches are known."""
+    latency = FetchLatency()
+    for _ in range(MIN_HEDGE_SAMPLES - 1):
+        latency.record(1.0)
+    assert latency.hedge_delay(95) is None
+
+    latency.record(2.0)
+    assert latency.hedge_delay(95) == 2.0
+
+
+def test_only_recent_samples_are_kept():
+    """Test that old latencies drop out of the percentiles."""
+    latency = FetchLatency(size=3)
+    for seconds in (10.0, 1.0, 1.0, 1.0):
+        latency.record(seconds)
+
+    assert len(latency) == 3
+    assert latency.percentile(100) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_without_delay_a_single_request_is_sent():
+    """Test that no second request is sent when hedging is off."""
+    fetch = scripted_fetch((0.02, "first"))
+
+    assert await async_hedged(fetch, None) == ("first", False)
+    assert len(fetch.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    """Test that a request finishing within the delay is not repeated."""
+    fetch = scripted_fetch((0.0, "first"))
+
+    assert await async_hedged(fetch, 0.5) == ("first", False)
+    assert len(fetch.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_second_request_wins_over_a_stalled_one():
+    """Test that a slow request is hedged and the stalled one cancelled."""
+    fetch = scripted_fetch((10.0, "first"), (0.0, "second"))
+
+    async with asyncio.timeout(1):
+        assert await async_hedged(fetch, 0.01) == ("second", True)
+    assert len(fetch.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_has_finished_when_the_fetch_returns():
+    """Test that the losing request is awaited after its cancellation and its failure retrieved."""
+    tasks = []
+
+    async def fetch():
+        tasks.append(asyncio.current_task())
+        if len(tasks) == 2:
+            return "second"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # A request failing on its way out of the cancellation
+            raise ConnectionError("closed") from None
+
+    assert await async_hedged(fetch, 0.01) == ("second", True)
+    assert tasks[0].done()
+    assert isinstance(tasks[0].exception(), ConnectionError)
+
+
+@pytest.mark.asyncio
+async def test_failure_of_one_request_waits_for_the_other():
+    """Test that a failed request does not fail the fetch while the other may succeed."""
+    fetch = scripted_fetch((0.05, ConnectionError("reset")), (0.1, "second"))
+
+    assert await async_hedged(fetch, 0.01) == ("second", True)
+
+
+@pytest.mark.asyncio
+async def test_fails_when_both_requests_fail():
+    """Test that the error is raised once both requests have failed."""
+    fetch = scripted_fetch((0.02, ConnectionError("first")), (0.0, ConnectionError("second")))
+
+    with pytest.raises(ConnectionError):
+        await async_hedged(fetch, 0.01)
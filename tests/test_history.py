@@ -0,0 +1,67 @@
+"""Tests for the per-location reading history."""
+import random
+import statistics
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.history import ReadingHistory
+
+HOUR = 3600.0
+START = 1_750_000_000.0
+
+
+def test_trend_matches_full_regression_after_wrapping():
+    """Test that the incremental trend equals a regression over the readings still in the buffer."""
+    history = ReadingHistory(size=10)
+    rng = random.Random(4)
+    readings = []
+    for step in range(57):
+        reading = (START + step * 6 * HOUR, 15 + step * 0.1 + rng.uniform(-0.5, 0.5))
+        readings.append(reading)
+        assert history.append(*reading)
+
+        window = readings[-10:]
+        if len(window) >= 2:
+            expected = statistics.linear_regression(
+                [timestamp / 86400 for timestamp, _ in window], [value for _, value in window]
+            ).slope
+            assert history.trend_per_day() == pytest.approx(expected, abs=1e-9)
+
+    assert len(history) == 10
+    assert list(history) == readings[-10:]
+
+
+def test_change_uses_reading_at_least_a_day_older():
+    """Test the 24 hour change and that older or duplicate readings are ignored."""
+    history = ReadingHistory()
+    history.append(START, 14.0)
+    history.append(START + 20 * HOUR, 15.0)
+    assert history.change() is None
+
+    history.append(START + 30 * HOUR, 17.5)
+    assert not history.append(START + 30 * HOUR, 18.0)
+    assert history.change() == pytest.approx(3.5)
+
+
+def test_history_round_trips_through_storage():
+    """Test that stored history restores the same readings and trend."""
+    history = ReadingHistory(size=4)
+    for step in range(6):
+        history.append(START + step * HOUR, 10.0 + step)
+
+    restored = ReadingHistory.from_stored(history.to_stored(), size=4)
+
+    assert list(restored) == list(history)
+    assert restored.trend_per_day() == pytest.approx(24.0)
+
+
+def test_from_sorted_matches_appending_each_reading():
+    """Test that bulk loading sorted readings gives the same buffer and trend as appending them."""
+    readings = [(START + step * HOUR, 10.0 + step * 0.5) for step in range(7)]
+    appended = ReadingHistory.from_stored(readings, size=5)
+
+    loaded = ReadingHistory.from_sorted([t for t, _ in readings], [v for _, v in readings], size=5)
+
+    assert list(loaded) == list(appended)
+    assert loaded.trend_per_day() == pytest.approx(appended.trend_per_day())
+    assert loaded.append(START + 7 * HOUR, 13.5)
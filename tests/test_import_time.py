@@ -0,0 +1,73 @@
+"""Import-time budget for the integration, measured with ``python -X importtime``."""
+import subprocess
+import sys
+from pathlib import Path
+
+PACKAGE = "custom_components.yr_norwegian_water_temperatures"
+REPO_ROOT = Path(__file__).parent.parent
+
+# Home Assistant core modules are loaded before any integration, so they are preloaded
+# and excluded from the measurement.
+PRELOADED_MODULES = (
+    "homeassistant.config_entries",
+    "homeassistant.const",
+    "homeassistant.core",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.components.sensor",
+)
+MARKER = "-- integration import starts --"
+
+# Budget for the self time of everything the integration import pulls in beyond core
+IMPORT_TIME_BUDGET_US = 50_000
+
+
+def measure_import(module: str) -> dict[str, int]:
+    """Return self import times in microseconds for modules loaded by importing module."""
+    code = (
+        f"import sys; import {', '.join(PRELOADED_MODULES)}; "
+        f"sys.stderr.write({MARKER!r} + '\\n'); sys.stderr.flush(); "
+        f"import {module}"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    _, _, measured = result.stderr.partition(MARKER)
+    timings = {}
+    for line in measured.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = int(self_us)
+    return timings
+
+
+def test_integration_import_defers_client_and_coordinator():
+    """Test that loading the integration does not import the API client or coordinator."""
+    timings = measure_import(PACKAGE)
+
+    assert PACKAGE in timings
+    assert "yrwatertemperatures" not in timings
+    assert f"{PACKAGE}.coordinator" not in timings
+
+
+def test_config_flow_import_defers_client():
+    """Test that loading the config flow does not import the API client."""
+    timings = measure_import(f"{PACKAGE}.config_flow")
+
+    assert "yrwatertemperatures" not in timings
+
+
+def test_integration_import_time_within_budget():
+    """Test that the integration import stays within its startup budget."""
+    timings = measure_import(PACKAGE)
+    total_us = sum(timings.values())
+
+    assert total_us < IMPORT_TIME_BUDGET_US, (
+        f"Integration import: {total_us} us across {len(timings)} modules, slowest: "
+        f"{sorted(timings.items(), key=lambda item: -item[1])[:10]}"
+    )
@@ -0,0 +1,94 @@
+"""Tests for the location query service."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.index import LocationIndex
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.query import LocationQuery, run_query
+from custom_components.yr_norwegian_water_temperatures.services import QUERY_SCHEMA, _async_query
+from custom_components.yr_norwegian_water_temperatures.spatial import SpatialIndex
+from tests.conftest import mock_water_temperature_data
+
+NOW = datetime.fromisoformat("2025-06-29T12:00:00+02:00")
+HORTEN = (59.41, 10.48)
+
+
+@pytest.fixture
+def coordinator():
+    """Return a coordinator-like object with indexed test locations."""
+    records = [WaterTemperatureRecord.from_api(location) for location in mock_water_temperature_data()]
+    location_index = LocationIndex()
+    location_index.update(records)
+    spatial_index = SpatialIndex()
+    spatial_index.update(records)
+    return SimpleNamespace(
+        locations={record.location_id: record for record in records},
+        location_index=location_index,
+        spatial_index=spatial_index,
+        selection_center=lambda: HORTEN,
+    )
+
+
+def query(coordinator, **kwargs):
+    """Run a query around Horten against the coordinator indexes."""
+    return run_query(
+        LocationQuery(*HORTEN, **kwargs),
+        coordinator.locations,
+        coordinator.location_index,
+        coordinator.spatial_index,
+        NOW,
+    )
+
+
+def test_query_sorts_and_limits_by_temperature(coordinator):
+    """Test that the default query returns the warmest locations first."""
+    temperatures = sorted(
+        (record.temperature for record in coordinator.locations.values() if record.temperature is not None),
+        reverse=True,
+    )
+
+    result = query(coordinator, limit=3)
+
+    assert [row["temperature"] for row in result] == temperatures[:3]
+
+
+def test_query_combines_region_distance_and_temperature_filters(coordinator):
+    """Test that all filters must match and distances are reported."""
+    result = query(coordinator, counties=("vestfold",), radius_km=10, min_temperature=0, sort_by="distance")
+
+    assert result
+    assert all(row["county"] == "Vestfold" and row["distance_km"] <= 10 for row in result)
+    assert [row["distance_km"] for row in result] == sorted(row["distance_km"] for row in result)
+
+
+def test_query_filters_on_recency(coordinator):
+    """Test that readings older than max_age are left out."""
+    result = query(coordinator, max_age=timedelta(days=3), limit=1000)
+
+    cutoff = NOW - timedelta(days=3)
+    expected = {
+        record.location_id for record in coordinator.locations.values()
+        if record.time is not None and record.time >= cutoff
+    }
+    assert {row["location_id"] for row in result} == expected
+
+
+@pytest.mark.asyncio
+async def test_query_service_returns_locations(coordinator, monkeypatch):
+    """Test that the service answers from the first loaded entry."""
+    monkeypatch.setattr(
+        "custom_components.yr_norwegian_water_temperatures.services.dt.now", lambda: NOW
+    )
+    hass = MagicMock()
+    hass.config_entries.async_loaded_entries.return_value = [
+        SimpleNamespace(runtime_data=SimpleNamespace(coordinator=coordinator))
+    ]
+    call = SimpleNamespace(hass=hass, data=QUERY_SCHEMA({"municipalities": "Horten, Moss", "limit": 2}))
+
+    response = await _async_query(call)
+
+    assert len(response["locations"]) == 2
+    assert {row["municipality"] for row in response["locations"]} <= {"Horten", "Moss"}
@@ -2,14 +2,51 @@
 
 from unittest.mock import MagicMock
 
-from custom_components.yr_norwegian_water_temperatures.sensor import WaterTemperatureSensor
+import pytest
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.yr_norwegian_water_temperatures import sensor as sensor_platform
+from custom_components.yr_norwegian_water_temperatures.aggregates import RegionAccumulator
+from custom_components.yr_norwegian_water_temperatures.models import LocationSnapshot, WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.sensor import (
+    CATALOG_MEAN,
+    CATALOG_WARMEST,
+    CatalogWaterTemperatureSensor,
+    WaterTemperatureSensor,
+)
+from custom_components.yr_norwegian_water_temperatures.writes import WriteScheduler
 from tests.conftest import mock_location
 from yrwatertemperatures import WaterTemperatureData
 
 
-def test_sensor_keeps_last_known_data_when_coordinator_omits_location():
-    """Test that a sparse coordinator update does not clear sensor data."""
+def mock_coordinator() -> MagicMock:
+    """Return a coordinator mock that writes sensor states immediately."""
     coordinator = MagicMock()
+    coordinator.write_scheduler = WriteScheduler(MagicMock())
+    coordinator.selected_location_ids = None
+    return coordinator
+
+
+def registry_with(*entries: er.RegistryEntry) -> MagicMock:
+    """Return an entity registry mock holding the given entries."""
+    registry = MagicMock()
+    registry.entities = er.EntityRegistryItems()
+    for entry in entries:
+        registry.entities[entry.entity_id] = entry
+    return registry
+
+
+def snapshot_of(*locations: WaterTemperatureData) -> LocationSnapshot:
+    """Return a coordinator snapshot holding the given locations."""
+    return LocationSnapshot({
+        location.location_id: WaterTemperatureRecord.from_api(location) for location in locations
+    })
+
+
+def test_sensor_keeps_last_known_data_when_coordinator_omits_location():
+    """Test that a sparse coordinator update does not clear sensor data or write state."""
+    coordinator = mock_coordinator()
+    coordinator.last_update_success = True
     initial_location = mock_location(
         location_id="cached-location",
         name="Cached Beach",
@@ -22,21 +59,21 @@ def test_sensor_keeps_last_known_data_when_coordinator_omits_location():
         temperature=17.0,
         time="2025-06-28T09:00:00+02:00",
     )
-    coordinator.data = [initial_location]
-    sensor = WaterTemperatureSensor(coordinator, initial_location)
+    coordinator.data = snapshot_of(initial_location)
+    sensor = WaterTemperatureSensor(coordinator, coordinator.data.get(initial_location.location_id))
     sensor.async_write_ha_state = MagicMock()
 
-    coordinator.data = [omitted_update_location]
+    coordinator.data = snapshot_of(omitted_update_location)
     sensor._handle_coordinator_update()
 
     assert sensor.native_value == 15.5
     assert sensor.extra_state_attributes["time"] == initial_location.time.isoformat()
-    sensor.async_write_ha_state.assert_called_once()
+    sensor.async_write_ha_state.assert_not_called()
 
 
 def test_sensor_updates_last_known_data_when_coordinator_includes_location():
     """Test that matching coordinator data updates sensor value and attributes."""
-    coordinator = MagicMock()
+    coordinator = mock_coordinator()
     initial_location = mock_location(
         location_id="cached-location",
         name="Cached Beach",
@@ -49,11 +86,11 @@ def test_sensor_updates_last_known_data_when_coordinator_includes_location():
         temperature=18.0,
         time="2025-06-28T09:00:00+02:00",
     )
-    coordinator.data = [initial_location]
-    sensor = WaterTemperatureSensor(coordinator, initial_location)
+    coordinator.data = snapshot_of(initial_location)
+    sensor = WaterTemperatureSensor(coordinator, coordinator.data.get(initial_location.location_id))
     sensor.async_write_ha_state = MagicMock()
 
-    coordinator.data = [updated_location]
+    coordinator.data = snapshot_of(updated_location)
     sensor._handle_coordinator_update()
 
     assert sensor.native_value == 18.0
@@ -63,7 +100,7 @@ def test_sensor_updates_last_known_data_when_coordinator_includes_location():
 
 def test_sensor_accepts_nullable_water_temperature_fields():
     """Test that nullable API fields are exposed without crashing."""
-    coordinator = MagicMock()
+    coordinator = mock_coordinator()
     initial_location = mock_location(
         location_id="nullable-location",
         name="Nullable Beach",
@@ -82,11 +119,11 @@ def test_sensor_accepts_nullable_water_temperature_fields():
         time=None,
         source="Manual"
     )
-    coordinator.data = [initial_location]
-    sensor = WaterTemperatureSensor(coordinator, initial_location)
+    coordinator.data = snapshot_of(initial_location)
+    sensor = WaterTemperatureSensor(coordinator, coordinator.data.get(initial_location.location_id))
     sensor.async_write_ha_state = MagicMock()
 
-    coordinator.data = [nullable_location]
+    coordinator.data = snapshot_of(nullable_location)
     sensor._handle_coordinator_update()
 
     assert sensor.native_value is None
@@ -100,4 +137,132 @@ def test_sensor_accepts_nullable_water_temperature_fields():
         "source": "Manual",
         "time": None
     }
-    sensor.async_write_ha_state.assert_called_once()
\ No newline at end of file
+    sensor.async_write_ha_state.assert_called_once()
+
+def test_sensor_only_writes_new_readings_and_availability_changes():
+    """Test that refreshes without a new reading do not write state."""
+    coordinator = mock_coordinator()
+    coordinator.last_update_success = True
+    coordinator.data = snapshot_of(mock_location(location_id="beach"))
+    sensor = WaterTemperatureSensor(coordinator, coordinator.data.get("beach"))
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_not_called()
+
+    coordinator.last_update_success = False
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_called_once()
+
+
+def test_static_attributes_are_not_recorded():
+    """Test that only the measurement time is recorded with the state."""
+    coordinator = mock_coordinator()
+    coordinator.data = snapshot_of(mock_location(location_id="beach"))
+    sensor = WaterTemperatureSensor(coordinator, coordinator.data.get("beach"))
+
+    assert set(sensor.extra_state_attributes) - sensor._unrecorded_attributes == {"time"}
+
+
+def test_sensor_shares_attributes_with_coordinator_record():
+    """Test that sensors read attributes from the shared record instead of copying them."""
+    coordinator = mock_coordinator()
+    location = mock_location(location_id="shared-location")
+    coordinator.data = snapshot_of(location)
+    first = WaterTemperatureSensor(coordinator, coordinator.data.get("shared-location"))
+    second = WaterTemperatureSensor(coordinator, coordinator.data.get("shared-location"))
+
+    assert first.extra_state_attributes is second.extra_state_attributes
+    assert first.extra_state_attributes is coordinator.data.get("shared-location").attributes
+
+
+def test_catalog_sensors_summarize_every_location():
+    """Test that the catalog sensors expose the mean and the warmest location."""
+    coordinator = mock_coordinator()
+    coordinator.last_update_success = True
+    coordinator.catalog = RegionAccumulator()
+    coordinator.locations = {
+        "cold": WaterTemperatureRecord.from_api(mock_location(location_id="cold", name="Cold Beach", temperature=12.0)),
+        "warm": WaterTemperatureRecord.from_api(mock_location(location_id="warm", name="Warm Beach", temperature=20.0)),
+    }
+    for record in coordinator.locations.values():
+        coordinator.catalog.set(record.location_id, record.temperature)
+
+    mean = CatalogWaterTemperatureSensor(coordinator, "entry", CATALOG_MEAN)
+    warmest = CatalogWaterTemperatureSensor(coordinator, "entry", CATALOG_WARMEST)
+    warmest.async_write_ha_state = MagicMock()
+
+    assert mean.native_value == 16.0
+    assert mean.extra_state_attributes["count"] == 2
+    assert warmest.native_value == 20.0
+    assert warmest.extra_state_attributes["name"] == "Warm Beach"
+
+    coordinator.updated_location_ids = frozenset({"cold"})
+    coordinator.catalog.set("cold", 13.0)
+    warmest._handle_coordinator_update()
+    warmest.async_write_ha_state.assert_not_called()
+
+    # An aged reading leaving the catalog changes the summary without any new reading
+    coordinator.updated_location_ids = frozenset()
+    coordinator.catalog.discard("warm")
+    warmest._handle_coordinator_update()
+    warmest.async_write_ha_state.assert_called_once()
+    assert warmest.native_value == 13.0
+
+
+@pytest.mark.asyncio
+async def test_setup_adds_enabled_sensors_in_chunks_and_new_ones_once(monkeypatch):
+    """Test that setup uses the config entry index, skips disabled sensors and adds new locations once."""
+    registry = registry_with(
+        er.RegistryEntry(
+            entity_id="sensor.beach_b", unique_id="b", platform="yr_norwegian_water_temperatures",
+            config_entry_id="entry", disabled_by=er.RegistryEntryDisabler.USER,
+        ),
+        er.RegistryEntry(entity_id="sensor.other", unique_id="a", platform="other", config_entry_id="other"),
+    )
+    monkeypatch.setattr(er, "async_get", lambda hass: registry)
+    monkeypatch.setattr(sensor_platform, "ENTITY_CHUNK_SIZE", 1)
+    coordinator = mock_coordinator()
+    coordinator.catalog = None
+    coordinator.data = snapshot_of(*(mock_location(location_id=location_id) for location_id in "abc"))
+    config_entry = MagicMock()
+    config_entry.entry_id = "entry"
+    config_entry.options = {}
+    config_entry.runtime_data.coordinator = coordinator
+    async_add_entities = MagicMock()
+
+    await sensor_platform.async_setup_entry(MagicMock(), config_entry, async_add_entities)
+
+    added = [[sensor.unique_id for sensor in call.args[0]] for call in async_add_entities.call_args_list]
+    assert added == [["a"], ["c"]]
+
+    async_add_entities.reset_mock()
+    coordinator.data = snapshot_of(*(mock_location(location_id=location_id) for location_id in "abcd"))
+    listener = coordinator.async_add_listener.call_args.args[0]
+    listener()
+    listener()
+
+    async_add_entities.assert_called_once()
+    assert [sensor.unique_id for sensor in async_add_entities.call_args.args[0]] == ["d"]
+
+
+@pytest.mark.asyncio
+async def test_sensors_of_unselected_locations_are_created_disabled(monkeypatch):
+    """Test that with all locations only the selected locations get sensors enabled by default."""
+    monkeypatch.setattr(er, "async_get", lambda hass: registry_with())
+    coordinator = mock_coordinator()
+    coordinator.catalog = None
+    coordinator.selected_location_ids = frozenset({"a"})
+    coordinator.data = snapshot_of(*(mock_location(location_id=location_id) for location_id in "ab"))
+    config_entry = MagicMock()
+    config_entry.entry_id = "entry"
+    config_entry.options = {}
+    config_entry.runtime_data.coordinator = coordinator
+    async_add_entities = MagicMock()
+
+    await sensor_platform.async_setup_entry(MagicMock(), config_entry, async_add_entities)
+
+    sensors = async_add_entities.call_args.args[0]
+    assert {sensor.unique_id: sensor.entity_registry_enabled_default for sensor in sensors} == {
+        "a": True, "b": False,
+    }
@@ -0,0 +1,155 @@
+"""Load and fault tests driving the full ApiCoordinator against the local API simulator."""
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from custom_components.yr_norwegian_water_temperatures.coordinator import ApiCoordinator
+from custom_components.yr_norwegian_water_temperatures.const import *
+from tests.simulator import SimulatorSettings, YrApiSimulator, async_drive_coordinator, load_seed_locations
+
+API_KEY = "test_api_key"
+
+
+@pytest_asyncio.fixture
+async def make_coordinator(mock_hass, mock_config_entry, monkeypatch):
+    """Return a factory building a coordinator that talks to the given simulator over its own session."""
+    monkeypatch.setattr('custom_components.yr_norwegian_water_temperatures.coordinator.er', MagicMock())
+    coordinators = []
+
+    def _make(simulator: YrApiSimulator, options: dict | None = None) -> ApiCoordinator:
+        mock_config_entry.entry_id = "test_entry"
+        mock_config_entry.options = {CONF_DEDICATED_SESSION: True, **(options or {CONF_GET_ALL_LOCATIONS: True})}
+        coordinator = ApiCoordinator(mock_hass, mock_config_entry)
+        coordinator.client.base_url = simulator.api_url
+        coordinator.store = AsyncMock()
+        coordinator.store.async_load.return_value = []
+        monkeypatch.setattr(coordinator, 'cleanup_old_entities', AsyncMock())
+        coordinators.append(coordinator)
+        return coordinator
+
+    yield _make
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_refresh_parses_seed_data_over_http(make_coordinator):
+    """Test that the real client and coordinator parse the simulated response."""
+    async with YrApiSimulator(SimulatorSettings(api_key=API_KEY)) as simulator:
+        coordinator = make_coordinator(simulator)
+
+        result = await coordinator._async_update_data()
+
+    assert len(result) == len(load_seed_locations())
+    assert simulator.status_counts[200] == 1
+
+
+@pytest.mark.asyncio
+async def test_location_with_unreadable_time_is_quarantined_over_http(make_coordinator):
+    """Test that a location the client cannot parse is skipped while the others are kept."""
+    async with YrApiSimulator(SimulatorSettings(api_key=API_KEY)) as simulator:
+        locations = load_seed_locations()
+        bad = {**locations[0], "time": "not a time"}
+        simulator.set_locations([bad, *locations[1:]])
+        coordinator = make_coordinator(simulator)
+
+        result = await coordinator._async_update_data()
+
+    assert len(result) == len(locations) - 1
+    assert bad["location_id"] not in coordinator.locations
+    assert coordinator.quarantine.last_refresh == 1
+    assert coordinator.quarantine.samples[0] == {
+        "source": "api", "index": 0, "location_id": bad["location_id"], "reason": "invalid_time"
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [404, 429, 500, 502, 503])
+async def test_transient_errors_fall_back_to_cached_data(make_coordinator, status):
+    """Test that injected transient errors serve the last known readings."""
+    async with YrApiSimulator(SimulatorSettings(api_key=API_KEY)) as simulator:
+        coordinator = make_coordinator(simulator)
+        first = await coordinator._async_update_data()
+
+        simulator.settings.scripted_statuses = [status]
+        second = await coordinator._async_update_data()
+
+    assert len(second) == len(first)
+    assert simulator.status_counts[status] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [401, 403])
+async def test_auth_errors_raise_auth_failed(make_coordinator, status):
+    """Test that injected auth errors trigger reauth instead of fallback."""
+    async with YrApiSimulator(SimulatorSettings(scripted_statuses=[status])) as simulator:
+        coordinator = make_coordinator(simulator)
+
+        with pytest.raises(ConfigEntryAuthFailed):
+            await coordinator._async_update_data()
+
+
+@pytest.mark.asyncio
+async def test_truncated_body_without_cache_raises_update_failed(make_coordinator):
+    """Test that a truncated JSON body is reported as a failed update."""
+    async with YrApiSimulator(SimulatorSettings(truncate_ratio=0.5)) as simulator:
+        coordinator = make_coordinator(simulator)
+
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+
+@pytest.mark.asyncio
+async def test_dripped_response_is_parsed(make_coordinator):
+    """Test that a slowly dripped response body is still read completely."""
+    settings = SimulatorSettings(payload_size=50, drip_chunk_size=512, drip_delay=0.001)
+    async with YrApiSimulator(settings) as simulator:
+        coordinator = make_coordinator(simulator)
+
+        result = await coordinator._async_update_data()
+
+    assert len(result) == 50
+
+
+@pytest.mark.asyncio
+async def test_dedicated_session_reuses_its_connection_and_counts_compression(make_coordinator):
+    """Test that refreshes share one kept-alive connection and report compressed and decompressed bytes."""
+    async with YrApiSimulator(SimulatorSettings(payload_size=500, compress=True)) as simulator:
+        coordinator = make_coordinator(simulator)
+        for _ in range(2):
+            await coordinator._async_update_data()
+        compressed = coordinator.session_stats.refresh
+
+        simulator.settings.compress = False
+        await coordinator._async_update_data()
+        plain = coordinator.session_stats.refresh
+
+    assert compressed.requests == 1
+    assert compressed.content_encoding in ("gzip", "deflate", "br")
+    assert compressed.compressed_bytes * 3 < compressed.decompressed_bytes
+    assert plain.content_encoding == "identity"
+    assert plain.compressed_bytes == plain.decompressed_bytes == compressed.decompressed_bytes
+    total = coordinator.session_stats.total
+    assert (total.requests, total.connections_created, total.connections_reused) == (3, 1, 2)
+    assert total.reuse_rate == pytest.approx(2 / 3)
+
+
+@pytest.mark.asyncio
+async def test_load_with_generated_payload_and_faults(make_coordinator):
+    """Drive repeated refreshes of a large payload with latency, jitter and errors."""
+    settings = SimulatorSettings(
+        payload_size=5000,
+        latency=0.005,
+        jitter=0.004,
+        error_rate=0.2,
+        error_statuses=(429, 500, 503),
+        seed=42,
+    )
+    async with YrApiSimulator(settings) as simulator:
+        coordinator = make_coordinator(simulator)
+        report = await async_drive_coordinator(coordinator, refreshes=20)
+
+    assert simulator.request_count == 20, report.summary()
+    assert not report.failures or set(report.failures) == {"UpdateFailed"}, report.summary()
+    assert all(count == 5000 for count in report.location_counts), report.summary()
@@ -0,0 +1,72 @@
+"""Tests for the binary snapshot of the locations cache."""
+import os
+from datetime import datetime
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.history import ReadingHistory
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.snapshot import (
+    SnapshotReader,
+    read_current_snapshot,
+    read_snapshot,
+    write_snapshot,
+)
+from tests.conftest import mock_location
+
+
+def records() -> list[WaterTemperatureRecord]:
+    """Return records covering aware, naive and missing times and empty fields."""
+    aware = WaterTemperatureRecord.from_api(mock_location(location_id="b", name="Bådeplass"))
+    naive = WaterTemperatureRecord.from_api(mock_location(location_id="a", elevation=3))
+    naive.time = datetime(2025, 6, 1, 8, 30)
+    empty = WaterTemperatureRecord("Empty", "c", None, None, None, None, None, None, None, None)
+    return [aware, naive, empty]
+
+
+def test_snapshot_round_trips_records_and_history(tmp_path):
+    """Test that every field, time zone and reading history survives a round trip."""
+    path = str(tmp_path / "cache.snapshot")
+    history = {"b": ReadingHistory.from_stored([[1.0, 14.0], [2.0, 15.5]])}
+    write_snapshot(path, records(), history)
+
+    loaded, loaded_history = read_snapshot(path)
+
+    assert loaded == records()
+    assert [record.time for record in loaded] == [record.time for record in records()]
+    assert isinstance(loaded[1].elevation, int)
+    assert {location_id: list(readings) for location_id, readings in loaded_history.items()} == {
+        "b": [(1.0, 14.0), (2.0, 15.5)]
+    }
+
+
+def test_lookup_by_id_without_reading_every_record(tmp_path):
+    """Test single record and history lookups through the ID index."""
+    path = str(tmp_path / "cache.snapshot")
+    write_snapshot(path, records(), {"a": ReadingHistory.from_stored([[1.0, 9.0]])})
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 3
+        assert reader.get("b") == records()[0]
+        assert reader.get("missing") is None
+        assert list(reader.history("a")) == [(1.0, 9.0)]
+        assert reader.history("c") is None
+
+
+def test_invalid_or_stale_snapshots_are_rejected(tmp_path):
+    """Test that corrupt files raise ValueError and a newer JSON cache wins."""
+    path = str(tmp_path / "cache.snapshot")
+    json_path = str(tmp_path / "cache")
+    write_snapshot(path, records(), {})
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 3)
+    with pytest.raises(ValueError):
+        read_snapshot(path)
+
+    write_snapshot(path, records(), {})
+    with open(json_path, "w") as file:
+        file.write("[]")
+    snapshot_time = os.stat(path).st_mtime
+    os.utime(json_path, (snapshot_time + 1, snapshot_time + 1))
+    assert read_current_snapshot(path, json_path) is None
+    assert read_current_snapshot(str(tmp_path / "missing"), json_path) is None
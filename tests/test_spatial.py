@@ -0,0 +1,89 @@
+"""Tests for the spatial index."""
+import random
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.spatial import SpatialIndex, haversine_km
+from tests.conftest import mock_location
+from tests.simulator import generate_locations
+
+
+def records_for(locations: list[dict]) -> list[WaterTemperatureRecord]:
+    """Return records for stored-format locations."""
+    return [
+        WaterTemperatureRecord.from_api(
+            mock_location(
+                location_id=location["location_id"],
+                latitude=location["latitude"],
+                longitude=location["longitude"],
+            )
+        )
+        for location in locations
+    ]
+
+
+@pytest.fixture
+def records() -> list[WaterTemperatureRecord]:
+    """Return generated records spread over Norway."""
+    return records_for(generate_locations(2000, seed=7))
+
+
+def brute_force(records, latitude, longitude):
+    """Return all (distance, id) pairs sorted by distance."""
+    return sorted(
+        (haversine_km(latitude, longitude, record.latitude, record.longitude), record.location_id)
+        for record in records
+    )
+
+
+def test_haversine_oslo_bergen():
+    """Test the distance helper against a known distance."""
+    assert haversine_km(59.9139, 10.7522, 60.3913, 5.3221) == pytest.approx(305, abs=3)
+
+
+def test_nearest_matches_brute_force(records):
+    """Test that nearest queries return the same locations as a full scan."""
+    index = SpatialIndex()
+    index.update(records)
+    rng = random.Random(1)
+
+    for _ in range(50):
+        latitude, longitude = rng.uniform(55, 75), rng.uniform(0, 35)
+        expected = brute_force(records, latitude, longitude)[:10]
+        assert [location_id for _, location_id in index.nearest(latitude, longitude, 10)] == [
+            location_id for _, location_id in expected
+        ]
+
+
+def test_within_matches_brute_force(records):
+    """Test that radius queries return the same locations as a full scan."""
+    index = SpatialIndex()
+    index.update(records)
+    rng = random.Random(2)
+
+    for _ in range(50):
+        latitude, longitude = rng.uniform(58, 71), rng.uniform(5, 30)
+        radius_km = rng.uniform(0, 150)
+        expected = [pair for pair in brute_force(records, latitude, longitude) if pair[0] <= radius_km]
+        assert index.within(latitude, longitude, radius_km) == expected
+
+
+def test_index_is_maintained_incrementally():
+    """Test that moved, new and coordinate-less locations are kept up to date."""
+    index = SpatialIndex()
+    index.update(records_for([
+        {"location_id": "a", "latitude": 59.9, "longitude": 10.7},
+        {"location_id": "b", "latitude": 60.4, "longitude": 5.3},
+    ]))
+
+    index.update(records_for([
+        {"location_id": "a", "latitude": 63.4, "longitude": 10.4},
+        {"location_id": "c", "latitude": 59.91, "longitude": 10.71},
+    ]))
+    no_coordinates = records_for([{"location_id": "b", "latitude": None, "longitude": None}])
+    index.update(no_coordinates)
+
+    assert len(index) == 2
+    assert "b" not in index
+    assert [location_id for _, location_id in index.nearest(59.9, 10.7, 2)] == ["c", "a"]
@@ -0,0 +1,91 @@
+"""Tests for the long-term statistics import."""
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.history import ReadingHistory
+from custom_components.yr_norwegian_water_temperatures.models import WaterTemperatureRecord
+from custom_components.yr_norwegian_water_temperatures.statistics import async_import_readings, statistic_id
+from tests.conftest import mock_location
+
+
+def record(location_id: str, temperature: float | None, time: str) -> WaterTemperatureRecord:
+    """Return a record with a reading at the given time."""
+    return WaterTemperatureRecord.from_api(
+        mock_location(location_id=location_id, name="Beach", temperature=temperature, time=time)
+    )
+
+
+@pytest.fixture
+def add_statistics(monkeypatch) -> MagicMock:
+    """Capture statistics queued for the recorder."""
+    add = MagicMock()
+    monkeypatch.setattr(
+        "custom_components.yr_norwegian_water_temperatures.statistics.async_add_external_statistics", add
+    )
+    return add
+
+
+def test_readings_are_imported_at_their_measurement_hour(add_statistics):
+    """Test that readings are grouped per location and hour at their own timestamps."""
+    imported = async_import_readings(MagicMock(), [
+        record("1-100", 14.0, "2025-06-28T09:10:00+02:00"),
+        record("1-100", 16.0, "2025-06-28T09:50:00+02:00"),
+        record("1-100", 17.0, "2025-06-28T11:00:00+02:00"),
+        record("1-200", None, "2025-06-28T09:00:00+02:00"),
+    ], {})
+
+    assert imported == 1
+    add_statistics.assert_called_once()
+    _hass, metadata, statistics = add_statistics.call_args.args
+    assert metadata["statistic_id"] == statistic_id("1-100") == "yr_norwegian_water_temperatures:1_100"
+    assert [(row["start"].isoformat(), row["mean"], row["min"], row["max"]) for row in statistics] == [
+        ("2025-06-28T09:00:00+02:00", 15.0, 14.0, 16.0),
+        ("2025-06-28T11:00:00+02:00", 17.0, 17.0, 17.0),
+    ]
+
+
+def history(*readings: tuple[str, float], size: int = 48) -> ReadingHistory:
+    """Return a history of (time, temperature) readings."""
+    return ReadingHistory.from_stored(
+        ((datetime.fromisoformat(time).timestamp(), temperature) for time, temperature in readings), size
+    )
+
+
+def imported_rows(add_statistics: MagicMock) -> list[tuple[str, float, float, float]]:
+    """Return the (start, mean, min, max) rows of the last queued import."""
+    _hass, _metadata, statistics = add_statistics.call_args.args
+    return [(row["start"].isoformat(), row["mean"], row["min"], row["max"]) for row in statistics]
+
+
+def test_new_reading_keeps_earlier_readings_of_its_hour(add_statistics):
+    """Test that an hour is rebuilt from the history, so a second reading does not replace the first."""
+    readings = history(
+        ("2025-06-28T08:30:00+02:00", 12.0),
+        ("2025-06-28T09:10:00+02:00", 14.0),
+        ("2025-06-28T09:50:00+02:00", 16.0),
+    )
+
+    async_import_readings(MagicMock(), [record("1-100", 16.0, "2025-06-28T09:50:00+02:00")], {"1-100": readings})
+
+    assert imported_rows(add_statistics) == [("2025-06-28T09:00:00+02:00", 15.0, 14.0, 16.0)]
+
+
+def test_backfill_imports_every_complete_hour_of_the_history(add_statistics):
+    """Test that a backfill imports each hour of the history but not the oldest hour of a full buffer."""
+    readings = history(
+        ("2025-06-28T07:50:00+02:00", 10.0),
+        ("2025-06-28T08:30:00+02:00", 12.0),
+        ("2025-06-28T09:10:00+02:00", 14.0),
+        size=3,
+    )
+
+    async_import_readings(
+        MagicMock(), [record("1-100", 14.0, "2025-06-28T09:10:00+02:00")], {"1-100": readings}, backfill=True
+    )
+
+    assert imported_rows(add_statistics) == [
+        ("2025-06-28T08:00:00+02:00", 12.0, 12.0, 12.0),
+        ("2025-06-28T09:00:00+02:00", 14.0, 14.0, 14.0),
+    ]
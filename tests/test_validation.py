@@ -0,0 +1,112 @@
+"""Tests for the per-record validation of API and cached readings."""
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.validation import (
+    QUARANTINE_SAMPLES,
+    QuarantineStats,
+    stored_error,
+    validate_api_records,
+)
+from tests.conftest import mock_location, mock_water_temperature_data
+
+
+def stored(**changes) -> dict:
+    """Return a valid cached location with the given fields changed."""
+    return {
+        "name": "Test Name",
+        "location_id": "test_location",
+        "latitude": 60.0,
+        "longitude": 10.0,
+        "elevation": 10,
+        "county": "Test County",
+        "municipality": "Test Municipality",
+        "temperature": 15.0,
+        "time": "2023-10-01T12:00:00+00:00",
+        "source": "Test Source",
+        **changes,
+    }
+
+
+def test_valid_api_records_are_returned_without_copying():
+    """Test that the common all-valid case returns the input list itself."""
+    records = mock_water_temperature_data()
+    stats = QuarantineStats()
+
+    assert validate_api_records(records, stats) is records
+    assert stats.as_dict()["api"] == 0
+
+
+@pytest.mark.parametrize(
+    ("changes", "reason"),
+    [
+        ({"location_id": ""}, "invalid_id"),
+        ({"name": None}, "invalid_name"),
+        ({"latitude": 91.0}, "invalid_coordinates"),
+        ({"longitude": None}, "invalid_coordinates"),
+        ({"latitude": True}, "invalid_coordinates"),
+        ({"elevation": float("inf")}, "invalid_elevation"),
+        ({"temperature": float("nan")}, "invalid_temperature"),
+        ({"temperature": 99.0}, "invalid_temperature"),
+        ({"temperature": "15.0"}, "invalid_temperature"),
+        ({"county": 3}, "invalid_text"),
+        ({"time": "2023-10-01T12:00:00+00:00"}, "invalid_time"),
+    ],
+)
+def test_invalid_api_record_is_quarantined_and_the_rest_kept(changes, reason):
+    """Test that each kind of invalid field quarantines only its record."""
+    bad = mock_location(location_id="bad")
+    for name, value in changes.items():
+        setattr(bad, name, value)
+    first, second = mock_location(location_id="first"), mock_location(location_id="second")
+    stats = QuarantineStats()
+
+    assert validate_api_records([first, bad, second], stats) == [first, second]
+    assert stats.last_refresh == 1
+    assert stats.reasons == {reason: 1}
+    assert stats.samples[0]["index"] == 1
+
+
+def test_missing_readings_are_valid():
+    """Test that a location without a reading, position or region is not quarantined."""
+    item = stored(latitude=None, longitude=None, elevation=None, county=None, temperature=None, time=None)
+
+    assert stored_error(item, {}) is None
+
+
+def test_stored_times_are_parsed_once():
+    """Test that each distinct time string is parsed into the shared cache."""
+    parsed_times = {}
+
+    assert stored_error(stored(), parsed_times) is None
+    first = parsed_times["2023-10-01T12:00:00+00:00"]
+    assert stored_error(stored(location_id="other"), parsed_times) is None
+    assert parsed_times["2023-10-01T12:00:00+00:00"] is first
+
+
+@pytest.mark.parametrize(
+    ("item", "reason"),
+    [
+        (["not", "a", "dict"], "not_an_object"),
+        ({"name": "Only a name"}, "missing_field"),
+        (stored(time="yesterday"), "invalid_time"),
+        (stored(time=["2023-10-01"]), "invalid_time"),
+        (stored(longitude=181), "invalid_coordinates"),
+    ],
+)
+def test_invalid_stored_items(item, reason):
+    """Test the reasons given for invalid cached locations."""
+    assert stored_error(item, {}) == reason
+
+
+def test_last_refresh_is_reset_and_samples_are_bounded():
+    """Test that the per-refresh count only covers the last batch and few samples are kept."""
+    stats = QuarantineStats()
+    bad = mock_location(location_id="")
+
+    validate_api_records([bad] * (QUARANTINE_SAMPLES + 5), stats)
+    stats.start_refresh()
+    validate_api_records(mock_water_temperature_data(), stats)
+
+    assert stats.api == QUARANTINE_SAMPLES + 5
+    assert stats.last_refresh == 0
+    assert len(stats.samples) == QUARANTINE_SAMPLES
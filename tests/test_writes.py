@@ -0,0 +1,80 @@
+"""Tests for the chunked entity state writes."""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.yr_norwegian_water_temperatures.writes import WriteScheduler
+
+
+def mock_entity() -> MagicMock:
+    """Create an entity mock attached to Home Assistant."""
+    entity = MagicMock()
+    entity.hass = MagicMock()
+    return entity
+
+
+def background_hass() -> MagicMock:
+    """Create a Home Assistant mock running background tasks on the event loop."""
+    hass = MagicMock()
+    hass.async_create_background_task = lambda target, name: asyncio.get_running_loop().create_task(target)
+    return hass
+
+
+def test_writes_immediately_outside_a_batch():
+    """Test that a write without an open batch is not deferred."""
+    scheduler = WriteScheduler(MagicMock())
+    entity = mock_entity()
+
+    scheduler.schedule(entity)
+
+    entity.async_write_ha_state.assert_called_once()
+    assert scheduler.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_coalesces_and_writes_in_chunks():
+    """Test that repeated writes are coalesced and chunks yield to the event loop."""
+    scheduler = WriteScheduler(background_hass(), chunk_size=2)
+    entities = [mock_entity() for _ in range(5)]
+    written_per_tick = []
+
+    with scheduler.batch():
+        for entity in entities + entities[:2]:
+            scheduler.schedule(entity)
+        assert scheduler.pending == 5
+    assert not any(entity.async_write_ha_state.called for entity in entities)
+
+    while scheduler.pending:
+        await asyncio.sleep(0)
+        written_per_tick.append(sum(entity.async_write_ha_state.call_count for entity in entities))
+    await asyncio.sleep(0)
+
+    assert written_per_tick == [2, 4, 5]
+    assert all(entity.async_write_ha_state.call_count == 1 for entity in entities)
+
+
+@pytest.mark.asyncio
+async def test_writes_during_a_flush_are_queued_and_removed_entities_skipped():
+    """Test that a write arriving mid-flush joins the queue and detached entities are skipped."""
+    scheduler = WriteScheduler(background_hass(), chunk_size=1)
+    first, removed, late = mock_entity(), mock_entity(), mock_entity()
+    removed.hass = None
+
+    with scheduler.batch():
+        scheduler.schedule(first)
+        scheduler.schedule(removed)
+    await asyncio.sleep(0)
+    scheduler.schedule(late)
+    late.async_write_ha_state.assert_not_called()
+
+    while scheduler.pending:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    first.async_write_ha_state.assert_called_once()
+    removed.async_write_ha_state.assert_not_called()
+    late.async_write_ha_state.assert_called_once()
+
+    scheduler.schedule(first)
+    assert first.async_write_ha_state.call_count == 2